@@ -0,0 +1,266 @@
+"""
+提取和规划流水线的离线基准
+
+生成合成线稿（网格、螺旋、类文字字形、带噪扫描、细线、粗线填充），在多个分辨率下运行
+extract_strict_strokes 及后续的简化和排序，记录耗时、峰值内存、笔画数、点数和预计绘制时间；
+再用 record 输入后端在内存中重放计划，测量绘制循环本身的事件吞吐量（不移动真实鼠标）。
+
+与保存的基线比较时，耗时或峰值内存超过基线 (1 + --tolerance) 倍、
+或笔画数 / 点数 / 预计绘制时间相对基线的变化（增加或减少）超过 --count-tolerance 时视为回归，以退出码1结束。
+笔画或点数大幅减少通常说明线条在预处理中丢失；有意改变输出的修改应同时用 --update-baseline 更新基线。
+
+用法（在项目根目录运行）:
+    python benchmarks/pipeline.py                     # 与基线比较
+    python benchmarks/pipeline.py --update-baseline   # 重新生成基线
+    python benchmarks/pipeline.py --sizes 512 --cases grid spiral --json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.lazy_modules import cv2
+from src.draw_image import (
+    build_plan, estimate_draw_time, extend_path_for_canvas, map_path_to_canvas, DEFAULT_SKELETON_BACKEND,
+)
+from src.input_backend import create_input_backend
+
+BASELINE_PATH = os.path.join(ROOT, 'benchmarks', 'baselines', 'pipeline.json')
+DEFAULT_SIZES = [512, 1024, 2048]
+DEFAULT_CANVAS = (380, 600)
+
+
+# ---------------------------------------------------------------- 合成线稿
+
+def make_grid(size, rng):
+    img = np.full((size, size), 255, np.uint8)
+    step = max(8, size // 24)
+    thickness = max(3, size // 256)  # 原图中不到3像素宽的线按噪点处理（见 thin_lines 用例）
+    for v in range(step // 2, size, step):
+        cv2.line(img, (v, 0), (v, size - 1), 0, thickness)
+        cv2.line(img, (0, v), (size - 1, v), 0, thickness)
+    return img
+
+
+def make_spiral(size, rng):
+    img = np.full((size, size), 255, np.uint8)
+    t = np.linspace(0, 14 * np.pi, 4000)
+    r = t / t[-1] * size * 0.45
+    pts = np.stack((size / 2 + r * np.cos(t), size / 2 + r * np.sin(t)), axis=1).astype(np.int32)
+    cv2.polylines(img, [pts.reshape(-1, 1, 2)], False, 0, max(3, size // 256))
+    return img
+
+
+def make_glyphs(size, rng):
+    img = np.full((size, size), 255, np.uint8)
+    scale = size / 512
+    chars = 'ABEGKMRSWXYZ0123456789&@%#'
+    rows = 8
+    for row in range(rows):
+        text = ''.join(rng.choice(list(chars), 10))
+        y = int((row + 0.8) * size / rows)
+        cv2.putText(img, text, (int(10 * scale), y), cv2.FONT_HERSHEY_SIMPLEX, 1.6 * scale, 0,
+                    max(1, int(3 * scale)), cv2.LINE_AA)
+    return img
+
+
+def make_noisy_scan(size, rng):
+    img = np.full((size, size), 235, np.uint8)
+    for _ in range(60):
+        p1 = tuple(int(v) for v in rng.integers(0, size, 2))
+        p2 = tuple(int(v) for v in rng.integers(0, size, 2))
+        cv2.line(img, p1, p2, 40, int(rng.integers(1, max(2, size // 256) + 2)), cv2.LINE_AA)
+    for _ in range(20):
+        center = tuple(int(v) for v in rng.integers(0, size, 2))
+        cv2.circle(img, center, int(rng.integers(size // 40, size // 6)), 40, max(1, size // 512), cv2.LINE_AA)
+    noise = rng.normal(0, 18, img.shape)
+    img = np.clip(img + noise, 0, 255).astype(np.uint8)
+    return cv2.GaussianBlur(img, (3, 3), 0)
+
+
+def make_thin_lines(size, rng):
+    """
+    线宽固定约3像素（原图中不会被当作噪点的最细线条），大图缩小到工作分辨率后只剩一两个像素宽，
+    用于检查在工作分辨率上去噪时不会把线条整条去掉
+    """
+    img = np.full((size, size), 255, np.uint8)
+    for _ in range(40):
+        p1 = tuple(int(v) for v in rng.integers(size // 32, size - size // 32, 2))
+        p2 = tuple(int(v) for v in rng.integers(size // 32, size - size // 32, 2))
+        cv2.line(img, p1, p2, 0, 2)  # OpenCV 的线宽2画出约3像素宽的线
+    return img
+
+
+def make_thick_fills(size, rng):
+    img = np.full((size, size), 255, np.uint8)
+    for _ in range(12):
+        center = tuple(int(v) for v in rng.integers(size // 8, size - size // 8, 2))
+        axes = tuple(int(v) for v in rng.integers(size // 30, size // 8, 2))
+        cv2.ellipse(img, center, axes, float(rng.integers(0, 180)), 0, 360, 0, -1)
+    for _ in range(8):
+        p1 = tuple(int(v) for v in rng.integers(0, size, 2))
+        p2 = tuple(int(v) for v in rng.integers(0, size, 2))
+        cv2.line(img, p1, p2, 0, max(4, size // 40))
+    return img
+
+
+CASES = {
+    'grid': make_grid,
+    'spiral': make_spiral,
+    'glyphs': make_glyphs,
+    'noisy_scan': make_noisy_scan,
+    'thin_lines': make_thin_lines,
+    'thick_fills': make_thick_fills,
+}
+
+
+# ---------------------------------------------------------------- 测量
+
+def plan_args():
+    """build_plan 需要的参数（除开启填充外与命令行默认值一致，不使用缓存）"""
+    return argparse.Namespace(save_intermediates=False, no_cache=True, cache_size_mb=0,
+                              skeleton_backend=DEFAULT_SKELETON_BACKEND, simplify_tolerance=0.5,
+                              order_time_budget=1.0, brush_batch=True, workers=1,
+                              full_resolution=False, oversample=3.0, fill=True, fill_ratio=2.0)
+
+
+def replay(strokes, transform, canvas_size):
+    """用 record 后端不限速地重放计划，返回后端统计（测量绘制循环本身的吞吐量）"""
+    backend = create_input_backend('record', 0)
+    for path in strokes:
+        extended = extend_path_for_canvas(path)
+        if not extended:
+            continue
+        points = map_path_to_canvas(extended, (0, 0), canvas_size, transform)
+        backend.move(*points[0])
+        backend.press()
+        for x, y in points[1:]:
+            backend.move(x, y)
+        backend.release()
+    return backend.stats()
+
+
+def run_case(name, size, canvas_size, workdir, events_per_second, repeat=1):
+    """耗时取 repeat 次不开启 tracemalloc 的运行中最快的一次，峰值内存另外单独运行一次测量"""
+    rng = np.random.default_rng(size)
+    image_path = os.path.join(workdir, f'{name}_{size}.png')
+    cv2.imwrite(image_path, CASES[name](size, rng))
+
+    elapsed = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            build_plan(image_path, canvas_size, plan_args())
+            run_time = time.perf_counter() - start
+            elapsed = run_time if elapsed is None else min(elapsed, run_time)
+
+        tracemalloc.start()
+        planned = build_plan(image_path, canvas_size, plan_args())
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    result = {'seconds': round(elapsed, 3), 'peak_mb': round(peak / 1024 / 1024, 1)}
+    if planned is None:
+        result.update({'strokes': 0, 'points': 0, 'draw_seconds': 0.0})
+        return result
+    strokes, stroke_widths, levels, transform = planned
+    with contextlib.redirect_stdout(io.StringIO()):
+        estimate = estimate_draw_time(strokes, stroke_widths, levels, events_per_second)
+        stats = replay(strokes, transform, canvas_size)
+    result.update({
+        'strokes': len(strokes),
+        'points': sum(len(s) for s in strokes),
+        'brush_switches': estimate['brush_switches'],
+        'draw_seconds': round(estimate['total'], 1),
+        'replay_events_per_second': round(stats['rate']),
+    })
+    return result
+
+
+# ---------------------------------------------------------------- 基线比较
+
+def compare(results, baseline, tolerance, count_tolerance):
+    """返回回归列表 [(用例, 指标, 基线值, 当前值), ...]"""
+    regressions = []
+    for case, row in results.items():
+        base = baseline.get(case)
+        if base is None:
+            continue
+        for key in ('seconds', 'peak_mb'):
+            if key in base and row[key] > base[key] * (1 + tolerance):
+                regressions.append((case, key, base[key], row[key]))
+        # 数量两个方向的变化都算回归：减少往往意味着丢失了线条
+        for key in ('strokes', 'points', 'draw_seconds'):
+            if key in base and abs(row[key] - base[key]) > base[key] * count_tolerance:
+                regressions.append((case, key, base[key], row[key]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='提取和规划流水线的离线基准（合成线稿）')
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES), help='要运行的用例')
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES, help='图像边长（像素）')
+    parser.add_argument('--canvas-size', type=int, nargs=2, default=DEFAULT_CANVAS, metavar=('W', 'H'),
+                        help=f'规划使用的画布尺寸 (默认: {DEFAULT_CANVAS[0]} {DEFAULT_CANVAS[1]})')
+    parser.add_argument('--events-per-second', type=float, default=1000, help='预计绘制时间使用的事件速率')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='基线文件路径')
+    parser.add_argument('--update-baseline', action='store_true', help='把本次结果写为基线')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='耗时 / 内存允许超出基线的比例 (默认: 0.5)')
+    parser.add_argument('--count-tolerance', type=float, default=0.05,
+                        help='笔画数 / 点数 / 预计绘制时间相对基线允许变化的比例 (默认: 0.05)')
+    parser.add_argument('--repeat', type=int, default=5, help='每个用例计时的运行次数，取最快一次 (默认: 5)')
+    parser.add_argument('--json', action='store_true', help='以JSON格式输出结果')
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        # 预热一次，避免把 scikit-image 等依赖的首次导入计入第一个用例
+        run_case('grid', 256, tuple(args.canvas_size), workdir, args.events_per_second)
+        for name in args.cases:
+            for size in args.sizes:
+                case = f'{name}@{size}'
+                results[case] = run_case(name, size, tuple(args.canvas_size), workdir, args.events_per_second,
+                                         args.repeat)
+                if not args.json:
+                    row = results[case]
+                    print(f"{case:<20} {row['seconds']:7.2f}s {row['peak_mb']:7.1f}MB  "
+                          f"笔画 {row['strokes']:6d}  点 {row['points']:7d}  预计绘制 {row['draw_seconds']:7.1f}s  "
+                          f"重放 {row.get('replay_events_per_second', 0):8d} 事件/秒")
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"✅ 基线已更新: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"⚠️ 未找到基线文件 {args.baseline}，使用 --update-baseline 生成")
+        return
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance, args.count_tolerance)
+    if regressions:
+        print(f"\n❌ 发现 {len(regressions)} 项回归:")
+        for case, key, base, current in regressions:
+            print(f"  {case}: {key} {base} -> {current}")
+        sys.exit(1)
+    print("\n✅ 未发现回归")
+
+
+if __name__ == "__main__":
+    main()
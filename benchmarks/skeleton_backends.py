@@ -0,0 +1,129 @@
+"""
+骨架化后端基准：比较各后端的耗时、峰值内存以及与 scikit-image 骨架的一致性
+
+耗时包含距离变换（不顺带给出距离图的后端另加一次 cv2.distanceTransform），
+与预处理流水线中的实际开销一致。一致性按1像素容差统计：
+    precision  后端骨架像素中落在参照骨架附近的比例
+    recall     参照骨架像素中落在后端骨架附近的比例
+
+用法（在项目根目录运行）:
+    python benchmarks/skeleton_backends.py [图像或目录 ...] [--repeat 3] [--json]
+不指定图像时使用 logo.png
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.lazy_modules import cv2
+from src.preprocess import decode_image, threshold_image, clean_binary
+from src.skeletonize import SKELETON_BACKENDS, skeletonize_with
+from src.skeleton_graph import trace_skeleton_graph
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+REFERENCE_BACKEND = 'skimage'
+
+
+def collect_images(targets):
+    """展开命令行给出的图像文件和目录"""
+    images = []
+    for target in targets:
+        if os.path.isdir(target):
+            for name in sorted(os.listdir(target)):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    images.append(os.path.join(target, name))
+        else:
+            images.append(target)
+    return images
+
+
+def run_backend(filtered, backend):
+    """运行一次后端（含距离变换），返回 (skeleton, 耗时s, 峰值内存字节)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    skeleton, distance = skeletonize_with(filtered, backend)
+    if distance is None:
+        distance = cv2.distanceTransform(filtered, cv2.DIST_L2, 5)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return skeleton, elapsed, peak
+
+
+def agreement(skeleton, reference, tolerance=1):
+    """按容差统计与参照骨架的一致性，返回 (precision, recall)"""
+    kernel = np.ones((2 * tolerance + 1, 2 * tolerance + 1), np.uint8)
+    near_ref = cv2.dilate(reference, kernel)
+    near_sk = cv2.dilate(skeleton, kernel)
+    sk_count = int(np.count_nonzero(skeleton))
+    ref_count = int(np.count_nonzero(reference))
+    precision = np.count_nonzero(skeleton & near_ref) / sk_count if sk_count else 1.0
+    recall = np.count_nonzero(reference & near_sk) / ref_count if ref_count else 1.0
+    return precision, recall
+
+
+def benchmark_image(image_path, repeat):
+    gray = decode_image(image_path)
+    if gray is None:
+        return None
+    _, filtered = clean_binary(threshold_image(gray))
+
+    runs = {}
+    for backend in SKELETON_BACKENDS:
+        best = None
+        for _ in range(repeat):
+            skeleton, elapsed, peak = run_backend(filtered, backend)
+            if best is None or elapsed < best[1]:
+                best = (skeleton, elapsed, peak)
+        runs[backend] = best
+
+    reference = runs[REFERENCE_BACKEND][0]
+    result = {'image': image_path, 'size': [gray.shape[1], gray.shape[0]], 'backends': {}}
+    for backend, (skeleton, elapsed, peak) in runs.items():
+        precision, recall = agreement(skeleton, reference)
+        result['backends'][backend] = {
+            'ms': round(elapsed * 1000, 1),
+            'peak_mb': round(peak / 1024 / 1024, 1),
+            'pixels': int(np.count_nonzero(skeleton)),
+            'paths': len(trace_skeleton_graph(skeleton)),
+            'precision': round(precision, 4),
+            'recall': round(recall, 4),
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='比较骨架化后端的速度、峰值内存和结果一致性')
+    parser.add_argument('images', nargs='*', help='图像文件或目录 (默认: logo.png)')
+    parser.add_argument('--repeat', type=int, default=3, help='每个后端运行次数，取最快一次 (默认: 3)')
+    parser.add_argument('--json', action='store_true', help='以JSON格式输出结果')
+    args = parser.parse_args()
+
+    images = collect_images(args.images or [os.path.join(ROOT, 'logo.png')])
+    results = []
+    for image_path in images:
+        result = benchmark_image(image_path, args.repeat)
+        if result is not None:
+            results.append(result)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    for result in results:
+        print(f"\n=== {result['image']} ({result['size'][0]}x{result['size'][1]})")
+        print(f"  {'后端':<12}{'耗时ms':>10}{'峰值MB':>10}{'骨架像素':>10}{'路径数':>8}{'precision':>11}{'recall':>9}")
+        for backend, row in result['backends'].items():
+            print(f"  {backend:<12}{row['ms']:>10.1f}{row['peak_mb']:>10.1f}{row['pixels']:>10}"
+                  f"{row['paths']:>8}{row['precision']:>11.3f}{row['recall']:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
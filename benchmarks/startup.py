@@ -0,0 +1,101 @@
+"""
+启动耗时基准：用 `python -X importtime` 分别测量 GUI 入口和绘制模块的导入耗时
+
+用法（在项目根目录运行）:
+    python benchmarks/startup.py [--repeat 5] [--top 10] [--json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 测量目标: 名称 -> 在子进程中执行的代码
+TARGETS = {
+    'gui': 'import main',
+    'draw_image': 'import src.draw_image',
+    'window_detection': 'import src.window_detection',
+    # 参照项：处理阶段首次使用时才加载的重依赖
+    'deferred(cv2+skimage)': 'import cv2, skimage.morphology',
+}
+
+
+def parse_importtime(stderr):
+    """
+    解析 -X importtime 的输出
+    返回: [(模块名, 自身耗时us, 累计耗时us, 嵌套层级), ...]
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        fields = line.split(':', 1)[1].split('|')
+        if len(fields) != 3:
+            continue
+        self_us, cumulative_us, raw = fields
+        # 模块名前有一个分隔空格，之后每层嵌套缩进两个空格
+        raw = raw.rstrip()
+        depth = (len(raw) - len(raw.lstrip()) - 1) // 2
+        rows.append((raw.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def measure(code, repeat):
+    """运行repeat次，返回最快一次的 (墙钟耗时ms, importtime行)；导入失败时返回错误信息"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                              cwd=ROOT, capture_output=True, text=True)
+        wall = (time.perf_counter() - start) * 1000
+        if proc.returncode != 0:
+            last = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else '未知错误'
+            return None, last
+        if best is None or wall < best[0]:
+            best = (wall, parse_importtime(proc.stderr))
+    return best, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='测量GUI和绘制模块的启动导入耗时')
+    parser.add_argument('--repeat', type=int, default=5, help='每个目标运行次数，取最快一次 (默认: 5)')
+    parser.add_argument('--top', type=int, default=10, help='列出自身耗时最多的模块数 (默认: 10)')
+    parser.add_argument('--json', action='store_true', help='以JSON格式输出结果')
+    args = parser.parse_args()
+
+    results = {}
+    for name, code in TARGETS.items():
+        best, error = measure(code, args.repeat)
+        if error:
+            results[name] = {'error': error}
+            continue
+        wall, rows = best
+        imports_us = sum(cum for _, _, cum, depth in rows if depth == 0)
+        slowest = sorted(rows, key=lambda r: r[1], reverse=True)[:args.top]
+        results[name] = {
+            'wall_ms': round(wall, 1),
+            'import_ms': round(imports_us / 1000, 1),
+            'modules': len(rows),
+            'slowest': [{'module': m, 'self_ms': round(s / 1000, 1), 'cumulative_ms': round(c / 1000, 1)}
+                        for m, s, c, _ in slowest],
+        }
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    for name, result in results.items():
+        print(f"\n=== {name}: {TARGETS[name]}")
+        if 'error' in result:
+            print(f"  ❌ 导入失败: {result['error']}")
+            continue
+        print(f"  进程总耗时 {result['wall_ms']:.1f}ms，导入耗时 {result['import_ms']:.1f}ms，共 {result['modules']} 个模块")
+        for row in result['slowest']:
+            print(f"    {row['self_ms']:8.1f}ms 自身 {row['cumulative_ms']:8.1f}ms 累计  {row['module']}")
+
+
+if __name__ == "__main__":
+    main()
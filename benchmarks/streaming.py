@@ -0,0 +1,114 @@
+"""
+流式绘制的首笔延迟基准
+
+在 pipeline.py 的合成线稿上比较：
+    build_plan   完整提取和规划后才能开始绘制的耗时
+    stream_plan  确定画布映射、产出第一批笔画（即可以开始绘制）和全部产出的耗时
+并检查两者的画布映射是否一致。流式只在每批内排序，笔画数和顺序可以不同；
+第一批不等待填充规划，其中落在填充区域内的中心线也会绘制，因此有填充区域时点数略多。
+
+stream_plan 在本进程中直接运行（不经过 StrokeStream 的后台进程），只测量提取和规划本身；
+之后再用 --workers 个预处理进程经 StrokeStream 的后台进程运行一次，检查产出的笔画数与本进程中相同。
+画布映射或笔画数不一致时以退出码1结束。
+
+用法（在项目根目录运行）:
+    python benchmarks/streaming.py [--sizes 1024 2048] [--cases grid glyphs] [--workers 2]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.lazy_modules import cv2
+from src.draw_image import build_plan, stream_plan
+from src.stroke_stream import StrokeStream
+from pipeline import CASES, DEFAULT_CANVAS, plan_args
+
+
+def run_stream_process(image_path, canvas_size, workers):
+    """经 StrokeStream 的后台进程运行流式规划（与 --stream 相同），返回产出的笔画数，后台进程出错时返回错误信息"""
+    args = plan_args()
+    args.workers = workers
+    with contextlib.redirect_stdout(io.StringIO()):
+        stream = StrokeStream(image_path, canvas_size, args)
+        try:
+            stream.wait_transform()
+            return sum(1 for _ in stream)
+        except RuntimeError as e:
+            return str(e)
+        finally:
+            stream.close()
+
+
+def run_case(name, size, canvas_size, workdir, workers=1):
+    rng = np.random.default_rng(size)
+    image_path = os.path.join(workdir, f'{name}_{size}.png')
+    cv2.imwrite(image_path, CASES[name](size, rng))
+    args = plan_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        planned = build_plan(image_path, canvas_size, args)
+        full = time.perf_counter() - start
+
+        start = time.perf_counter()
+        plan = stream_plan(image_path, canvas_size, args)
+        transform = next(plan)
+        transform_time = time.perf_counter() - start
+        first = None
+        strokes = []
+        for batch in plan:
+            if first is None:
+                first = time.perf_counter() - start
+            strokes.extend(batch[0])
+        total = time.perf_counter() - start
+
+    return {'full': full, 'transform': transform_time, 'first': first or total, 'total': total,
+            'strokes': len(strokes), 'points': sum(len(s) for s in strokes),
+            'full_points': sum(len(s) for s in planned[0]) if planned else 0,
+            'same': transform == (planned[3] if planned else None),
+            'process_strokes': run_stream_process(image_path, canvas_size, workers)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='比较完整规划与流式规划开始绘制前的等待时间')
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES), help='要运行的用例')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1024, 2048], help='图像边长（像素）')
+    parser.add_argument('--canvas-size', type=int, nargs=2, default=DEFAULT_CANVAS, metavar=('W', 'H'),
+                        help='画布尺寸')
+    parser.add_argument('--workers', type=int, default=2,
+                        help='经后台进程运行时的预处理并行进程数，检查与 --stream 的组合 (默认: 2)')
+    args = parser.parse_args()
+
+    mismatches = 0
+    with tempfile.TemporaryDirectory() as workdir:
+        # 预热一次，避免把依赖的首次导入计入第一个用例
+        run_case('grid', 256, tuple(args.canvas_size), workdir)
+        for name in args.cases:
+            for size in args.sizes:
+                row = run_case(name, size, tuple(args.canvas_size), workdir, args.workers)
+                status = '✅'
+                if not row['same']:
+                    status = '❌ 画布映射不一致'
+                elif isinstance(row['process_strokes'], str):
+                    status = f"❌ {row['process_strokes']}"
+                elif row['process_strokes'] != row['strokes']:
+                    status = f"❌ 后台进程产出 {row['process_strokes']} 条笔画，应为 {row['strokes']}"
+                mismatches += status != '✅'
+                print(f"{name + '@' + str(size):<20} 完整规划 {row['full']:6.2f}s  |  流式: 画布映射 "
+                      f"{row['transform']:6.2f}s  第一批 {row['first']:6.2f}s  全部 {row['total']:6.2f}s  "
+                      f"点 {row['full_points']:6d} -> {row['points']:6d}  {status}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+画布检测基准：在录制的窗口截图上测量画布检测和在同一张截图中检测画笔滑块的耗时
+
+不需要显示器，截图可以用 `python src/window_detection.py --debug` 生成（输出目录中的 window_frame.png）。
+不指定截图时使用合成的窗口截图。
+
+用法（在项目根目录运行）:
+    python benchmarks/window_detection.py [截图或目录 ...] [--repeat 50]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.lazy_modules import cv2
+from src.window_detection import TARGET_WINDOW_SIZE, find_brush_slider, find_canvas_rect
+
+# 合成截图中画布的矩形和画笔滑块圆点的位置
+SYNTHETIC_CANVAS = (35, 210, 381, 601)
+SYNTHETIC_SLIDER = [(82 + i * 83, 967) for i in range(5)]
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+def synthetic_frame(seed=0):
+    """合成一张窗口截图：白色界面、若干控件、#EEEEEE 画布（上面有一些笔迹）和底部的画笔滑块"""
+    rng = np.random.default_rng(seed)
+    width, height = TARGET_WINDOW_SIZE
+    frame = np.full((height, width, 3), 255, np.uint8)
+    cv2.rectangle(frame, (0, 0), (width, 60), (40, 40, 40), -1)
+    x, y, w, h = SYNTHETIC_CANVAS
+    cv2.rectangle(frame, (x, y), (x + w - 1, y + h - 1), (238, 238, 238), -1)
+    for _ in range(30):
+        p1 = tuple(int(v) for v in rng.integers((40, 215), (410, 805)))
+        p2 = tuple(int(v) for v in rng.integers((40, 215), (410, 805)))
+        cv2.line(frame, p1, p2, (30, 30, 30), int(rng.integers(1, 6)))
+    cv2.line(frame, (80, 967), (414, 967), (200, 200, 200), 3)
+    for i, center in enumerate(SYNTHETIC_SLIDER):
+        cv2.circle(frame, center, 6 + i * 2, (120, 120, 120), -1)
+    for i in range(4):
+        cv2.rectangle(frame, (30 + i * 100, 1000), (110 + i * 100, 1060), (230, 230, 230), -1)
+    noise = rng.integers(-2, 3, frame.shape)
+    return np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def load_frames(targets):
+    frames = []
+    for target in targets:
+        paths = [target]
+        if os.path.isdir(target):
+            paths = [os.path.join(target, n) for n in sorted(os.listdir(target)) if n.lower().endswith(IMAGE_EXTENSIONS)]
+        for path in paths:
+            frame = cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if frame is not None:
+                frames.append((path, frame))
+    return frames
+
+
+def best_time(func, frame, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(frame)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='在录制的窗口截图上测量画布检测耗时')
+    parser.add_argument('frames', nargs='*', help='窗口截图文件或目录 (默认: 合成截图)')
+    parser.add_argument('--repeat', type=int, default=50, help='每种方法运行次数，取最快一次 (默认: 50)')
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames) if args.frames else [('synthetic', synthetic_frame())]
+    mismatches = 0
+    for name, frame in frames:
+        rect, canvas_time = best_time(find_canvas_rect, frame, args.repeat)
+        status = '⚠️ 未找到' if rect is None else rect
+        if name == 'synthetic' and rect != SYNTHETIC_CANVAS:
+            mismatches += 1
+            status = f"❌ {rect}，应为 {SYNTHETIC_CANVAS}"
+        print(f"{name} ({frame.shape[1]}x{frame.shape[0]}): 画布 {canvas_time * 1000:.2f}ms: {status}")
+        if rect is None:
+            continue
+        sliders, slider_time = best_time(lambda f: find_brush_slider(f, rect), frame, args.repeat)
+        status = '⚠️ 未找到' if sliders is None else sliders
+        if name == 'synthetic' and sliders != SYNTHETIC_SLIDER:
+            mismatches += 1
+            status = f"❌ {sliders}，应为 {SYNTHETIC_SLIDER}"
+        print(f"  画笔滑块 {slider_time * 1000:.2f}ms: {status}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
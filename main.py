@@ -1,12 +1,24 @@
 import os
 import sys
 import argparse
+import multiprocessing
 
 # 获取应用程序路径
 base_path = os.path.dirname(os.path.abspath(__file__))
 if hasattr(sys, '_MEIPASS'):
     base_path = sys._MEIPASS
 
+# 打包后的程序在子进程（如预处理进程池）中也会运行入口脚本，需先交给 multiprocessing 处理
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+
+# 命令行模式：带参数运行时（如 python main.py -i 图片.png）直接进入绘制流程，不加载 PyQt5
+if __name__ == "__main__" and len(sys.argv) > 1:
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from src import draw_image
+    draw_image.main()
+    sys.exit(0)
+
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QFileDialog,
@@ -15,7 +27,7 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtGui import QFont, QIcon
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
 import threading
-from src import draw_image
+from src import draw_control, draw_image
 import sys
 import os
 # 添加项目根目录到Python路径
@@ -28,26 +40,34 @@ class DrawingThread(QThread):
     progress_signal = pyqtSignal(int)  # 进度信号
     finished_signal = pyqtSignal(bool, str)  # 完成信号
 
-    def __init__(self, image_path):
+    def __init__(self, image_paths):
         super().__init__()
-        self.image_path = image_path
+        self.image_paths = image_paths
         self.is_running = True
 
     def run(self):
         """线程运行函数"""
         try:
-            # 构造命令行参数并执行绘制
-            sys.argv = ["main.py", "-i", self.image_path, "-m", "draw"]
+            # 构造命令行参数并执行绘制（多张图像时由任务队列在后台提前规划后续图像）
+            sys.argv = ["main.py", "-i", *self.image_paths, "-m", "draw"]
             draw_image.main()
 
-            self.finished_signal.emit(True, "绘制完成！")
+            # ESC、关闭窗口等取消后 main 正常返回，按控制状态区分完成和取消
+            if draw_control.default_control.is_cancelled():
+                self.finished_signal.emit(False, "绘制已取消")
+            else:
+                self.finished_signal.emit(True, "绘制完成！")
         except Exception as e:
             self.finished_signal.emit(False, f"绘制过程中发生错误: {str(e)}")
 
     def stop(self):
-        """停止线程"""
+        """
+        取消绘制并等待线程结束：绘制循环在当前小段结束后抬笔退出，提取和规划在预处理的下一个阶段之间停止，
+        不会强行终止线程
+        """
         self.is_running = False
-        self.terminate()
+        draw_control.default_control.cancel()
+        self.wait()
 
 
 class DrawingApp(QMainWindow):
@@ -94,7 +114,7 @@ class DrawingApp(QMainWindow):
         self.image_path_label.setAlignment(Qt.AlignCenter)
         image_layout.addWidget(self.image_path_label, 4)
 
-        self.select_image_btn = QPushButton("选择图片")
+        self.select_image_btn = QPushButton("选择图片（可多选）")
         self.select_image_btn.setFont(QFont("Arial", 12))
         self.select_image_btn.clicked.connect(self.select_image)
         image_layout.addWidget(self.select_image_btn, 1)
@@ -112,21 +132,24 @@ class DrawingApp(QMainWindow):
         # 移除了进度条
 
         # 初始状态
-        self.selected_image = None
+        self.selected_images = []
 
     def select_image(self):
-        """选择图片文件"""
-        file_path, _ = QFileDialog.getOpenFileName(
+        """选择图片文件（可多选，按选择顺序依次绘制）"""
+        file_paths, _ = QFileDialog.getOpenFileNames(
             self, "选择图像文件", "./input", 
             "图像文件 (*.png *.jpg *.jpeg *.bmp *.gif)"
         )
-        if file_path:
-            self.selected_image = file_path
-            self.image_path_label.setText(os.path.basename(file_path))
+        if file_paths:
+            self.selected_images = file_paths
+            if len(file_paths) == 1:
+                self.image_path_label.setText(os.path.basename(file_paths[0]))
+            else:
+                self.image_path_label.setText(f"{os.path.basename(file_paths[0])} 等 {len(file_paths)} 张图片")
 
     def start_drawing(self):
         """开始绘制"""
-        if not self.selected_image:
+        if not self.selected_images:
             QMessageBox.warning(self, "警告", "请先选择要绘制的图片！")
             return
 
@@ -134,11 +157,12 @@ class DrawingApp(QMainWindow):
         self.start_btn.setEnabled(False)
         self.select_image_btn.setEnabled(False)
 
-        # 首先执行窗口检测
+        # 首先确认校准：窗口和画布没有移动时直接使用保存的配置，否则执行完整的窗口检测
         try:
-            print("🔍 正在执行窗口检测...")
-            window_detection.main()
-            print("✅ 窗口检测完成！")
+            print("🔍 正在确认画布位置...")
+            if window_detection.ensure_calibration() is None:
+                raise RuntimeError("未找到目标窗口")
+            print("✅ 画布位置已确认！")
         except Exception as e:
             self.start_btn.setEnabled(True)
             self.select_image_btn.setEnabled(True)
@@ -146,7 +170,7 @@ class DrawingApp(QMainWindow):
             return
 
         # 启动绘制线程
-        self.drawing_thread = DrawingThread(self.selected_image)
+        self.drawing_thread = DrawingThread(self.selected_images)
         # 移除了进度条信号连接
         self.drawing_thread.finished_signal.connect(self.drawing_finished)
         self.drawing_thread.start()
@@ -0,0 +1,161 @@
+"""
+画布校准配置
+
+校准结果按名称保存在配置目录的 calibration.json 中，每个配置包含画布矩形、画笔滑块位置和目标窗口的位置大小，
+滑块位置记录为相对画布左上角的偏移，窗口只是平移时不需要重新测量:
+    {"version": 2, "active": "default",
+     "profiles": {"default": {"canvas": {"left", "top", "width", "height"},
+                              "window": {"title", "left", "top", "width", "height"},
+                              "sliders": [[dx, dy], ...], "slider_source": "detected" | "default",
+                              "updated": "..."}}}
+"""
+import json
+import os
+import re
+import tempfile
+import time
+
+# 获取系统AppData路径用于存储配置文件
+app_data_path = os.getenv('APPDATA')
+if app_data_path:
+    config_path = os.path.join(app_data_path, 'XiChaDrawingTool')
+else:
+    # 如果AppData不可用，回退到相对路径
+    config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config')
+
+CALIBRATION_FILE = 'calibration.json'
+CALIBRATION_FORMAT_VERSION = 2
+DEFAULT_PROFILE = 'default'
+
+# 窗口按固定大小摆放时画笔滑块5个档位相对窗口左上角的位置（从最细到最粗），检测不到滑块时使用
+DEFAULT_SLIDER_WINDOW_OFFSETS = [(82, 967), (168, 966), (253, 966), (331, 966), (414, 966)]
+# 窗口固定摆放的位置，配置中没有窗口信息时按此换算默认滑块位置
+DEFAULT_WINDOW_POS = (1371, 0)
+
+# 旧版本写入的画布坐标文本文件，没有校准配置时读取一次
+LEGACY_CANVAS_FILE = 'canvas_coordinates.txt'
+
+
+def calibration_file():
+    return os.path.join(config_path, CALIBRATION_FILE)
+
+
+def load_calibration():
+    """读取全部校准配置，文件不存在或损坏时返回空配置"""
+    path = calibration_file()
+    empty = {'version': CALIBRATION_FORMAT_VERSION, 'active': DEFAULT_PROFILE, 'profiles': {}}
+    if not os.path.exists(path):
+        return empty
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ 读取校准配置 {path} 失败: {e}")
+        return empty
+    if data.get('version') != CALIBRATION_FORMAT_VERSION or not isinstance(data.get('profiles'), dict):
+        print(f"⚠️ 校准配置 {path} 版本不兼容，需要重新检测")
+        return empty
+    data.setdefault('active', DEFAULT_PROFILE)
+    return data
+
+
+def _write_calibration(data):
+    """先写临时文件再替换，中途出错不会留下半个配置文件"""
+    os.makedirs(config_path, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=config_path, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, calibration_file())
+    except Exception:
+        os.remove(tmp)
+        raise
+
+
+def active_profile_name():
+    return load_calibration()['active']
+
+
+def set_active_profile(name):
+    """切换当前使用的配置，配置不存在时返回 False"""
+    data = load_calibration()
+    if name not in data['profiles']:
+        return False
+    if data['active'] != name:
+        data['active'] = name
+        _write_calibration(data)
+    return True
+
+
+def get_profile(name=None):
+    """返回指定名称（默认为当前使用的）的校准配置，不存在时返回 None"""
+    data = load_calibration()
+    return data['profiles'].get(name or data['active'])
+
+
+def save_profile(name, canvas, window=None, sliders=None, slider_source=None, activate=True):
+    """
+    保存一个校准配置
+    canvas: (left, top, width, height) 画布的屏幕矩形
+    window: (title, left, top, width, height) 目标窗口，未知时为 None
+    sliders: [(dx, dy), ...] 画笔滑块各档位相对画布左上角的偏移，为 None 时保留原有值
+    slider_source: 滑块位置的来源（'detected' 检测得到 / 'default' 默认位置）
+    activate: 同时设为当前使用的配置
+    """
+    name = name or DEFAULT_PROFILE
+    data = load_calibration()
+    profile = data['profiles'].get(name, {})
+    left, top, width, height = (int(v) for v in canvas)
+    profile['canvas'] = {'left': left, 'top': top, 'width': width, 'height': height}
+    if window is not None:
+        title, wl, wt, ww, wh = window
+        profile['window'] = {'title': title, 'left': int(wl), 'top': int(wt), 'width': int(ww), 'height': int(wh)}
+    if sliders is not None:
+        profile['sliders'] = [[int(dx), int(dy)] for dx, dy in sliders]
+        profile['slider_source'] = slider_source or 'detected'
+    profile['updated'] = time.strftime('%Y-%m-%d %H:%M:%S')
+    data['profiles'][name] = profile
+    if activate:
+        data['active'] = name
+    _write_calibration(data)
+    print(f"✅ 校准配置 '{name}' 已保存到 {calibration_file()}")
+    return profile
+
+
+def canvas_rect(profile):
+    """配置中的画布矩形 (left, top, width, height)"""
+    canvas = profile['canvas']
+    return canvas['left'], canvas['top'], canvas['width'], canvas['height']
+
+
+def slider_positions(profile):
+    """
+    画笔滑块各档位的屏幕坐标 [(x, y), ...]（从最细到最粗）：按画布位置换算配置中的偏移，
+    没有记录时按窗口位置换算默认位置
+    """
+    if profile and profile.get('sliders'):
+        left, top = profile['canvas']['left'], profile['canvas']['top']
+        return [(left + dx, top + dy) for dx, dy in profile['sliders']]
+    window = profile.get('window') if profile else None
+    wx, wy = (window['left'], window['top']) if window else DEFAULT_WINDOW_POS
+    return [(wx + dx, wy + dy) for dx, dy in DEFAULT_SLIDER_WINDOW_OFFSETS]
+
+
+def load_legacy_canvas():
+    """
+    读取旧版本的画布坐标文本文件（"灰色区域左上角坐标: (x, y)" / "灰色区域尺寸: w x h"）
+    返回: (left, top, width, height)，文件不存在或格式不对时返回 None
+    """
+    path = os.path.join(config_path, LEGACY_CANVAS_FILE)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+    except OSError:
+        return None
+    top_left = re.search(r'左上角坐标:\s*\(\s*(-?\d+)\s*,\s*(-?\d+)\s*\)', text)
+    size = re.search(r'尺寸:\s*(\d+)\s*x\s*(\d+)', text)
+    if not top_left or not size:
+        return None
+    return tuple(int(v) for v in top_left.groups() + size.groups())
@@ -0,0 +1,100 @@
+"""
+调试产物（中间结果图像、笔画宽度列表、检测结果截图等）的异步写入
+
+按调试级别开启，默认不写任何文件:
+    DEBUG_OFF   0  不保存
+    DEBUG_BASIC 1  文本产物（如 stroke_widths.txt）
+    DEBUG_FULL  2  另外保存预处理中间图像和窗口检测的截图
+
+开启时由一个后台线程负责 PNG 编码和写盘，调用方只把数组放进有界队列就返回，
+队列满时才等待（避免调试时内存无限增长）。PNG 使用快速压缩级别。
+放入队列的数组之后不能再被修改；进程退出前会等待队列写完。
+"""
+import atexit
+import os
+import queue
+import threading
+
+from src.lazy_modules import cv2
+
+DEBUG_OFF = 0
+DEBUG_BASIC = 1
+DEBUG_FULL = 2
+
+# 待写入产物的队列长度上限
+QUEUE_SIZE = 8
+
+# PNG 压缩级别（0-9），调试图像只求快
+PNG_COMPRESSION = 1
+
+_level = DEBUG_OFF
+_queue = None
+_owner_pid = None  # 创建队列和写入线程的进程；fork 出的子进程继承了队列但没有线程，需要重新创建
+_lock = threading.Lock()
+
+
+def set_level(level):
+    global _level
+    _level = int(level)
+
+
+def get_level():
+    return _level
+
+
+def enabled(level=DEBUG_BASIC):
+    """当前调试级别是否需要保存该级别的产物"""
+    return _level >= level
+
+
+def _write(kind, path, payload):
+    if kind == 'image':
+        success, encoded = cv2.imencode('.png', payload, [cv2.IMWRITE_PNG_COMPRESSION, PNG_COMPRESSION])
+        if not success:
+            raise ValueError('PNG 编码失败')
+        encoded.tofile(path)  # 支持中文路径
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(payload)
+
+
+def _worker(items):
+    while True:
+        kind, path, payload = items.get()
+        try:
+            _write(kind, path, payload)
+            print(f"调试产物已保存为 {path}")
+        except Exception as e:
+            print(f"❌ 保存调试产物 {path} 时发生错误: {e}")
+        finally:
+            items.task_done()
+
+
+def _submit(kind, path, payload):
+    global _queue, _owner_pid
+    with _lock:
+        if _queue is None or _owner_pid != os.getpid():
+            _queue = queue.Queue(maxsize=QUEUE_SIZE)
+            _owner_pid = os.getpid()
+            threading.Thread(target=_worker, args=(_queue,), name='debug-artifacts', daemon=True).start()
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    _queue.put((kind, path, payload))
+
+
+def save_image(path, img):
+    """在后台把图像保存为 PNG"""
+    _submit('image', path, img)
+
+
+def save_text(path, text):
+    """在后台保存文本文件"""
+    _submit('text', path, text)
+
+
+def flush():
+    """等待本进程已提交的产物全部写完（从父进程继承来的队列没有写入线程，不等待）"""
+    if _queue is not None and _owner_pid == os.getpid():
+        _queue.join()
+
+
+atexit.register(flush)
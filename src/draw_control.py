@@ -0,0 +1,135 @@
+"""
+绘制的暂停/取消控制
+
+键盘监听（空格暂停/继续、ESC取消）、GUI 和命令行（Ctrl+C）共用同一个 DrawControl，
+绘制循环只在笔画和小段点之间检查一次状态，暂停时阻塞在 threading.Event 上而不是循环 sleep，
+继续或取消时立即被唤醒。
+"""
+import signal
+import threading
+
+from src.lazy_modules import keyboard
+
+# 一段笔画中两次检查暂停/取消之间最多经过的时间（秒），决定暂停的响应延迟
+CHECK_INTERVAL = 0.005
+
+# 输入后端不限速时每段的点数
+UNTHROTTLED_CHUNK = 64
+
+
+class DrawControl:
+    """线程安全的暂停/取消状态，任意线程都可以调用 pause / resume / cancel"""
+
+    def __init__(self):
+        # 状态切换要先检查是否已取消再修改事件，加锁保证与其他线程的 cancel 不会交错
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._running = threading.Event()  # 未暂停时置位，暂停时绘制线程阻塞在这里
+        self._interrupt = threading.Event()  # 暂停或取消时置位，绘制循环只需检查这一个标志
+        self._running.set()
+
+    def reset(self):
+        """开始新的绘制前清除上一次的暂停/取消状态"""
+        with self._lock:
+            self._cancelled.clear()
+            self._interrupt.clear()
+            self._running.set()
+
+    def cancel(self):
+        with self._lock:
+            self._cancelled.set()
+            self._interrupt.set()
+            self._running.set()  # 唤醒处于暂停中的绘制线程
+
+    def pause(self):
+        with self._lock:
+            self._pause()
+
+    def resume(self):
+        with self._lock:
+            self._resume()
+
+    def _pause(self):
+        if not self._cancelled.is_set():
+            self._running.clear()
+            self._interrupt.set()
+
+    def _resume(self):
+        if not self._cancelled.is_set():
+            self._interrupt.clear()
+            self._running.set()
+
+    def toggle_pause(self):
+        """切换暂停状态，返回切换后是否处于暂停"""
+        with self._lock:
+            if self.is_paused():
+                self._resume()
+            else:
+                self._pause()
+            return self.is_paused()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def is_paused(self):
+        return not self._running.is_set()
+
+    def interrupted(self):
+        """是否需要停下来处理暂停或取消（绘制循环中唯一的检查）"""
+        return self._interrupt.is_set()
+
+    def wait_while_paused(self):
+        """暂停时阻塞直到继续或取消，返回 True 表示可以继续绘制，False 表示已取消"""
+        self._running.wait()
+        return not self._cancelled.is_set()
+
+
+# 进程内共用的控制实例
+default_control = DrawControl()
+
+
+def chunk_size(backend):
+    """每段的点数：按输入后端的事件间隔使每段耗时不超过 CHECK_INTERVAL"""
+    if backend.interval <= 0:
+        return UNTHROTTLED_CHUNK
+    return max(1, int(CHECK_INTERVAL / backend.interval))
+
+
+def start_keyboard_listener(control):
+    """启动键盘监听: ESC 取消绘制，空格暂停/继续；返回监听器（守护线程）"""
+    def on_press(key):
+        try:
+            if key == keyboard.Key.esc:
+                print("\n🔴 检测到ESC键！正在停止绘制...")
+                control.cancel()
+                return False  # 停止监听器
+            if key == keyboard.Key.space:
+                if control.toggle_pause():
+                    print("\n⏸️  绘制已暂停！按空格键继续...")
+                else:
+                    print("\n▶️  绘制继续进行...")
+        except Exception as e:
+            print(f"键盘事件处理异常: {e}")
+
+    listener = keyboard.Listener(on_press=on_press)
+    listener.daemon = True  # 设置为守护线程，主程序结束时自动停止
+    listener.start()
+    return listener
+
+
+def handle_sigint(control):
+    """
+    命令行下让 Ctrl+C 与 ESC 一样取消绘制（抬笔后正常结束），再按一次 Ctrl+C 立即中断
+    只能在主线程中安装（GUI 的绘制线程中不做处理）；返回恢复原处理函数的回调
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return lambda: None
+
+    def on_sigint(signum, frame):
+        if control.is_cancelled():
+            raise KeyboardInterrupt
+        print("\n🔴 检测到 Ctrl+C！正在停止绘制...（再按一次立即退出）")
+        control.cancel()
+
+    previous = signal.signal(signal.SIGINT, on_sigint)
+    return lambda: signal.signal(signal.SIGINT, previous)
@@ -1,14 +1,35 @@
-import cv2
 import numpy as np
-import pyautogui
 import time
 import os
 import sys
-import tempfile
 import json
-from pynput import keyboard
 import argparse
-from skimage.morphology import skeletonize
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+
+# 添加项目根目录到Python路径，保证直接运行本脚本时也能导入src包
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# cv2 / pyautogui / pynput 导入较慢，首次使用时才真正加载
+from src.lazy_modules import cv2, pyautogui
+from src.skeleton_graph import trace_skeleton_components, trace_skeleton_graph
+from src.path_simplify import simplify_paths
+from src.stroke_order import order_strokes, order_strokes_by_brush
+from src.input_backend import INPUT_BACKENDS, create_input_backend
+from src.preprocess import (
+    preprocess_image, skeletonize_binary, estimate_stroke_widths, timed_stage, format_timings
+)
+from src.stroke_cache import DEFAULT_CACHE_BYTES, cache_key, file_sha256, load_strokes, save_strokes
+from src.draw_plan import PLAN_SUFFIX, write_plan, read_plan, plan_strokes
+from src.verify import capture_canvas, find_missing_strokes
+from src.skeletonize import DEFAULT_SKELETON_BACKEND, SKELETON_BACKENDS
+from src import calibration, debug_artifacts, instrument
+from src.draw_control import chunk_size, default_control, handle_sigint, start_keyboard_listener
+from src.tiling import default_workers
+from src.job_queue import DrawJobQueue
+from src.session import load_session, start_session
+from src.stroke_stream import StrokeStream
+from src.window_detection import ensure_calibration
+from src.fill_planner import DEFAULT_BRUSH_WIDTHS, plan_fills, remove_filled_points
 
 # 获取应用程序路径
 base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -23,48 +44,24 @@ else:
     # 如果AppData不可用，回退到当前目录
     config_path = os.path.join(base_path, 'config')
 
-# 创建配置目录（如果不存在）
-os.makedirs(config_path, exist_ok=True)
-
-# 创建输出目录（如果不存在）
+# 输出目录（调试图像等）
 output_path = os.path.join(config_path, 'output')
-os.makedirs(output_path, exist_ok=True)
 
-# 全局变量控制退出
-should_exit = False
+# 笔画缓存目录（按图像内容寻址）
+cache_path = os.path.join(config_path, 'stroke_cache')
 
-# 全局变量控制绘制暂停/继续
-is_paused = False
+# 流式绘制：第一批和之后每批的最少笔画数，以及每批排序的 2-opt 时间预算（秒）
+FIRST_STREAM_BATCH = 20
+STREAM_BATCH = 200
+STREAM_ORDER_BUDGET = 0.05
 
-# 改进的键盘监听函数，确保ESC键和空格键被正确捕获
-def on_press(key):
-    global should_exit, is_paused
-    try:
-        # 捕获ESC键 - 退出程序
-        if key == keyboard.Key.esc:
-            print("\n🔴 检测到ESC键！正在停止绘制...")
-            should_exit = True
-            # 立即抬起鼠标按键，确保停止所有绘制操作
-            pyautogui.mouseUp()
-            return False  # 停止监听器
-        # 捕获空格键 - 暂停/继续绘制
-        elif key == keyboard.Key.space:
-            is_paused = not is_paused
-            if is_paused:
-                print("\n⏸️  绘制已暂停！按空格键继续...")
-                # 暂停时立即抬起鼠标，防止拖动产生线条
-                pyautogui.mouseUp()
-            else:
-                print("\n▶️  绘制继续进行...")
-    except Exception as e:
-        # 打印异常以调试
-        print(f"键盘事件处理异常: {e}")
-        pass
+# 绘制会话目录（续画日志和计划）
+session_path = os.path.join(config_path, 'session')
 
-# 额外的安全中断机制 - 定期检查should_exit标志
-def check_exit_condition():
-    """检查是否应该退出程序"""
-    return should_exit
+def ensure_directories():
+    """创建配置目录和输出目录（如果不存在），在需要写文件时调用，避免导入模块时产生副作用"""
+    os.makedirs(config_path, exist_ok=True)
+    os.makedirs(output_path, exist_ok=True)
 
 def extend_short_path(path, threshold=7, target_length=6):
     """
@@ -75,7 +72,11 @@ def extend_short_path(path, threshold=7, target_length=6):
     """
     if not path or len(path) < 2:
         return path  # 无效路径直接返回
-    
+
+    # 闭合笔画首尾重合，没有明确的延长方向，保持原样
+    if path[0] == path[-1]:
+        return path
+
     # 计算原始路径的边界
     xs = [p[0] for p in path]
     ys = [p[1] for p in path]
@@ -199,143 +200,32 @@ def get_line_width(contour):
     return int(max(1, min(width, max_reasonable_width)))
 
 
-def detect_brush_size_slider(canvas_top_left, canvas_size):
-    """
-    检测画笔大小滑块上的5个圆点位置
-    返回: [(x1, y1), (x2, y2), ..., (x5, y5)] 坐标列表
-    """
-    # 定义滑块区域相对于画布的位置
-    # 假设滑块位于画布上方，距离画布顶部有一定距离
-    slider_region_height = 100  # 滑块区域高度
-    slider_region_y = canvas_top_left[1] - slider_region_height  # 滑块区域Y坐标
-    
-    # 确保Y坐标不为负
-    slider_region_y = max(0, slider_region_y)
-    
-    # 截取滑块区域
-    try:
-        # 滑块区域宽度与画布相同，高度为设定值
-        slider_screenshot = pyautogui.screenshot(region=(
-            canvas_top_left[0], 
-            slider_region_y, 
-            canvas_size[0], 
-            slider_region_height
-        ))
-        
-        # 转换为OpenCV格式
-        img = cv2.cvtColor(np.array(slider_screenshot), cv2.COLOR_RGB2BGR)
-        
-        # 转换为灰度图
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        
-        # 高斯模糊降噪
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-        
-        # 二值化，突出圆点
-        _, binary = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
-        
-        # 查找轮廓
-        contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        # 筛选圆形轮廓
-        circle_points = []
-        for contour in contours:
-            # 计算轮廓面积
-            area = cv2.contourArea(contour)
-            
-            # 计算轮廓周长
-            perimeter = cv2.arcLength(contour, True)
-            
-            # 跳过面积过小的轮廓
-            if area < 10:
-                continue
-            
-            # 计算圆形度（圆形度接近1表示越圆）
-            if perimeter > 0:
-                circularity = 4 * np.pi * area / (perimeter * perimeter)
-                
-                # 如果轮廓接近圆形且面积适中
-                if 0.5 < circularity < 1.5 and 10 < area < 100:
-                    # 获取轮廓中心
-                    M = cv2.moments(contour)
-                    if M["m00"] > 0:
-                        cx = int(M["m10"] / M["m00"])
-                        cy = int(M["m01"] / M["m00"])
-                        # 转换为屏幕坐标
-                        screen_x = canvas_top_left[0] + cx
-                        screen_y = slider_region_y + cy
-                        circle_points.append((screen_x, screen_y))
-        
-        # 如果找到的点不足5个，使用备用方法
-        if len(circle_points) < 5:
-            print(f"警告：只找到 {len(circle_points)} 个圆点，使用备用方法")
-            # 备用方法：假设滑块在画布上方居中位置，手动计算5个点的位置
-            slider_center_x = canvas_top_left[0] + canvas_size[0] // 2
-            slider_center_y = slider_region_y + slider_region_height // 2
-            slider_length = canvas_size[0] * 0.8  # 滑块长度为画布宽度的80%
-            
-            circle_points = []
-            for i in range(5):
-                # 等间距分布5个点
-                x = int(slider_center_x - slider_length // 2 + (slider_length / 4) * i)
-                y = slider_center_y
-                circle_points.append((x, y))
-        else:
-            # 按X坐标排序，确保从左到右顺序
-            circle_points.sort(key=lambda p: p[0])
-            # 只保留最左边的5个点
-            circle_points = circle_points[:5]
-        
-        # 保存检测到的滑块位置
-        with open('brush_slider_positions.txt', 'w') as f:
-            for point in circle_points:
-                f.write(f"{point[0]},{point[1]}\n")
-        
-        print(f"已检测并保存 {len(circle_points)} 个滑块圆点位置到 brush_slider_positions.txt")
-        return circle_points
-        
-    except Exception as e:
-        print(f"检测滑块位置时出错: {e}")
-        # 返回默认位置
-        default_positions = [(100, 100), (200, 100), (300, 100), (400, 100), (500, 100)]
-        return default_positions
-
 def load_brush_slider_positions():
     """
-    从内置数据加载画笔滑块位置
-    直接嵌入captured_coordinates.json的内容，避免文件读取错误
+    从当前使用的校准配置加载画笔滑块位置（从最细到最粗），配置中没有记录时使用默认位置
     """
-    try:
-        # 直接嵌入captured_coordinates.json的坐标数据
-        positions = [
-            (1453, 967),  # 画笔档位1
-            (1539, 966),  # 画笔档位2
-            (1624, 966),  # 画笔档位3
-            (1702, 966),  # 画笔档位4
-            (1785, 966)   # 画笔档位5
-        ]
-        
-        print(f"✅ 已加载{len(positions)}个画笔档位位置")
-        return positions
-    except Exception as e:
-        print(f"❌ 加载画笔滑块位置失败: {str(e)}")
-        return None
+    positions = calibration.slider_positions(calibration.get_profile())
+    print(f"✅ 已加载{len(positions)}个画笔档位位置")
+    return positions
 
-def save_brush_slider_positions(positions):
+def load_brush_widths():
     """
-    保存画笔滑块位置到文件
-    positions: [(x1, y1), (x2, y2), ..., (x5, y5)] 坐标列表
+    读取各画笔档位在屏幕上的笔迹直径（配置目录中的 brush_widths.txt，逗号分隔的5个整数），
+    文件不存在或格式不对时使用默认值
     """
-    try:
-        config_file = os.path.join(config_path, 'brush_slider_positions.txt')
-        with open(config_file, 'w') as f:
-            for point in positions:
-                f.write(f"{point[0]},{point[1]}\n")
-        print(f"✅ 已保存 {len(positions)} 个滑块位置到 {config_file}")
-        return True
-    except Exception as e:
-        print(f"❌ 保存滑块位置时出错: {e}")
-        return False
+    config_file = os.path.join(config_path, 'brush_widths.txt')
+    if os.path.exists(config_file):
+        try:
+            with open(config_file, 'r') as f:
+                widths = [int(v) for v in f.read().split(',')]
+            if len(widths) == 5:
+                return widths
+            print(f"⚠️ {config_file} 中应有5个画笔宽度，使用默认值")
+        except ValueError as e:
+            print(f"⚠️ 读取画笔宽度失败，使用默认值: {e}")
+    else:
+        print(f"⚠️ 未找到画笔宽度数据 {config_file}，填充使用估计的默认宽度 {DEFAULT_BRUSH_WIDTHS}px")
+    return list(DEFAULT_BRUSH_WIDTHS)
 
 def map_width_to_brush_size(width):
     if width <= 8:
@@ -355,34 +245,19 @@ def filter_short_paths(paths, min_points=3):
             print(f"[过滤] 路径过短 ({len(path)} 点)，已丢弃: {path[:3]}...")
     return filtered
 
-def extract_skeleton_paths(binary_img):
-    """
-    从二值图像中提取骨架路径（中心线），适用于实心笔画绘制
-    返回: [(path1), (path2), ...] 每个 path 是 [(x,y), ...]
-    """
-    # 确保输入是二值图（0 和 255），转为 0/1
-    bw = (binary_img > 0).astype(np.uint8)
-
-    # 骨架化（细化）
-    skeleton = skeletonize(bw).astype(np.uint8) * 255
-
-    # 查找骨架中的连通路径（使用 RETR_LIST + CHAIN_APPROX_NONE）
-    contours, _ = cv2.findContours(skeleton, cv2.RETR_LIST, cv2.CHAIN_APPROX_NONE)
-
+def filter_traced_paths(traced):
+    """去掉追踪结果中的单点路径和极小的毛刺"""
     paths = []
-    for contour in contours:
-        if len(contour) < 2:
+    for path in traced:
+        if len(path) < 2:
             continue
-        path = [(int(pt[0][0]), int(pt[0][1])) for pt in contour]
-        # 去除闭合环的重复终点（骨架通常是开曲线）
-        if len(path) > 2 and path[0] == path[-1]:
-            path = path[:-1]
-        
-        # 过滤极小的路径：max(x)-min(x)<1 and max(y)-min(y)<1
+
+        # 过滤极小的路径：宽和高都不超过3像素（噪点或交叉点处的毛刺）
+        # 按图拓扑追踪后横平竖直的线段是独立的边，不能再按单个方向的跨度过滤
         if len(path) > 0:
             x_coords = [pt[0] for pt in path]
             y_coords = [pt[1] for pt in path]
-            if ((max(x_coords) - min(x_coords) <= 3) and (max(y_coords) - min(y_coords) <= 3) or (max(x_coords) - min(x_coords) <= 1) or (max(y_coords) - min(y_coords) <= 1)):
+            if (max(x_coords) - min(x_coords) <= 3) and (max(y_coords) - min(y_coords) <= 3):
                 continue
                 
         paths.append(path)
@@ -390,8 +265,23 @@ def extract_skeleton_paths(binary_img):
     # 过滤短路径
     paths = filter_short_paths(paths, min_points=1)  # 至少6个点才保留
 
-    # 可选：按起始点排序
-    paths.sort(key=lambda p: (p[0][1], p[0][0]))
+    return paths
+
+def extract_skeleton_paths(binary_img, skeleton=None):
+    """
+    从二值图像中提取骨架路径（中心线），适用于实心笔画绘制
+    skeleton: 预先计算好的骨架（非零为骨架像素），为空时在这里对binary_img骨架化
+    返回: [(path1), (path2), ...] 每个 path 是 [(x,y), ...]
+    """
+    # 骨架化（细化）
+    if skeleton is None:
+        skeleton = skeletonize_binary(binary_img)
+
+    # 按骨架图的拓扑追踪路径：端点/交叉点之间的每条边只走一次，闭合环输出为单条闭合笔画
+    # （findContours 会沿1像素骨架的两侧各描一遍，导致大部分线条被重复绘制）
+    paths = filter_traced_paths(trace_skeleton_graph(skeleton))
+
+    # 绘制顺序由 stroke_order.order_strokes 在绘制前统一决定
     return paths, skeleton
 
 def switch_brush_to_size(size_index, slider_positions):
@@ -409,23 +299,20 @@ def switch_brush_to_size(size_index, slider_positions):
     target_x, target_y = slider_positions[index]
     
     try:
-        # 输出正在切换画笔的提示
-        print(f"正在切换画笔到大小档位 {size_index}")
-        # 移动到目标位置并点击
-        pyautogui.moveTo(target_x, target_y, duration=0.1)
-        pyautogui.click()
-        time.sleep(0.2)  # 等待系统响应
+        with instrument.span('brush_switch', cat='brush', level=size_index):
+            # 输出正在切换画笔的提示
+            print(f"正在切换画笔到大小档位 {size_index}")
+            # 移动到目标位置并点击
+            pyautogui.moveTo(target_x, target_y, duration=0.1)
+            pyautogui.click()
+            instrument.sleep(0.2, 'brush_settle')  # 等待系统响应
+        instrument.count('brush.switches')
         print(f"已切换到画笔大小档位 {size_index}")
         return True
     except Exception as e:
         print(f"切换画笔大小时出错: {e}")
         return False
 
-pyautogui.FAILSAFE = False
-pyautogui.PAUSE = 0.001  # 极小延迟，提升绘制速度
-
-import json
-
 def load_captured_coordinates():
     """从captured_coordinates.json加载捕获的坐标点"""
     config_file = os.path.join(config_path, 'captured_coordinates.json')
@@ -442,146 +329,109 @@ def load_captured_coordinates():
     return []
 
 def load_canvas_coordinates():
-    """从文件加载画布坐标"""
-    config_file = os.path.join(config_path, 'canvas_coordinates.txt')
-    if os.path.exists(config_file):
-        try:
-            with open(config_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                top_left = eval(lines[0].split(': ')[1])
-                size_str = lines[1].split(': ')[1]
-                width, height = map(int, size_str.split(' x '))
-                bottom_right = eval(lines[2].split(': ')[1])
-                print(f"✅ 已从{config_file}加载画布坐标")
-                return top_left, (width, height), bottom_right
-        except Exception as e:
-            print(f"从{config_file}加载坐标时出错: {e}")
-    
-    print(f"❌ 未找到有效的画布坐标文件: {config_file}")
-    return None, None, None
+    """
+    从当前使用的校准配置加载画布坐标，没有校准配置时读取旧版本的画布坐标文件
+    返回: (top_left, (width, height), bottom_right)，未找到时为 (None, None, None)
+    """
+    profile = calibration.get_profile()
+    if profile is not None:
+        left, top, width, height = calibration.canvas_rect(profile)
+        print(f"✅ 已从校准配置 '{calibration.active_profile_name()}' 加载画布坐标")
+    else:
+        rect = calibration.load_legacy_canvas()
+        if rect is None:
+            print(f"❌ 未找到有效的校准配置: {calibration.calibration_file()}，请先运行窗口检测")
+            return None, None, None
+        left, top, width, height = rect
+        print("✅ 已从旧版画布坐标文件加载画布坐标")
+    return (left, top), (width, height), (left + width, top + height)
 
-def extract_strict_strokes(image_path):
+def extract_strict_strokes(image_path, save_intermediates=False, use_cache=True, cache_bytes=DEFAULT_CACHE_BYTES,
+                           skeleton_backend=DEFAULT_SKELETON_BACKEND, workers=1, canvas_size=None, oversample=3.0,
+                           fill=None, cancelled=None):
+    """
+    从图像中提取骨架路径（中心线）和宽度信息（记录为 extract 阶段，参数见 _extract_strict_strokes）
+    返回: (strokes, binary, stroke_widths, fills, bbox)
+    """
+    with instrument.span('extract', image=os.path.basename(image_path)):
+        return _extract_strict_strokes(image_path, save_intermediates, use_cache, cache_bytes, skeleton_backend,
+                                       workers, canvas_size, oversample, fill, cancelled)
+
+def _extract_strict_strokes(image_path, save_intermediates, use_cache, cache_bytes, skeleton_backend, workers,
+                            canvas_size, oversample, fill=None, cancelled=None):
     """
     从图像中提取骨架路径（中心线）和宽度信息，将整个白色区域视为线条
-    流程：先处理原始图像得到processed_binary.png，再对其白色部分进行骨架化
+    流程：解码 -> 阈值 -> 形态学 -> 骨架化 -> 距离变换，全部在内存中完成
+    save_intermediates: 为True时把中间结果（processed_binary/skeleton/distance_transform）保存到输出目录
+    use_cache: 是否使用笔画缓存（按图像内容和参数寻址），命中时跳过全部预处理，此时返回的二值图为 None
+    cache_bytes: 缓存目录的总大小上限（字节）
+    skeleton_backend: 骨架化后端名称（见 skeletonize.SKELETON_BACKENDS）
+    workers: 骨架化的并行进程数，大图按块并行（结果与单进程相同，不影响缓存键）
+    canvas_size: 指定时先裁剪到线条范围并缩小到与画布匹配的工作分辨率再处理，返回的路径为工作分辨率坐标，
+                 宽度仍换算为原图像素；为空时按原图分辨率处理
+    oversample: 工作分辨率下每个画布像素对应的图像像素数
+    fill: 指定 (画布尺寸, fill_ratio) 时同时规划粗线填充区域（见 plan_fill_strokes），
+          复用这里的二值图和距离变换，结果与笔画一起缓存
+    cancelled: 无参回调，预处理各阶段之间返回 True 时停止提取（见 preprocess_image），此时返回空结果
+    返回: (strokes, binary, stroke_widths, fills, bbox)，fills 为 plan_fill_strokes 的结果，不填充或没有填充区域时为 None；
+          bbox 为计算画布映射用的包围盒（见 drawing_bbox），没有线条时为 None
     """
-    # 第一步：处理原始图像，生成processed_binary.png（保持原有处理逻辑）
-    # 使用numpy fromfile解决中文路径问题
-    try:
-        img_data = np.fromfile(image_path, dtype=np.uint8)
-        img = cv2.imdecode(img_data, cv2.IMREAD_COLOR)
-        if img is None:
-            print(f"❌ 无法读取图像: {image_path}")
-            return [], None, []
-    except Exception as e:
-        print(f"❌ 读取图像时发生错误: {image_path}, 错误信息: {e}")
-        return [], None, []
-    
-    # 转为灰度图
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    
-    # 使用OTSU阈值自动确定最佳阈值
-    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
-    
-    # 更强的开运算（去除小噪点）
-    kernel_open = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
-    binary = cv2.morphologyEx(binary, cv2.MORPH_OPEN, kernel_open)
-    
-    # 再做一次闭运算（连接断裂但重要的线条）
-    kernel_close = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (2, 2))
-    binary = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel_close)
-    
-    # 设置面积阈值，过滤掉特别小的细节部分
-    min_area_threshold = 3  # 像素面积阈值
-    
-    # 使用更强的形态学开运算过滤小区域（先腐蚀后膨胀）
-    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
-    filtered_binary = cv2.morphologyEx(binary, cv2.MORPH_OPEN, kernel)
-    
-    # 计算过滤掉的像素数量
-    total_white_pixels = cv2.countNonZero(binary)
-    filtered_white_pixels = cv2.countNonZero(filtered_binary)
-    small_contours_count = total_white_pixels - filtered_white_pixels
-    
-    # 打印过滤信息
-    print(f"已过滤 {small_contours_count} 个过小的细节轮廓（面积小于{min_area_threshold}像素）")
-    
-    # 保存processed_binary.png（这是处理后的二值图像）到临时目录
-    try:
-        # 使用临时目录存储处理后的文件
-        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as temp_file:
-            temp_path = temp_file.name
-        
-        success, encoded_img = cv2.imencode('.png', filtered_binary)
-        if success:
-            encoded_img.tofile(temp_path)
-            print(f"✅ 已生成 processed_binary.png")
-        else:
-            print(f"❌ 保存 processed_binary.png 失败")
-            os.unlink(temp_path)
-            return [], None, []
-    except Exception as e:
-        print(f"❌ 保存 processed_binary.png 时发生错误: {e}")
-        if 'temp_path' in locals() and os.path.exists(temp_path):
-            os.unlink(temp_path)
-        return [], None, []
-    
-    # 第二步：读取processed_binary.png，并对其白色部分进行骨架化处理
-    # 使用numpy fromfile解决中文路径问题
-    try:
-        processed_img_data = np.fromfile(temp_path, dtype=np.uint8)
-        processed_img = cv2.imdecode(processed_img_data, cv2.IMREAD_GRAYSCALE)
-        os.unlink(temp_path)  # 读取后删除临时文件
-        if processed_img is None:
-            print(f"❌ 无法读取 processed_binary.png")
-            return [], None, []
-    except Exception as e:
-        print(f"❌ 读取 processed_binary.png 时发生错误: {e}")
-        return [], None, []
-    
-    # 确保图像是二值化的
-    _, processed_binary = cv2.threshold(processed_img, 127, 255, cv2.THRESH_BINARY)
-    
+    # 影响提取结果的参数，作为缓存键的一部分
+    params = {'tracer': 'skeleton_graph', 'skeleton': skeleton_backend}
+    if canvas_size:
+        params.update({'canvas': list(canvas_size), 'oversample': oversample})
+    brush_widths = None
+    if fill:
+        brush_widths = load_brush_widths()
+        params['fill'] = {'canvas': list(fill[0]), 'ratio': fill[1], 'brush_widths': brush_widths}
+    key = None
+    if use_cache:
+        try:
+            key = cache_key(image_path, params)
+            cached = load_strokes(cache_path, key)
+        except OSError as e:
+            print(f"⚠️ 无法计算缓存键，跳过缓存: {e}")
+            cached = None
+        if cached is not None:
+            strokes, stroke_widths, fills, bbox = cached
+            print(f"✅ 命中笔画缓存，跳过预处理: {len(strokes)} 条路径")
+            instrument.count('cache.hit')
+            return strokes, None, stroke_widths, fills, bbox
+
+    if key is not None:
+        instrument.count('cache.miss')
+    ensure_directories()
+    timings = {}
+    stages = preprocess_image(image_path, timings, save_dir=output_path if save_intermediates else None,
+                              skeleton_backend=skeleton_backend, workers=workers, canvas_size=canvas_size,
+                              oversample=oversample, cancelled=cancelled)
+    if stages is None:
+        return [], None, [], None, None
+    binary = stages['binary']
+
     # 获取骨架路径（中心线）- 将整个白色区域视为线条
-    strokes, skeleton = extract_skeleton_paths(processed_binary)
+    with timed_stage(timings, 'trace'):
+        strokes, skeleton = extract_skeleton_paths(stages['filtered'], skeleton=stages['skeleton'])
+
+    # 估算每条路径的宽度（使用距离变换，批量取值并按路径归约）
+    with timed_stage(timings, 'width'):
+        width_stats = estimate_stroke_widths(strokes, stages['distance'])
+        # 宽度换算回原图像素，画笔档位的划分与处理分辨率无关
+        stroke_widths = np.maximum(1, (width_stats['mean'] / stages['scale']).astype(np.int32)).tolist()
 
-    # 估算每条路径的宽度（使用距离变换）
-    dist_transform = cv2.distanceTransform(processed_binary, cv2.DIST_L2, 5)
-    stroke_widths = []
-    
     # 打印骨架信息
     print(f"找到 {len(strokes)} 条骨架路径")
-    
-    for i, path in enumerate(strokes):
-        widths = []
-        for x, y in path:
-            if 0 <= x < dist_transform.shape[1] and 0 <= y < dist_transform.shape[0]:
-                widths.append(int(dist_transform[y, x] * 2))  # 直径 = 2 * 半径
-        
-        avg_width = max(1, int(np.mean(widths))) if widths else 1
-        stroke_widths.append(avg_width)
-        
-        # 调试信息
-        if i < 5 or i % 50 == 0:  # 只打印部分路径信息
-            print(f"路径 {i}: 点数={len(path)}, 平均宽度={avg_width}px")
 
-    # 保存中间结果用于调试
-    try:
-        success, encoded_img = cv2.imencode('.png', skeleton)
-        if success:
-            encoded_img.tofile(os.path.join(output_path, 'skeleton.png'))
-        
-        success, encoded_img = cv2.imencode('.png', (dist_transform * 10).astype(np.uint8))
-        if success:
-            encoded_img.tofile(os.path.join(output_path, 'distance_transform.png'))
-    except Exception as e:
-        print(f"❌ 保存中间结果时发生错误: {e}")
-    
-    # 保存笔画宽度信息
-    stroke_widths_path = os.path.join(config_path, 'stroke_widths.txt')
-    with open(stroke_widths_path, 'w') as f:
-        for width in stroke_widths:
-            f.write(f"{width}\n")
+    # 调试信息：只打印部分路径信息
+    for i in list(range(min(5, len(strokes)))) + list(range(50, len(strokes), 50)):
+        print(f"路径 {i}: 点数={len(strokes[i])}, 平均宽度={stroke_widths[i]}px, "
+              f"中位宽度={width_stats['median'][i] / stages['scale']:.0f}px, "
+              f"最大宽度={width_stats['max'][i] / stages['scale']:.0f}px")
+
+    # 保存笔画宽度信息（调试用，后台写入）
+    if debug_artifacts.enabled(debug_artifacts.DEBUG_BASIC):
+        debug_artifacts.save_text(os.path.join(config_path, 'stroke_widths.txt'),
+                                  ''.join(f"{width}\n" for width in stroke_widths))
     
     # 统计宽度范围
     if stroke_widths:
@@ -592,16 +442,111 @@ def extract_strict_strokes(image_path):
     
     print(f"✅ 提取 {len(strokes)} 条中心线路径，支持实心绘制")
     print(f"笔画宽度范围: 最小={min_width}px, 最大={max_width}px")
-    return strokes, binary, stroke_widths
+    print(f"预处理耗时: {format_timings(timings)}")
 
-def draw_on_canvas(traced_paths, canvas_top_left, canvas_size, stroke_widths=None, scale_factor=1.0):
-    """在画布上逐条绘制笔触，根据线条宽度自动切换画笔大小"""
-    global should_exit, is_paused
-    screen_width, screen_height = pyautogui.size()
-    safe_margin = 30
-    
+    # 填充规划与 build_plan 使用同一个画布缩放因子；只有实心区域（骨架被当作噪点去掉）时也要规划填充
+    bbox = drawing_bbox(paths_bbox(strokes), stages['filtered'] if fill else None)
+    fills = None
+    if fill and bbox is not None:
+        canvas_scale = transform_for_bbox(*bbox, fill[0])[2]
+        fills = plan_fill_strokes(stages['filtered'], stages['scale'], canvas_scale, brush_widths, fill[1],
+                                  max_diameter=2 * float(stages['distance'].max()))
+
+    if key is not None:
+        save_strokes(cache_path, key, strokes, stroke_widths, cache_bytes, fills=fills, bbox=bbox)
+    return strokes, binary, stroke_widths, fills, bbox
+
+def compute_canvas_transform(traced_paths, canvas_size):
+    """
+    根据路径包围盒计算图像坐标到画布坐标的映射（居中并留出10%边距）
+    返回: (min_x, min_y, scale_factor, offset_x, offset_y)
+    """
+    return transform_for_bbox(*paths_bbox(traced_paths), canvas_size)
+
+def paths_bbox(paths):
+    """路径的包围盒 (min_x, min_y, max_x, max_y)，没有路径时返回 None"""
+    if not paths:
+        return None
+    # 每条路径拆成x、y两个元组后用内置 min/max 求范围，只遍历一遍
+    min_x = min_y = float('inf')
+    max_x = max_y = float('-inf')
+    for path in paths:
+        xs, ys = zip(*path)
+        min_x, max_x = min(min_x, min(xs)), max(max_x, max(xs))
+        min_y, max_y = min(min_y, min(ys)), max(max_y, max(ys))
+    return min_x, min_y, max_x, max_y
+
+def drawing_bbox(bbox, filtered=None):
+    """
+    计算画布映射用的包围盒：中心线的包围盒 bbox，填充时（filtered 为预处理后的二值图）再并上整个前景的范围，
+    排线会铺到实心区域的边缘，只有实心区域时骨架也可能全部被当作噪点去掉
+    都为空时返回 None
+    """
+    if filtered is None:
+        return bbox
+    x, y, w, h = cv2.boundingRect((filtered > 0).astype(np.uint8))
+    if w == 0 or h == 0:
+        return bbox
+    if bbox is None:
+        return x, y, x + w - 1, y + h - 1
+    return min(bbox[0], x), min(bbox[1], y), max(bbox[2], x + w - 1), max(bbox[3], y + h - 1)
+
+def transform_for_bbox(min_x, min_y, max_x, max_y, canvas_size):
+    """按图像坐标包围盒计算到画布坐标的映射（见 compute_canvas_transform）"""
+    # 计算图像实际宽度和高度
+    img_width = max_x - min_x
+    img_height = max_y - min_y
+
+    canvas_width, canvas_height = canvas_size
+
+    # 计算缩放因子
+    scale_x = canvas_width / img_width if img_width > 0 else 1
+    scale_y = canvas_height / img_height if img_height > 0 else 1
+    scale_factor = min(scale_x, scale_y) * 0.9
+
+    # 计算偏移量
+    offset_x = (canvas_width - img_width * scale_factor) // 2
+    offset_y = (canvas_height - img_height * scale_factor) // 2
+
+    print(f"图像范围: X({min_x}-{max_x}), Y({min_y}-{max_y})")
+    return min_x, min_y, scale_factor, offset_x, offset_y
+
+def extend_path_for_canvas(path):
+    """绘制前扩展过短路径，确保在画布上可见（点路径返回空列表）"""
+    return extend_short_path(path, threshold=20, target_length=23)
+
+def map_path_to_canvas(path, canvas_top_left, canvas_size, transform):
+    """按 compute_canvas_transform 的结果把图像坐标路径映射到屏幕坐标，并限制在画布范围内"""
+    min_x, min_y, scale_factor, offset_x, offset_y = transform
+    canvas_width, canvas_height = canvas_size
+    scaled_path = []
+    for p in path:
+        # 映射到画布坐标
+        x = int(canvas_top_left[0] + offset_x + (p[0] - min_x) * scale_factor)
+        y = int(canvas_top_left[1] + offset_y + (p[1] - min_y) * scale_factor)
+
+        # 确保坐标在安全范围内
+        x = max(canvas_top_left[0], min(x, canvas_top_left[0] + canvas_width - 1))
+        y = max(canvas_top_left[1], min(y, canvas_top_left[1] + canvas_height - 1))
+
+        scaled_path.append((x, y))
+    return scaled_path
+
+def draw_on_canvas(traced_paths, canvas_top_left, canvas_size, stroke_widths=None, scale_factor=1.0, transform=None,
+                   backend=None, brush_levels=None, initial_brush_size=1, control=None, on_stroke=None):
+    """
+    在画布上逐条绘制笔触，根据线条宽度自动切换画笔大小
+    backend: 鼠标输入后端（见 input_backend），为空时使用默认速率的 pyautogui 后端
+    brush_levels: 每条笔画的画笔档位（如来自绘制计划），为空时由宽度映射得到
+    initial_brush_size: 开始绘制时画笔所在的档位（连续多次绘制时传入上一次结束时的档位）
+    control: 暂停/取消控制（见 draw_control），默认为进程内共用的实例
+    on_stroke: 每条笔画画完（抬笔）后以笔画序号调用，用于记录续画进度
+    返回: {'completed': 是否完整绘制（未被用户中断）, 'brush_size': 结束时的画笔档位}
+    """
+    if control is None:
+        control = default_control
     # 初始化画笔大小
-    current_brush_size = 1
+    current_brush_size = initial_brush_size
     slider_positions = None
     
     # 加载已保存的滑块位置（从最细到最粗的画笔坐标）
@@ -612,71 +557,59 @@ def draw_on_canvas(traced_paths, canvas_top_left, canvas_size, stroke_widths=Non
         print("已成功加载5个画笔档位位置，按最细到最粗顺序使用")
     else:
         print("警告：未找到有效滑块位置或位置数量不正确")
-        print("请确保brush_slider_positions.txt文件包含5个坐标，顺序为最细到最粗")
-    
-    # 计算缩放因子和偏移
-    min_x = min(min(p[0] for p in path) for path in traced_paths)
-    min_y = min(min(p[1] for p in path) for path in traced_paths)
-    max_x = max(max(p[0] for p in path) for path in traced_paths)
-    max_y = max(max(p[1] for p in path) for path in traced_paths)
-    
-    # 计算图像实际宽度和高度
-    img_width = max_x - min_x
-    img_height = max_y - min_y
+        print("请运行窗口检测重新校准画笔滑块位置")
     
+    # 计算缩放因子和偏移（可由调用方预先计算，保证与简化阶段使用同一缩放因子）
+    if transform is None:
+        transform = compute_canvas_transform(traced_paths, canvas_size)
+    min_x, min_y, scale_factor, offset_x, offset_y = transform
+
     canvas_width, canvas_height = canvas_size
-    
-    # 计算缩放因子
-    scale_x = canvas_width / img_width if img_width > 0 else 1
-    scale_y = canvas_height / img_height if img_height > 0 else 1
-    scale_factor = min(scale_x, scale_y) * 0.9
-    
-    # 计算偏移量
-    offset_x = (canvas_width - img_width * scale_factor) // 2
-    offset_y = (canvas_height - img_height * scale_factor) // 2
-    
+
     # 打印调试信息
-    print(f"图像范围: X({min_x}-{max_x}), Y({min_y}-{max_y})")
     print(f"画布位置: 左上角({canvas_top_left[0]}, {canvas_top_left[1]})")
     print(f"缩放因子: {scale_factor:.4f}")
     print(f"偏移量: X={offset_x}, Y={offset_y}")
     
     # 启动键盘监听，使用非阻塞模式
-    print("提示: 按ESC键随时中断绘制过程")
-    listener = keyboard.Listener(on_press=on_press)
-    listener.daemon = True  # 设置为守护进程，主程序结束时自动停止
-    listener.start()
+    print("提示: 按ESC键随时中断绘制过程，按空格键暂停/继续")
+    listener = start_keyboard_listener(control)
     
     # 给监听器一些初始化时间
-    time.sleep(0.1)
+    instrument.sleep(0.1, 'listener_start')
 
+    # 流式绘制时（traced_paths 为 StrokeStream）笔画总数在提取完成前未知
+    total_paths = len(traced_paths) if hasattr(traced_paths, '__len__') else None
     print("正在绘制... 请等待...")
-    print(f"准备绘制 {len(traced_paths)} 条笔触")
-    time.sleep(1)
+    if total_paths is not None:
+        print(f"准备绘制 {total_paths} 条笔触")
+    instrument.sleep(1, 'draw_start')
 
-    total_paths = len(traced_paths)
+    draw_start = time.perf_counter()
     drawn_paths = 0
-    total_points = sum(len(path) for path in traced_paths)
+    total_points = sum(len(path) for path in traced_paths) if total_paths is not None else None
     drawn_points = 0
 
     pen_is_down = False  # 初始状态：笔是抬起的
-    
-    # 为不同粗细线条优化的移动参数（已提速）
-    thin_line_delay = 0.001  # 细线条使用更快的速度
-    medium_line_delay = 0.002  # 中等线条速度
-    thick_line_delay = 0.003  # 粗线条使用更快的速度
-    
+
+    # 画笔切换统计
+    brush_switches = 0
+    brush_switch_time = 0.0
+
+    # 所有鼠标事件都通过输入后端按统一的速率发送
+    if backend is None:
+        backend = create_input_backend('pyautogui')
+    # 每段点数，段与段之间检查一次暂停/取消
+    chunk = chunk_size(backend)
+
     for path_idx, path in enumerate(traced_paths):
-        if should_exit:
-            break
-            
-        # 检查是否暂停
-        while is_paused:
-            if should_exit:
+        # 笔画之间笔是抬起的，暂停时直接等待
+        if control.interrupted():
+            pause_start = time.perf_counter()
+            if not control.wait_while_paused():
                 break
-            time.sleep(0.1)
-        if should_exit:
-            break
+            instrument.add_span('paused', pause_start, time.perf_counter() - pause_start, cat='sleep')
+            backend.resync()
             
         # 获取当前笔画的宽度
         width = 1  # 默认宽度
@@ -684,7 +617,10 @@ def draw_on_canvas(traced_paths, canvas_top_left, canvas_size, stroke_widths=Non
             width = stroke_widths[path_idx]
         
         # 映射宽度到画笔大小档位
-        target_brush_size = map_width_to_brush_size(width)
+        if brush_levels is not None and path_idx < len(brush_levels):
+            target_brush_size = int(brush_levels[path_idx])
+        else:
+            target_brush_size = map_width_to_brush_size(width)
         
         # 切换画笔大小（如果需要）- 优先处理宽度变化
         if target_brush_size != current_brush_size and slider_positions:
@@ -692,45 +628,38 @@ def draw_on_canvas(traced_paths, canvas_top_left, canvas_size, stroke_widths=Non
             print("正在切换画笔大小")
             # 确保笔是抬起的状态
             if pen_is_down:
-                pyautogui.mouseUp(button='left')
+                backend.release()
                 pen_is_down = False
-                time.sleep(0.02)
+                instrument.sleep(0.02, 'pen_up')
             # 切换画笔大小
+            switch_start = time.perf_counter()
             switch_brush_to_size(target_brush_size, slider_positions)
+            brush_switch_time += time.perf_counter() - switch_start
+            brush_switches += 1
             current_brush_size = target_brush_size
+            backend.resync()
             print(f"画笔大小已切换到档位 {current_brush_size}")
             # 切换后不立即移动，因为后面会专门移动到绘制起点
         
-        # 根据线条宽度选择延迟参数
+        # 线条类型（仅用于调试输出，移动速度统一由输入后端的事件速率控制）
         if width <= 2:
-            current_delay = thin_line_delay
             line_type = "极细线条"
         elif width <= 7:
-            current_delay = medium_line_delay
             line_type = "中等线条"
         else:
-            current_delay = thick_line_delay
             line_type = "粗线条"
         
         # 扩展过短路径，确保在画布上可见
-        extended_path = extend_short_path(path, threshold=20, target_length=23)
+        extended_path = extend_path_for_canvas(path)
         
         # 如果是点路径（空列表），直接跳过绘制
         if not extended_path:
+            if on_stroke is not None:
+                on_stroke(path_idx)
             continue
         
         # 转换坐标
-        scaled_path = []
-        for p in extended_path:
-            # 映射到画布坐标
-            x = int(canvas_top_left[0] + offset_x + (p[0] - min_x) * scale_factor)
-            y = int(canvas_top_left[1] + offset_y + (p[1] - min_y) * scale_factor)
-            
-            # 确保坐标在安全范围内
-            x = max(canvas_top_left[0], min(x, canvas_top_left[0] + canvas_width - 1))
-            y = max(canvas_top_left[1], min(y, canvas_top_left[1] + canvas_height - 1))
-            
-            scaled_path.append((x, y))
+        scaled_path = map_path_to_canvas(extended_path, canvas_top_left, canvas_size, transform)
         
         # 输出第一个点的坐标用于调试
         if path_idx == 0:
@@ -738,61 +667,72 @@ def draw_on_canvas(traced_paths, canvas_top_left, canvas_size, stroke_widths=Non
         
         # 确保笔是抬起的状态 - 加强状态管理
         if pen_is_down:
-            pyautogui.mouseUp(button='left')  # 明确指定左键抬笔
+            backend.release()  # 抬笔
             pen_is_down = False
-            time.sleep(0.02)  # 增加延迟确保抬笔完全生效
+            instrument.sleep(0.02, 'pen_up')  # 增加延迟确保抬笔完全生效
         
         # 确保当前鼠标位置不是在点击状态
-        # 抬笔状态下移动到起点 - 使用更快的移动
-        pyautogui.moveTo(scaled_path[0][0], scaled_path[0][1], duration=0.02)  # 更快移动
-        time.sleep(0.005)  # 减少延迟
+        # 抬笔状态下直接跳到起点（单个事件，不做补间移动）
+        stroke_start = time.perf_counter()
+        backend.move(scaled_path[0][0], scaled_path[0][1])
+        instrument.sleep(0.005, 'pen_move')  # 减少延迟
         
         # 调试信息
         if path_idx < 5 or path_idx % 50 == 0:
             print(f"绘制笔触 {path_idx+1}: 点数={len(path)}, 宽度={width}px, 画笔档位={current_brush_size}, 类型={line_type}")
         
         # 落笔开始绘制 - 确保只在起点位置进行一次点击
-        pyautogui.mouseDown(button='left')  # 明确指定左键
+        backend.press()
         pen_is_down = True
-        time.sleep(0.01)  # 给一个极小延迟确保点击状态稳定
+        instrument.sleep(0.01, 'pen_down')  # 给一个极小延迟确保点击状态稳定
+        backend.resync()
 
-        # 绘制整条路径 - 根据线条类型调整速度（已提速）
-        for x, y in scaled_path[1:]:
-            # 在每次移动前检查是否应该退出
-            if check_exit_condition():
-                break
-                
-            # 检查是否暂停
-            while is_paused:
-                if check_exit_condition():
+        # 绘制整条路径 - 速率由输入后端的调度器控制，每段之间检查一次暂停/取消
+        for start in range(1, len(scaled_path), chunk):
+            if control.interrupted():
+                # 先抬笔，避免暂停期间拖动鼠标产生线条；继续时从当前点重新落笔
+                backend.release()
+                pen_is_down = False
+                pause_start = time.perf_counter()
+                if not control.wait_while_paused():
                     break
-                time.sleep(0.1)
-            if check_exit_condition():
-                break
-                
-            # 使用更精确的移动方法
-            pyautogui.moveTo(x, y, duration=current_delay*0.3)  # 进一步缩短移动时间
-            drawn_points += 1
-            if drawn_points % 1000 == 0:
-                print(f"已绘制点: {drawn_points}/{total_points}")
-                
-        # 再次检查是否应该退出
-        if check_exit_condition():
+                instrument.add_span('paused', pause_start, time.perf_counter() - pause_start, cat='sleep')
+                backend.resync()
+                backend.move(*scaled_path[start - 1])
+                backend.press()
+                pen_is_down = True
+            for x, y in scaled_path[start:start + chunk]:
+                backend.move(x, y)
+            reported = drawn_points // 1000
+            drawn_points += len(scaled_path[start:start + chunk])
+            if drawn_points // 1000 != reported:
+                print(f"已绘制点: {drawn_points}/{total_points or '?'}")
+
+        # 取消时笔已在上面抬起
+        if control.is_cancelled():
             break
 
         # 绘制完成，抬笔
-        pyautogui.mouseUp(button='left')
+        backend.release()
         pen_is_down = False
+        instrument.add_span('stroke', stroke_start, time.perf_counter() - stroke_start, cat='stroke',
+                            index=path_idx, points=len(scaled_path), level=current_brush_size)
         
         # 每个笔画之间的等待时间根据线条宽度调整（已大幅缩短）
         if width <= 2:
-            time.sleep(0.05)  # 细线条之间更短的间隔
+            instrument.sleep(0.05, 'inter_stroke')  # 细线条之间更短的间隔
         elif width <= 7:
-            time.sleep(0.08)  # 中等线条更短的间隔
+            instrument.sleep(0.08, 'inter_stroke')  # 中等线条更短的间隔
         else:
-            time.sleep(0.1)  # 粗线条更短的间隔
+            instrument.sleep(0.1, 'inter_stroke')  # 粗线条更短的间隔
 
         drawn_paths += 1
+        if on_stroke is not None:
+            on_stroke(path_idx)
+        if total_paths is None:
+            if drawn_paths % 100 == 0:
+                print(f"进度: 已画 {drawn_paths} 条笔触（仍在提取）")
+            continue
         progress = int(drawn_paths / total_paths * 100)
         if progress % 5 == 0 or drawn_paths == total_paths:
             print(f"进度: {progress}% ({drawn_paths}/{total_paths} 条笔触)")
@@ -802,36 +742,376 @@ def draw_on_canvas(traced_paths, canvas_top_left, canvas_size, stroke_widths=Non
         listener.stop()
         listener.join(timeout=1.0)  # 等待监听器线程结束
     
-    # 确保鼠标抬起
-    pyautogui.mouseUp()
+    # 确保鼠标抬起（通过所选的输入后端，不使用 pyautogui 的后端不必加载它）
+    backend.release()
     
     # 根据退出状态显示不同信息
-    if should_exit:
+    completed = not control.is_cancelled()
+    if not completed:
         print(f"\n🔴 程序已被用户中断！已处理 {drawn_points} 个像素点")
-        print(f"已完成 {drawn_paths}/{total_paths} 条笔触 (约 {int(drawn_paths/total_paths*100)}%)")
+        if total_paths:
+            print(f"已完成 {drawn_paths}/{total_paths} 条笔触 (约 {int(drawn_paths/total_paths*100)}%)")
+        else:
+            print(f"已完成 {drawn_paths} 条笔触")
     else:
         print(f"\n✅ 绘制完成！总共处理 {drawn_points} 个像素点")
-        print("查看生成的contours_visualization.png和processed_binary.png以检查细节提取效果")
-    
-    # 重置退出和暂停标志，确保下次运行正常
-    should_exit = False
-    is_paused = False
+        print("如需检查细节提取效果，可使用 --save-intermediates 保存中间结果")
+    print(f"画笔切换: {brush_switches} 次，耗时 {brush_switch_time:.2f}s")
+    backend_stats = backend.stats()
+    instrument.add_span('draw', draw_start, time.perf_counter() - draw_start, strokes=drawn_paths)
+    instrument.record_backend(backend_stats)
+    instrument.count('draw.strokes', drawn_paths)
+    instrument.count('draw.points', drawn_points)
+    print(f"输入后端[{backend.name}]: {backend_stats['events']} 个事件，"
+          f"实际速率 {backend_stats['rate']:.0f} 事件/秒，调度等待 {backend_stats['sleep']:.2f}s")
+
+    return {'completed': completed, 'brush_size': current_brush_size}
+
+def estimate_draw_time(traced_paths, stroke_widths, brush_levels, events_per_second=1000, initial_brush_size=1):
+    """
+    按 draw_on_canvas 的事件数和固定等待时间预估绘制耗时（秒），不移动鼠标
+    返回: {'total', 'events', 'event_time', 'sleep_time', 'brush_switches'}
+    """
+    events = 0
+    sleep_time = 1.1  # 启动键盘监听和开始绘制前的等待
+    switches = 0
+    current = initial_brush_size
+    for idx, path in enumerate(traced_paths):
+        extended = extend_path_for_canvas(path)
+        if not extended:
+            continue
+        level = int(brush_levels[idx]) if brush_levels is not None else map_width_to_brush_size(stroke_widths[idx])
+        if level != current:
+            switches += 1
+            sleep_time += 0.3  # 滑块补间移动0.1s + 等待系统响应0.2s
+            current = level
+        width = stroke_widths[idx] if stroke_widths else 1
+        # 跳到起点 + 落笔 + 逐点移动 + 抬笔
+        events += len(extended) + 2
+        sleep_time += 0.015 + (0.05 if width <= 2 else 0.08 if width <= 7 else 0.1)
+    event_time = events / events_per_second if events_per_second > 0 else 0.0
+    return {'total': event_time + sleep_time, 'events': events, 'event_time': event_time,
+            'sleep_time': sleep_time, 'brush_switches': switches}
+
+def draw_and_verify(strokes, canvas_top_left, canvas_size, stroke_widths, transform, backend, brush_levels,
+                    rounds=1, coverage_threshold=0.8, initial_brush_size=1, on_stroke=None):
+    """
+    绘制后截图校验：把截图与绘制计划的栅格化结果对齐，找出缺失或不完整的笔画，
+    只重绘这些笔画，最多重复 rounds 轮（on_stroke 只用于第一遍绘制）
+    """
+    # 绘制前先截取画布作为基准，已有的内容不会被误认为是本次绘制的结果
+    baseline = capture_canvas(canvas_top_left, canvas_size)
+    result = draw_on_canvas(strokes, canvas_top_left, canvas_size, stroke_widths, transform=transform,
+                            backend=backend, brush_levels=brush_levels, initial_brush_size=initial_brush_size,
+                            on_stroke=on_stroke)
+
+    # 与实际绘制时相同的坐标，换算为相对画布左上角
+    canvas_paths = []
+    for path in strokes:
+        extended = extend_path_for_canvas(path) or path[:1]
+        canvas_paths.append([(x - canvas_top_left[0], y - canvas_top_left[1])
+                             for x, y in map_path_to_canvas(extended, canvas_top_left, canvas_size, transform)])
+
+    pending = list(range(len(strokes)))
+    for round_idx in range(1, rounds + 1):
+        if not result['completed']:
+            print("⚠️ 绘制被中断，跳过截图校验")
+            return result
+        instrument.sleep(0.3, 'verify_settle')  # 等待画布刷新
+        capture = capture_canvas(canvas_top_left, canvas_size)
+        missing, coverage = find_missing_strokes([canvas_paths[i] for i in pending], capture, baseline,
+                                                 coverage_threshold=coverage_threshold)
+        if not missing:
+            print(f"✅ 第 {round_idx} 轮校验: 所有笔画均已完整绘制")
+            return result
+        avg = sum(coverage) / len(coverage)
+        pending = [pending[i] for i in missing]
+        print(f"⚠️ 第 {round_idx} 轮校验: {len(pending)} 条笔画缺失或不完整（平均覆盖率 {avg:.0%}），重新绘制")
+        result = draw_on_canvas([strokes[i] for i in pending], canvas_top_left, canvas_size,
+                                [stroke_widths[i] for i in pending] if stroke_widths else None, transform=transform, backend=backend,
+                                brush_levels=[brush_levels[i] for i in pending] if brush_levels is not None else None,
+                                initial_brush_size=result['brush_size'])
+
+    if result['completed']:
+        capture = capture_canvas(canvas_top_left, canvas_size)
+        missing, _ = find_missing_strokes([canvas_paths[i] for i in pending], capture, baseline,
+                                          coverage_threshold=coverage_threshold)
+        if missing:
+            print(f"⚠️ 校验 {rounds} 轮后仍有 {len(missing)} 条笔画未完整绘制")
+        else:
+            print("✅ 重绘后所有笔画均已完整绘制")
+    return result
+
+def build_plan(image_path, canvas_size, args, control=None):
+    """
+    提取并规划绘制：提取笔画 -> 确定画布缩放 -> 简化路径 -> 排序笔画
+    control: 绘制的暂停/取消控制（见 draw_control），取消后在预处理的下一个阶段之间停止
+    返回: (strokes, stroke_widths, brush_levels, transform)，未找到有效线条或已取消时返回 None
+    """
+    print(f"处理图像: {image_path}")
+
+    # 高效处理图像并提取笔触和宽度信息
+    strokes, binary, stroke_widths, fills, bbox = extract_strict_strokes(
+        image_path, save_intermediates=args.save_intermediates, use_cache=not args.no_cache,
+        cache_bytes=int(args.cache_size_mb * 1024 * 1024), skeleton_backend=args.skeleton_backend,
+        workers=args.workers, canvas_size=None if args.full_resolution else canvas_size,
+        oversample=args.oversample, fill=(canvas_size, args.fill_ratio) if args.fill else None,
+        cancelled=control.is_cancelled if control is not None else None)
+
+    if control is not None and control.is_cancelled():
+        print("🔴 规划已取消")
+        return None
+    if len(strokes) == 0 and fills is None:
+        print("未找到有效线条！")
+        return None
+
+    # 先确定画布缩放因子，再按屏幕像素容差简化路径（缩放后重合或共线的点不必逐个移动）
+    transform = transform_for_bbox(*bbox, canvas_size)
+    levels = [map_width_to_brush_size(w) for w in stroke_widths]
+
+    # 大块实心区域改用粗画笔排线填充，区域内的中心线不再绘制（填充在提取时规划）
+    if fills is not None:
+        fill_strokes, fill_widths, fill_levels, filled = fills
+        strokes, stroke_widths = remove_filled_points(strokes, stroke_widths, filled)
+        levels = [map_width_to_brush_size(w) for w in stroke_widths] + fill_levels
+        strokes = strokes + fill_strokes
+        stroke_widths = stroke_widths + fill_widths
+
+    strokes, _, _ = simplify_paths(strokes, args.simplify_tolerance, transform[2])
+
+    strokes, stroke_widths, levels = order_for_drawing(strokes, stroke_widths, levels, args,
+                                                       args.order_time_budget, start_point=transform[:2])
+    return strokes, stroke_widths, levels, transform
+
+def order_for_drawing(strokes, stroke_widths, levels, args, time_budget, start_point, initial_level=1):
+    """
+    重新排列笔画顺序（可反转方向），减少笔画之间的抬笔移动
+    按画笔档位分组时（args.brush_batch），同档位笔画连续绘制，切换次数不超过档位种类数
+    返回: (strokes, stroke_widths, levels) 排序后的结果
+    """
+    if args.brush_batch:
+        strokes, order = order_strokes_by_brush(strokes, levels, time_budget, start_point=start_point,
+                                                initial_level=initial_level)
+    else:
+        strokes, order = order_strokes(strokes, time_budget, start_point=start_point)
+    return strokes, [stroke_widths[i] for i in order], [levels[i] for i in order]
+
+def skeleton_bbox(skeleton):
+    """
+    骨架的包围盒 (min_x, min_y, max_x, max_y)，不计宽和高都不超过3像素的孤立小块
+    （其中的路径都会被 filter_traced_paths 去掉，与 compute_canvas_transform 的结果保持一致）
+    没有线条时返回 None
+    """
+    _, _, stats, _ = cv2.connectedComponentsWithStats((skeleton > 0).astype(np.uint8), connectivity=8)
+    stats = stats[1:]
+    stats = stats[(stats[:, cv2.CC_STAT_WIDTH] > 4) | (stats[:, cv2.CC_STAT_HEIGHT] > 4)]
+    if len(stats) == 0:
+        return None
+    x, y = stats[:, 0], stats[:, 1]
+    return (int(x.min()), int(y.min()), int((x + stats[:, 2]).max()) - 1, int((y + stats[:, 3]).max()) - 1)
+
+def stream_plan(image_path, canvas_size, args, first_batch=FIRST_STREAM_BATCH, batch_size=STREAM_BATCH):
+    """
+    流式规划（在 stroke_stream 的后台进程中运行）：预处理后先由骨架的包围盒（填充时并上前景范围，见 drawing_bbox）
+    确定画布映射并产出，
+    之后按连通域（从上到下）追踪，每批估算宽度、简化和排序后产出；第一批只取最先追踪到的 first_batch 条，
+    尽快开始绘制，之后每批至少 batch_size 条。画笔分组和排序只在批内进行。
+    填充区域在后台线程中规划，第一批不等待（其中落在填充区域内的中心线照常绘制，之后被排线覆盖），
+    填充排线放在最后一批
+    产出: 先产出 transform（没有线条时为 None 并结束），之后每批产出 (strokes, stroke_widths, brush_levels)
+    """
+    print(f"处理图像（流式）: {image_path}")
+    ensure_directories()
+    timings = {}
+    stages = preprocess_image(image_path, timings, save_dir=output_path if args.save_intermediates else None,
+                              skeleton_backend=args.skeleton_backend, workers=args.workers,
+                              canvas_size=None if args.full_resolution else canvas_size, oversample=args.oversample)
+    bbox = None
+    if stages is not None:
+        bbox = drawing_bbox(skeleton_bbox(stages['skeleton']), stages['filtered'] if args.fill else None)
+    if bbox is None:
+        yield None
+        return
+    print(f"预处理耗时: {format_timings(timings)}")
+
+    # 画布映射在追踪前确定，后面每批笔画都用同一个缩放因子简化
+    transform = transform_for_bbox(*bbox, canvas_size)
+    yield transform
+
+    # 填充规划主要是大核的形态学运算（OpenCV 运算期间释放 GIL），与路径追踪并行
+    pending_fills = None
+    fills = None
+    if args.fill:
+        executor = ThreadPoolExecutor(max_workers=1)
+        pending_fills = executor.submit(plan_fill_strokes, stages['filtered'], stages['scale'], transform[2],
+                                        load_brush_widths(), args.fill_ratio,
+                                        max_diameter=2 * float(stages['distance'].max()))
+        executor.shutdown(wait=False)
+
+    budget = min(args.order_time_budget, STREAM_ORDER_BUDGET)
+    pen, level = transform[:2], 1
+    first = True  # 还没有产出过笔画
+    pending = []
+    # 末尾的 None 表示追踪结束，此时把剩余的笔画全部产出
+    for paths in chain(trace_skeleton_components(stages['skeleton']), [None]):
+        if paths is not None:
+            pending.extend(filter_traced_paths(paths))
+        while pending and (paths is None or len(pending) >= (first_batch if first else batch_size)):
+            # 一个大的连通域可能有上千条路径，第一批只取前面一部分，其余留到下一批
+            take = first_batch if first else len(pending)
+            batch, pending = pending[:take], pending[take:]
+            width_stats = estimate_stroke_widths(batch, stages['distance'])
+            widths = np.maximum(1, (width_stats['mean'] / stages['scale']).astype(np.int32)).tolist()
+            if pending_fills is not None and (not first or pending_fills.done()):
+                fills = pending_fills.result()
+                pending_fills = None
+            if fills is not None:
+                batch, widths = remove_filled_points(batch, widths, fills[3])
+                if not batch:
+                    continue
+            levels = [map_width_to_brush_size(width) for width in widths]
+            strokes, _, _ = simplify_paths(batch, args.simplify_tolerance, transform[2])
+            strokes, widths, levels = order_for_drawing(strokes, widths, levels, args, budget, pen, level)
+            pen, level = strokes[-1][-1], levels[-1]
+            first = False
+            yield strokes, widths, levels
+
+    if pending_fills is not None:
+        fills = pending_fills.result()
+    if fills is not None:
+        strokes, widths, levels, _ = fills
+        strokes, _, _ = simplify_paths(strokes, args.simplify_tolerance, transform[2])
+        yield order_for_drawing(strokes, widths, levels, args, budget, pen, level)
+
+def plan_fill_strokes(filtered, work_scale, canvas_scale, brush_widths, fill_ratio, max_diameter=None):
+    """
+    为粗线填充区域规划排线笔画（坐标与提取的中心线一致）
+    filtered, work_scale: 预处理后的二值图和工作分辨率比例（preprocess_image 的 filtered / scale）
+    max_diameter: 二值图中最大内切圆的直径，用于跳过放不下任何填充画笔的档位（见 plan_fills）
+    返回: (strokes, stroke_widths, brush_levels, filled_mask)，没有需要填充的区域时返回 None
+    """
+    strokes, levels, filled = plan_fills(filtered, canvas_scale, brush_widths, fill_ratio=fill_ratio,
+                                         max_diameter=max_diameter)
+    if not strokes:
+        return None
+    # 宽度按原图像素记录（与中心线笔画一致），用于绘制时的笔画间隔
+    widths = [max(1, int(brush_widths[level - 1] / canvas_scale / work_scale)) for level in levels]
+    print(f"✅ 填充区域: {len(strokes)} 条排线笔画，档位 {sorted(set(levels))}")
+    return strokes, widths, levels, filled
+
+def load_plan_for_canvas(plan_path, canvas_size):
+    """
+    读取绘制计划；如果当前画布大小与编译时不同，按当前画布重新计算缩放
+    返回: (strokes, stroke_widths, brush_levels, transform)
+    """
+    plan = read_plan(plan_path)
+    header = plan['header']
+    strokes = plan_strokes(plan)
+    print(f"✅ 已加载绘制计划: {plan_path} ({header['stroke_count']} 条笔画, {header['point_count']} 个点, "
+          f"编译于 {header['created']})")
+
+    transform = tuple(header['transform'])
+    if list(canvas_size) != header['canvas']['size']:
+        print(f"⚠️ 当前画布大小 {canvas_size} 与计划编译时 {tuple(header['canvas']['size'])} 不同，重新计算缩放")
+        transform = compute_canvas_transform(strokes, canvas_size)
+    return strokes, plan['widths'].tolist(), plan['levels'].tolist(), transform
+
+def parse_canvas_size(text):
+    """解析 '宽x高' 形式的画布尺寸"""
+    width, height = text.lower().split('x')
+    return int(width), int(height)
 
 def main():
-    global should_exit, is_paused
-    # 重置退出标志，确保每次运行都从头开始
-    should_exit = False
-    # 重置暂停标志，确保每次运行都从非暂停状态开始
-    is_paused = False
-    
     parser = argparse.ArgumentParser(description='高精细度一笔画绘制')
-    parser.add_argument('-i', '--image', required=True, help='输入图像路径')
-    parser.add_argument('-m', '--mode', choices=['draw', 'click'], default='draw', 
-                        help='运行模式: draw-绘制图像, click-点击坐标点 (默认: draw)')
+    parser.add_argument('-i', '--image', nargs='+',
+                        help='输入图像路径（draw / plan 模式必需），可指定多张，按顺序依次处理')
+    parser.add_argument('-m', '--mode', choices=['draw', 'click', 'plan', 'execute'], default='draw',
+                        help='运行模式: draw-提取并绘制图像, click-点击坐标点, '
+                             'plan-只编译绘制计划文件, execute-直接执行绘制计划文件 (默认: draw)')
+    parser.add_argument('-p', '--plan', help='绘制计划文件路径（plan 模式的输出 / execute 模式的输入）')
+    parser.add_argument('--canvas-size', type=parse_canvas_size,
+                        help='plan 模式下使用的画布尺寸，如 400x600（默认读取画布坐标文件）')
+    parser.add_argument('--save-intermediates', action='store_true',
+                        help='保存预处理中间结果（二值图、骨架、距离变换）到输出目录用于调试，等同于 --debug-level 2')
+    parser.add_argument('--debug-level', type=int, choices=[0, 1, 2], default=0,
+                        help='调试产物: 0-不保存, 1-笔画宽度列表, 2-另外保存中间结果图像和窗口检测截图，'
+                             '在后台线程中写入 (默认: 0)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='不使用笔画缓存，强制重新提取')
+    parser.add_argument('--cache-size-mb', type=float, default=DEFAULT_CACHE_BYTES / 1024 / 1024,
+                        help='笔画缓存总大小上限（MB），超出时淘汰最久未使用的条目 (默认: 200)')
+    parser.add_argument('--simplify-tolerance', type=float, default=0.5,
+                        help='路径简化容差，单位为屏幕像素，0表示不简化 (默认: 0.5)')
+    parser.add_argument('--skeleton-backend', choices=list(SKELETON_BACKENDS), default=DEFAULT_SKELETON_BACKEND,
+                        help=f'骨架化后端 (默认: {DEFAULT_SKELETON_BACKEND})')
+    parser.add_argument('--full-resolution', action='store_true',
+                        help='按原图分辨率处理（默认先裁剪到线条范围并缩小到与画布匹配的工作分辨率）')
+    parser.add_argument('--oversample', type=float, default=3.0,
+                        help='工作分辨率下每个画布像素对应的图像像素数 (默认: 3)')
+    parser.add_argument('--fill', action=argparse.BooleanOptionalAction, default=False,
+                        help='大块实心区域用粗画笔往返排线填充，而不是只画中心线；画笔宽度读取配置目录中的 '
+                             'brush_widths.txt (默认: 关闭)')
+    parser.add_argument('--fill-ratio', type=float, default=2.0,
+                        help='区域能容纳该倍数的画笔宽度时才用该档位填充 (默认: 2)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='预处理的并行进程数，大于1时大图按块并行骨架化，0表示使用全部CPU核 (默认: 1)')
+    parser.add_argument('--plan-workers', type=int, default=1,
+                        help='多张图像时在后台提前规划后续图像的进程数 (默认: 1)')
+    parser.add_argument('--job-interval', type=float, default=0.0,
+                        help='多张图像时每张绘制完成后等待的秒数，用于更换画布 (默认: 0)')
+    parser.add_argument('--order-time-budget', type=float, default=1.0,
+                        help='笔画排序 2-opt 优化的时间预算（秒），0表示只做最近邻排序 (默认: 1.0)')
+    parser.add_argument('--brush-batch', action=argparse.BooleanOptionalAction, default=True,
+                        help='按画笔档位分组绘制，减少画笔切换次数 (默认: 开启)')
+    parser.add_argument('--input-backend', choices=list(INPUT_BACKENDS), default='pyautogui',
+                        help='鼠标输入后端: pyautogui, pynput-低开销直接输入, record-仅在内存中记录 (默认: pyautogui)')
+    parser.add_argument('--events-per-second', type=float, default=1000,
+                        help='鼠标事件发送速率（事件/秒），0表示不限速 (默认: 1000)')
+    parser.add_argument('--verify-rounds', type=int, default=0,
+                        help='绘制后截图校验并重绘缺失笔画的最大轮数，0表示不校验 (默认: 0)')
+    parser.add_argument('--verify-threshold', type=float, default=0.8,
+                        help='笔画覆盖率低于该值时视为缺失 (默认: 0.8)')
+    parser.add_argument('--stream', action='store_true',
+                        help='边提取边绘制：后台进程分批提取笔画，第一批就绪即开始绘制（单张图像，不记录续画会话，'
+                             '预处理不使用 --workers 的进程池）')
+    parser.add_argument('--resume', action='store_true',
+                        help='从上一次被中断的绘制会话继续（不需要 -i，跳过已画完的笔画，不重新提取）')
+    parser.add_argument('--calibration', metavar='NAME',
+                        help='使用指定名称的校准配置（画布位置、画笔滑块、窗口位置），并设为当前配置')
+    parser.add_argument('--calibrate', action='store_true',
+                        help='绘制前确认校准有效：窗口和画布没有移动时直接使用保存的配置，否则重新检测窗口')
+    parser.add_argument('--profile', metavar='JSON',
+                        help='记录各阶段耗时、鼠标事件和逐笔画耗时，结束时把汇总写入该JSON文件')
+    parser.add_argument('--trace', metavar='JSON',
+                        help='同时导出 Chrome trace-event 文件（可用 chrome://tracing 或 Perfetto 查看）')
     args = parser.parse_args()
-    
-    # 确保图像路径使用正确的编码
-    image_path = os.path.abspath(args.image)
+    if args.workers <= 0:
+        args.workers = default_workers()
+    if args.save_intermediates:
+        args.debug_level = max(args.debug_level, debug_artifacts.DEBUG_FULL)
+    args.save_intermediates = args.debug_level >= debug_artifacts.DEBUG_FULL
+    debug_artifacts.set_level(args.debug_level)
+    ensure_directories()
+    if args.calibration and not calibration.set_active_profile(args.calibration) and not args.calibrate:
+        print(f"错误：未找到校准配置 '{args.calibration}'，可加上 --calibrate 检测窗口并创建")
+        return
+
+    default_control.reset()
+    restore_sigint = handle_sigint(default_control)
+    if args.profile or args.trace:
+        instrument.enable()
+    try:
+        run(args)
+    finally:
+        restore_sigint()
+        if args.profile:
+            instrument.write_summary(args.profile)
+        if args.trace:
+            instrument.write_chrome_trace(args.trace)
+        instrument.disable()
+
+def run(args):
+    """按命令行参数执行所选模式"""
 
     print("=== 高精细度一笔画绘制工具（支持智能画笔大小切换）===")
     print(f"当前运行模式: {args.mode}")
@@ -863,33 +1143,230 @@ def main():
         else:
             print("❌ 未找到captured_coordinates.json或文件中没有坐标点，切换到正常绘画模式")
     
-    # 默认执行正常的图像绘制流程
-    print("🎨 开始正常图像绘制模式")
-    
+    # 只编译绘制计划：画布尺寸可以来自参数（在其他机器上编译时）或画布坐标文件
+    if args.mode == 'plan':
+        if not args.image:
+            print("错误：plan 模式需要指定输入图像 (-i)")
+            return
+        if args.plan and len(args.image) > 1:
+            print("错误：指定多张图像时不能使用 -p，计划文件按图像名保存到输出目录")
+            return
+        top_left, size = None, args.canvas_size
+        if size is None:
+            top_left, size, _ = load_canvas_coordinates()
+            if not size:
+                print("错误：未找到画布坐标，请先运行窗口检测或使用 --canvas-size 指定画布尺寸")
+                return
+        for image in args.image:
+            image_path = os.path.abspath(image)
+            if not os.path.exists(image_path):
+                print(f"错误：图片不存在！路径：{image_path}")
+                continue
+            planned = build_plan(image_path, size, args)
+            if planned is None:
+                continue
+            strokes, stroke_widths, levels, transform = planned
+            plan_path = args.plan or os.path.join(output_path,
+                                                  os.path.splitext(os.path.basename(image_path))[0] + PLAN_SUFFIX)
+            source = {'image': os.path.basename(image_path), 'sha256': file_sha256(image_path)}
+            write_plan(plan_path, strokes, stroke_widths, levels, top_left, size, transform, source=source)
+        return
+
+    # 确认校准有效（只截一张探测小图，画布移动时才重新检测窗口）
+    if args.calibrate:
+        if ensure_calibration(args.calibration) is None:
+            print("错误：窗口检测失败！")
+            return
+
     # 加载画布坐标
     top_left, size, bottom_right = load_canvas_coordinates()
     if not top_left:
         print("错误：未找到画布坐标！")
         return
 
-    if not os.path.exists(image_path):
-        print(f"错误：图片不存在！路径：{image_path}")
+    backend = create_input_backend(args.input_backend, args.events_per_second)
+
+    if args.mode == 'execute':
+        # 直接执行编译好的计划，不做任何图像处理
+        if not args.plan or not os.path.exists(args.plan):
+            print(f"错误：绘制计划文件不存在！路径：{args.plan}")
+            return
+        draw_planned(load_plan_for_canvas(args.plan, size), top_left, size, backend, args)
         return
 
-    print(f"处理图像: {image_path}")
+    if args.resume:
+        resume_session(top_left, size, backend, args)
+        return
 
-    # 高效处理图像并提取笔触和宽度信息
-    strokes, binary, stroke_widths = extract_strict_strokes(image_path)
+    # 默认执行正常的图像绘制流程
+    print("🎨 开始正常图像绘制模式")
+    if not args.image:
+        print("错误：draw 模式需要指定输入图像 (-i)")
+        return
 
-    if len(strokes) == 0:
-        print("未找到有效线条！")
+    # 确保图像路径使用正确的编码
+    image_paths = []
+    for image in args.image:
+        image_path = os.path.abspath(image)
+        if not os.path.exists(image_path):
+            print(f"错误：图片不存在！路径：{image_path}")
+            return
+        image_paths.append(image_path)
+
+    if args.stream:
+        if len(image_paths) > 1 or args.verify_rounds > 0:
+            print("⚠️ --stream 只用于单张图像且不校验重绘，改用普通绘制流程")
+        else:
+            draw_streamed(image_paths[0], top_left, size, backend, args)
+            return
+
+    session = start_session(session_path, image_paths, top_left, size, calibration.active_profile_name())
+    if len(image_paths) == 1:
+        jobs = [(0, image_paths[0], build_plan(image_paths[0], size, args, control=default_control), 0)]
+        draw_session(session, jobs, top_left, size, backend, args)
+        return
+
+    # 多张图像：后台进程池提前规划后面的图像，当前图像绘制时下一张已在处理
+    print(f"📋 任务队列: {len(image_paths)} 张图像，后台规划进程数 {args.plan_workers}")
+    queue = DrawJobQueue(image_paths, size, args, workers=args.plan_workers, control=default_control)
+    jobs = ((index, image_path, planned, 0) for index, (image_path, planned) in enumerate(queue))
+    draw_session(session, jobs, top_left, size, backend, args)
+    queue.cancel()
+    print(f"任务队列等待规划共 {queue.wait_time:.2f}s")
+
+def draw_streamed(image_path, top_left, size, backend, args):
+    """
+    边提取边绘制：后台进程确定画布映射后按批产出笔画，第一批到达即开始绘制
+    不使用笔画缓存，也不记录续画会话（计划在绘制开始时还不完整）
+    返回: draw_on_canvas 的结果，未找到有效线条时返回 None
+    """
+    start = time.perf_counter()
+    stream = StrokeStream(image_path, size, args, control=default_control)
+    try:
+        transform = stream.wait_transform()
+        if transform is None:
+            print("🔴 绘制已取消" if default_control.is_cancelled() else "未找到有效线条！")
+            return None
+        print(f"画布映射已确定（{time.perf_counter() - start:.2f}s），开始边提取边绘制")
+        result = draw_on_canvas(stream, top_left, size, stream.widths, transform=transform, backend=backend,
+                                brush_levels=stream.levels)
+        print(f"流式绘制: {stream.batches} 批 {len(stream.strokes)} 条笔画，等待提取共 {stream.wait_time:.2f}s")
+        return result
+    finally:
+        stream.close()
+
+def resume_session(top_left, size, backend, args):
+    """从上一次中断的会话继续：已开始的图像直接读取会话中的计划，从最后画完的笔画之后继续"""
+    session = load_session(session_path)
+    if session is None:
+        print("错误：没有可以继续的绘制会话")
+        return
+    canvas = session.header['canvas']
+    if list(size) != canvas['size']:
+        print(f"错误：当前画布大小 {tuple(size)} 与会话开始时 {tuple(canvas['size'])} 不同，无法续画，"
+              f"请确认窗口布局或使用校准配置 '{session.header['calibration']}'")
+        session.close()
+        return
+    if list(top_left) != canvas['top_left']:
+        print(f"⚠️ 画布位置已从 {tuple(canvas['top_left'])} 移动到 {tuple(top_left)}，按新位置继续")
+
+    point = session.resume_point()
+    if point is None:
+        print("✅ 会话中的图像均已画完")
+        session.finish()
         return
+    index, start, plan_path = point
+    images = session.images
+    print(f"▶️ 继续绘制会话（{session.header['created']}）: 图像 {index + 1}/{len(images)}，"
+          f"从第 {start + 1} 条笔画开始")
+
+    def jobs():
+        rest = index
+        if plan_path is not None:
+            session.continue_job(index)
+            yield index, images[index], load_plan_for_canvas(plan_path, size), start
+            rest += 1
+        if rest >= len(images):
+            return
+        queue = DrawJobQueue(images[rest:], size, args, workers=args.plan_workers, control=default_control)
+        try:
+            for offset, (image_path, planned) in enumerate(queue):
+                yield rest + offset, image_path, planned, 0
+        finally:
+            queue.cancel()
+
+    # 中断时画笔所在的档位未知，第一条笔画前总是切换一次
+    draw_session(session, jobs(), top_left, size, backend, args, brush_size=0)
 
+def draw_session(session, jobs, top_left, size, backend, args, brush_size=1):
+    """
+    按顺序绘制任务并记录到会话日志，全部画完后删除会话，中断时保留以便 --resume
+    jobs: 可迭代的 (index, image_path, planned, start)，start 为从第几条笔画开始
+    返回: 是否全部画完
+    """
+    total = len(session.images)
+    finished = 0
+    for index, image_path, planned, start in jobs:
+        # 规划期间被取消时（此时 planned 为 None）不能当作没有线条跳过
+        if default_control.is_cancelled():
+            break
+        if total > 1:
+            print(f"\n=== 任务 {index + 1}/{total}: {os.path.basename(image_path)} ===")
+        if planned is None:
+            print("未找到有效线条，跳过")
+            session.end_job(index)
+            continue
+        if finished and args.job_interval > 0:
+            print(f"等待 {args.job_interval:.1f}s 后开始下一张...")
+            time.sleep(args.job_interval)
+        if start == 0:
+            session.begin_job(index, image_path, planned, top_left, size)
+        result = draw_planned(planned, top_left, size, backend, args, initial_brush_size=brush_size,
+                              start=start, on_stroke=session.stroke_done)
+        brush_size = result['brush_size']
+        if not result['completed']:
+            session.close()
+            print(f"🔴 绘制被中断，进度已保存（图像 {index + 1}/{total}，"
+                  f"已画完 {session.done.get(index, -1) + 1} 条笔画），使用 --resume 继续")
+            return False
+        session.end_job(index)
+        finished += 1
+    if default_control.is_cancelled():
+        session.close()
+        print(f"🔴 绘制已取消，进度已保存（已完成 {finished}/{total} 张），使用 --resume 继续")
+        return False
+    session.finish()
+    if total > 1:
+        print(f"✅ 任务队列结束: 完成 {finished}/{total} 张")
+    return True
+
+def draw_planned(planned, top_left, size, backend, args, initial_brush_size=1, start=0, on_stroke=None):
+    """
+    绘制一个已规划好的任务（按参数决定是否截图校验），返回 draw_on_canvas 的结果
+    start: 从第几条笔画开始（续画时跳过已画完的笔画）
+    on_stroke: 每条笔画画完后以计划中的笔画序号调用
+    """
+    strokes, stroke_widths, levels, transform = planned
+    # 规划期间已被取消（如 Ctrl+C 或关闭窗口）时不再开始绘制
+    if default_control.is_cancelled():
+        print("🔴 绘制已取消")
+        return {'completed': False, 'brush_size': initial_brush_size}
+    if start > 0:
+        print(f"跳过已画完的 {start} 条笔画")
+        strokes, stroke_widths, levels = strokes[start:], stroke_widths[start:], levels[start:]
+        if on_stroke is not None:
+            report = on_stroke
+            on_stroke = lambda i: report(start + i)
     print(f"共生成 {len(strokes)} 条笔触，开始绘制...")
     print("系统将根据线条粗细自动切换画笔大小")
 
     # 绘制 - strokes已经是高质量的路径，包含宽度信息
-    draw_on_canvas(strokes, top_left, size, stroke_widths)
+    if args.verify_rounds > 0:
+        return draw_and_verify(strokes, top_left, size, stroke_widths, transform, backend, levels,
+                               rounds=args.verify_rounds, coverage_threshold=args.verify_threshold,
+                               initial_brush_size=initial_brush_size, on_stroke=on_stroke)
+    return draw_on_canvas(strokes, top_left, size, stroke_widths, transform=transform, backend=backend,
+                          brush_levels=levels, initial_brush_size=initial_brush_size, on_stroke=on_stroke)
 
 if __name__ == "__main__":
     try:
@@ -899,5 +1376,7 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"错误: {e}")
     finally:
-        pyautogui.mouseUp()
+        # 只有加载过 pyautogui（绘制/点击模式）时才需要确保鼠标抬起，plan 模式可以在无显示器的机器上运行
+        if pyautogui.loaded():
+            pyautogui.mouseUp()
         print("程序结束")
\ No newline at end of file
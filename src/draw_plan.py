@@ -0,0 +1,130 @@
+"""
+编译好的绘制计划文件（.xcplan）
+
+文件布局（小端序）:
+    8 字节   魔数 b'XCPLAN\\0\\0'
+    4 字节   格式版本 (uint32)
+    4 字节   头部JSON长度 (uint32)
+    N 字节   头部JSON（UTF-8，补齐到8字节对齐）
+    数组区   offsets / coords / widths / levels，各自按8字节对齐，位置和类型记录在头部JSON的 arrays 中
+
+coords 是所有笔画拼接后的扁平坐标 [x0, y0, x1, y1, ...]（int16，超出范围时为int32），
+第 i 条笔画的点为 coords[2*offsets[i]:2*offsets[i+1]]。
+数组区可以直接用 np.memmap 映射，执行计划时不需要 OpenCV / scikit-image。
+"""
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+PLAN_MAGIC = b'XCPLAN\0\0'
+PLAN_VERSION = 1
+PLAN_SUFFIX = '.xcplan'
+
+_PREAMBLE = struct.Struct('<8sII')
+
+
+def _align(n, alignment=8):
+    return (n + alignment - 1) // alignment * alignment
+
+
+def write_plan(path, strokes, stroke_widths, brush_levels, canvas_top_left, canvas_size, transform, source=None):
+    """
+    把规划好的笔画写成绘制计划文件
+    strokes: 已简化、已排序的路径列表（图像坐标）
+    stroke_widths / brush_levels: 每条笔画的宽度和画笔档位
+    canvas_top_left / canvas_size: 编译时使用的画布位置和大小（位置可能为None）
+    transform: compute_canvas_transform 的结果 (min_x, min_y, scale_factor, offset_x, offset_y)
+    source: 来源信息字典（如图像路径和哈希），原样写入头部
+    """
+    lengths = [len(s) for s in strokes]
+    offsets = np.zeros(len(strokes) + 1, dtype=np.int32)
+    np.cumsum(lengths, out=offsets[1:])
+    flat = np.fromiter((v for s in strokes for p in s for v in p), dtype=np.int64, count=int(offsets[-1]) * 2)
+    coord_dtype = np.int16
+    if flat.size and (flat.min() < np.iinfo(np.int16).min or flat.max() > np.iinfo(np.int16).max):
+        coord_dtype = np.int32
+
+    arrays = {
+        'offsets': offsets,
+        'coords': flat.astype(coord_dtype),
+        'widths': np.asarray(stroke_widths, dtype=np.int16),
+        'levels': np.asarray(brush_levels, dtype=np.uint8),
+    }
+
+    header = {
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'source': source or {},
+        'canvas': {
+            'top_left': list(canvas_top_left) if canvas_top_left else None,
+            'size': list(canvas_size),
+        },
+        'transform': [float(v) for v in transform],
+        'stroke_count': len(strokes),
+        'point_count': int(offsets[-1]),
+        'arrays': {},
+    }
+
+    # 先用占位的数组偏移计算头部长度，再确定各数组在文件中的位置
+    def layout(header_len):
+        pos = _align(_PREAMBLE.size + header_len)
+        for name, arr in arrays.items():
+            header['arrays'][name] = {'offset': pos, 'dtype': arr.dtype.str, 'shape': list(arr.shape)}
+            pos = _align(pos + arr.nbytes)
+        return json.dumps(header, ensure_ascii=False).encode('utf-8')
+
+    header_bytes = layout(0)
+    while True:
+        encoded = layout(len(header_bytes))
+        if len(encoded) == len(header_bytes):
+            header_bytes = encoded
+            break
+        header_bytes = encoded
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(_PREAMBLE.pack(PLAN_MAGIC, PLAN_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, arr in arrays.items():
+            f.write(b'\0' * (header['arrays'][name]['offset'] - f.tell()))
+            f.write(arr.tobytes())
+    os.replace(temp_path, path)
+    print(f"✅ 绘制计划已保存: {path} ({len(strokes)} 条笔画, {int(offsets[-1])} 个点, "
+          f"{os.path.getsize(path) / 1024:.1f}KB)")
+
+
+def read_plan(path, mmap=True):
+    """
+    读取绘制计划文件
+    mmap: 为True时数组直接映射文件内容，不整体读入内存
+    返回: {'header': 头部字典, 'offsets', 'coords', 'widths', 'levels'}
+    """
+    with open(path, 'rb') as f:
+        magic, version, header_len = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != PLAN_MAGIC:
+            raise ValueError(f"不是有效的绘制计划文件: {path}")
+        if version != PLAN_VERSION:
+            raise ValueError(f"不支持的绘制计划版本 {version}（当前版本 {PLAN_VERSION}）")
+        header = json.loads(f.read(header_len).decode('utf-8'))
+
+        plan = {'header': header}
+        for name, info in header['arrays'].items():
+            dtype = np.dtype(info['dtype'])
+            shape = tuple(info['shape'])
+            count = int(np.prod(shape))
+            if mmap and count:
+                plan[name] = np.memmap(path, dtype=dtype, mode='r', offset=info['offset'], shape=shape)
+            else:
+                f.seek(info['offset'])
+                plan[name] = np.frombuffer(f.read(count * dtype.itemsize), dtype=dtype).reshape(shape)
+    return plan
+
+
+def plan_strokes(plan):
+    """把计划中的扁平坐标还原为路径列表 [[(x, y), ...], ...]"""
+    coords = np.asarray(plan['coords'])
+    points = list(zip(coords[0::2].tolist(), coords[1::2].tolist()))
+    offsets = plan['offsets'].tolist()
+    return [points[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
@@ -0,0 +1,149 @@
+"""
+粗线填充区域的排线规划
+
+骨架化会把大块实心区域缩成一条中心线，用平均宽度绘制出来是空心的。
+对能容纳 fill_ratio 倍最粗画笔的区域（对二值图做对应直径的开运算得到），
+改用最粗的合适画笔按 boustrophedon（往返扫描）方式排线填满：
+扫描线间距略小于画笔宽度，相邻行的线段只要在区域内能竖直连通就连成同一笔，
+凸区域只需一笔，凹区域按需要拆成若干笔。原来落在填充区域内的中心线笔画被去掉。
+"""
+import numpy as np
+
+from src.lazy_modules import cv2
+
+# 各画笔档位在屏幕上的笔迹直径（像素），从最细到最粗；可用配置目录中的 brush_widths.txt 覆盖
+DEFAULT_BRUSH_WIDTHS = [2, 4, 8, 12, 18]
+
+# 只有中心线画笔用不到的档位才用于填充（map_width_to_brush_size 最多到3档）
+MIN_FILL_LEVEL = 4
+
+# 相邻扫描线的间距相对画笔宽度的比例，略小于1保证笔迹之间没有缝隙
+HATCH_OVERLAP = 0.85
+
+
+def _disk(diameter):
+    diameter = max(1, int(round(diameter)))
+    return cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (diameter, diameter))
+
+
+def _row_runs(row):
+    """一行掩码中连续前景的区间 [(x0, x1), ...]（含两端）"""
+    padded = np.concatenate(([0], row.astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(padded))
+    return list(zip(edges[0::2].tolist(), (edges[1::2] - 1).tolist()))
+
+
+def hatch_component(mask, spacing):
+    """
+    对单个连通区域排线（mask 为该区域的布尔掩码，坐标相对 mask）
+    返回: [stroke, ...] 每条 stroke 是 [(x, y), ...]
+    """
+    h = mask.shape[0]
+    spacing = max(1, int(spacing))
+    rows = list(range(spacing // 2, h, spacing)) or [h // 2]
+    if rows[-1] < h - 1 - spacing // 2:
+        rows.append(h - 1 - spacing // 2)
+
+    strokes = []
+    active = []  # [(stroke, 上一行y, 上一行区间, 笔画末端x)]
+    for y in rows:
+        runs = _row_runs(mask[y])
+        next_active = []
+        for a, b in runs:
+            attached = False
+            for i, (stroke, prev_y, (pa, pb), end_x) in enumerate(active):
+                # 从上一行末端竖直落到本行：落点需同时在两行的区间内，且竖直路径全在区域内
+                x = min(max(end_x, a), b)
+                if not pa <= x <= pb or not mask[prev_y:y + 1, x].all():
+                    continue
+                if x != end_x:
+                    stroke.append((x, prev_y))
+                stroke.append((x, y))
+                # 先走到近端再折返到远端，落点不在端点时也能覆盖整段
+                near, far = (a, b) if x - a <= b - x else (b, a)
+                if near != x:
+                    stroke.append((near, y))
+                stroke.append((far, y))
+                next_active.append((stroke, y, (a, b), far))
+                del active[i]
+                attached = True
+                break
+            if not attached:
+                stroke = [(a, y), (b, y)] if a != b else [(a, y)]
+                strokes.append(stroke)
+                next_active.append((stroke, y, (a, b), b))
+        active = next_active
+    return strokes
+
+
+def hatch_region(region, brush_px):
+    """
+    对填充区域排线：先按画笔半径向内收缩，使笔迹不超出区域，再按画笔宽度确定扫描线间距
+    region: uint8 掩码（非零为填充区域）
+    brush_px: 画笔宽度（与 region 同一坐标系下的像素）
+    返回: [stroke, ...]，坐标与 region 相同
+    """
+    inset = int(brush_px // 2)
+    core = cv2.erode(region, _disk(2 * inset + 1)) if inset > 0 else region
+    n, labels, stats, _ = cv2.connectedComponentsWithStats(core, connectivity=8)
+    strokes = []
+    for label in range(1, n):
+        x, y, w, h = stats[label, :4]
+        sub = labels[y:y + h, x:x + w] == label
+        for stroke in hatch_component(sub, brush_px * HATCH_OVERLAP):
+            strokes.append([(px + x, py + y) for px, py in stroke])
+    return strokes
+
+
+def plan_fills(filtered, canvas_scale, brush_widths, fill_ratio=2.0, min_level=MIN_FILL_LEVEL, max_diameter=None):
+    """
+    找出粗线填充区域并排线
+    filtered: 预处理后的二值图（线条非零）
+    canvas_scale: 图像像素到画布像素的缩放（compute_canvas_transform 的 scale_factor）
+    brush_widths: 各档位在屏幕上的笔迹直径
+    fill_ratio: 区域至少能容纳 fill_ratio 倍画笔宽度的圆时才用该档位填充
+    max_diameter: filtered 中最大内切圆的直径（2 * 距离变换的最大值），指定时跳过放不下的档位，
+                  不做该档位的大核开运算（没有粗线的图像几乎不花时间）
+    返回: (strokes, levels, filled_mask) filled_mask 为所有填充区域的并集
+    """
+    filled = np.zeros(filtered.shape, dtype=np.uint8)
+    remaining = (filtered > 0).astype(np.uint8)
+    strokes = []
+    levels = []
+    # 从最粗的画笔开始，剩下的区域再尝试细一档的画笔
+    for level in range(len(brush_widths), min_level - 1, -1):
+        brush_px = brush_widths[level - 1] / canvas_scale
+        # 距离变换是近似值，留出2像素余量，只跳过肯定放不下的档位
+        if max_diameter is not None and max_diameter + 2 < fill_ratio * brush_px:
+            continue
+        region = cv2.morphologyEx(remaining, cv2.MORPH_OPEN, _disk(fill_ratio * brush_px))
+        if not region.any():
+            continue
+        hatch = hatch_region(region, brush_px)
+        strokes.extend(hatch)
+        levels.extend([level] * len(hatch))
+        filled |= region
+        remaining &= 1 - region
+    return strokes, levels, filled
+
+
+def remove_filled_points(paths, stroke_widths, filled):
+    """
+    去掉中心线笔画中落在填充区域内的部分，笔画被区域切断时拆成多段
+    返回: (paths, stroke_widths)
+    """
+    h, w = filled.shape
+    kept_paths = []
+    kept_widths = []
+    for path, width in zip(paths, stroke_widths):
+        pts = np.asarray(path)
+        inside = filled[np.clip(pts[:, 1], 0, h - 1), np.clip(pts[:, 0], 0, w - 1)] > 0
+        if not inside.any():
+            kept_paths.append(path)
+            kept_widths.append(width)
+            continue
+        for run in np.split(np.arange(len(path)), np.flatnonzero(np.diff(inside.astype(np.int8))) + 1):
+            if not inside[run[0]] and len(run) >= 2:
+                kept_paths.append(path[run[0]:run[-1] + 1])
+                kept_widths.append(width)
+    return kept_paths, kept_widths
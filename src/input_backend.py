@@ -0,0 +1,165 @@
+import time
+
+from src.lazy_modules import pyautogui
+
+
+class InputBackend:
+    """
+    鼠标输入后端基类
+    所有事件（移动/按下/抬起）都经过同一个基于单调时钟的调度器，按events_per_second的速率发出：
+    调度器维护下一个事件的目标时刻，只有领先超过sleep_threshold时才休眠，
+    因此不受单次 sleep 精度的影响，平均速率由一个参数决定
+    """
+
+    name = 'base'
+
+    def __init__(self, events_per_second=1000, sleep_threshold=0.002, max_lag=0.05):
+        self.interval = 1.0 / events_per_second if events_per_second > 0 else 0.0
+        self.sleep_threshold = sleep_threshold
+        self.max_lag = max_lag  # 落后超过该时间（如暂停后）重新对齐，避免突发大量事件
+        self._deadline = None
+        self.event_count = 0
+        self.sleep_time = 0.0
+        self._first_event = None
+        self._last_event = None
+
+    def _wait_slot(self):
+        """等待到下一个事件的发送时刻"""
+        now = time.perf_counter()
+        if self._first_event is None:
+            self._first_event = now
+        if self.interval > 0:
+            if self._deadline is None or now - self._deadline > self.max_lag:
+                self._deadline = now
+            ahead = self._deadline - now
+            if ahead > self.sleep_threshold:
+                time.sleep(ahead)
+                self.sleep_time += ahead
+            self._deadline += self.interval
+        self.event_count += 1
+
+    def _done(self):
+        self._last_event = time.perf_counter()
+
+    def move(self, x, y):
+        """移动鼠标到屏幕坐标(x, y)"""
+        self._wait_slot()
+        self._move(int(x), int(y))
+        self._done()
+
+    def press(self):
+        """按下鼠标左键（落笔）"""
+        self._wait_slot()
+        self._press()
+        self._done()
+
+    def release(self):
+        """抬起鼠标左键（抬笔）"""
+        self._wait_slot()
+        self._release()
+        self._done()
+
+    def resync(self):
+        """重置调度器（暂停、切换画笔等外部等待之后调用）"""
+        self._deadline = None
+
+    def stats(self):
+        """返回事件统计 {'events': 事件数, 'elapsed': 秒, 'rate': 事件/秒, 'sleep': 调度休眠秒数}"""
+        elapsed = 0.0
+        if self._first_event is not None and self._last_event is not None:
+            elapsed = self._last_event - self._first_event
+        rate = self.event_count / elapsed if elapsed > 0 else 0.0
+        return {'events': self.event_count, 'elapsed': elapsed, 'rate': rate, 'sleep': self.sleep_time}
+
+    def _move(self, x, y):
+        raise NotImplementedError
+
+    def _press(self):
+        raise NotImplementedError
+
+    def _release(self):
+        raise NotImplementedError
+
+
+class PyAutoGUIBackend(InputBackend):
+    """基于 pyautogui 的后端（与原有实现一致，但跳过 pyautogui 的补间动画和 PAUSE 等待）"""
+
+    name = 'pyautogui'
+
+    def __init__(self, events_per_second=1000, **kwargs):
+        super().__init__(events_per_second, **kwargs)
+        # 通过延迟加载代理使用 pyautogui，首次事件前总会先设置 FAILSAFE / PAUSE
+        self._pyautogui = pyautogui
+
+    def _move(self, x, y):
+        self._pyautogui.moveTo(x, y, _pause=False)
+
+    def _press(self):
+        self._pyautogui.mouseDown(button='left', _pause=False)
+
+    def _release(self):
+        self._pyautogui.mouseUp(button='left', _pause=False)
+
+
+class PynputBackend(InputBackend):
+    """基于 pynput 鼠标控制器的直接后端，每个事件只有一次系统调用，开销更低"""
+
+    name = 'pynput'
+
+    def __init__(self, events_per_second=1000, **kwargs):
+        super().__init__(events_per_second, **kwargs)
+        from pynput import mouse
+        self._controller = mouse.Controller()
+        self._button = mouse.Button.left
+
+    def _move(self, x, y):
+        self._controller.position = (x, y)
+
+    def _press(self):
+        self._controller.press(self._button)
+
+    def _release(self):
+        self._controller.release(self._button)
+
+
+class RecordingBackend(InputBackend):
+    """
+    只在内存中记录事件的后端，不操作真实鼠标，用于离线检查吞吐量和绘制结果
+    events: [(时间戳, 类型, x, y), ...]，类型为 'move' / 'down' / 'up'
+    """
+
+    name = 'record'
+
+    def __init__(self, events_per_second=1000, **kwargs):
+        super().__init__(events_per_second, **kwargs)
+        self.events = []
+        self._x = 0
+        self._y = 0
+
+    def _move(self, x, y):
+        self._x, self._y = x, y
+        self.events.append((time.perf_counter(), 'move', x, y))
+
+    def _press(self):
+        self.events.append((time.perf_counter(), 'down', self._x, self._y))
+
+    def _release(self):
+        self.events.append((time.perf_counter(), 'up', self._x, self._y))
+
+
+INPUT_BACKENDS = {
+    PyAutoGUIBackend.name: PyAutoGUIBackend,
+    PynputBackend.name: PynputBackend,
+    RecordingBackend.name: RecordingBackend,
+}
+
+
+def create_input_backend(name='pyautogui', events_per_second=1000):
+    """
+    按名称创建输入后端
+    name: 'pyautogui' / 'pynput' / 'record'
+    events_per_second: 目标事件速率，<=0 表示不限速
+    """
+    if name not in INPUT_BACKENDS:
+        raise ValueError(f"未知的输入后端: {name}，可选: {', '.join(INPUT_BACKENDS)}")
+    return INPUT_BACKENDS[name](events_per_second)
@@ -0,0 +1,166 @@
+"""
+性能记录：阶段耗时、事件计数、等待时间和逐笔画耗时
+
+默认关闭，关闭时 span() 返回共享的空上下文、count() 直接返回，几乎没有开销。
+开启后可输出JSON汇总（summary / write_summary），
+也可导出 Chrome trace（write_chrome_trace，用 chrome://tracing 或 Perfetto 打开）
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+_enabled = False
+_origin = time.perf_counter()
+_events = []      # (name, cat, start, duration, tid, args)
+_counters = {}
+_lock = threading.Lock()
+_NULL_SPAN = nullcontext()
+
+
+def enable():
+    """开启记录并清空已有数据"""
+    global _enabled
+    reset()
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    global _origin
+    with _lock:
+        _events.clear()
+        _counters.clear()
+        _origin = time.perf_counter()
+
+
+@contextmanager
+def _span(name, cat, args):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _events.append((name, cat, start, time.perf_counter() - start, threading.get_ident(), args))
+
+
+def span(name, cat='stage', **args):
+    """记录代码块的耗时；args 作为附加信息写入trace"""
+    if not _enabled:
+        return _NULL_SPAN
+    return _span(name, cat, args)
+
+
+def add_span(name, start, duration, cat='stage', **args):
+    """补记一段已经测量好的耗时（start 为 time.perf_counter() 的值）"""
+    if _enabled:
+        _events.append((name, cat, start, duration, threading.get_ident(), args))
+
+
+def count(name, n=1):
+    """累加计数器"""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def sleep(seconds, reason='sleep'):
+    """time.sleep 的替代：开启记录时把等待时间按原因记为 sleep 类别"""
+    if not _enabled:
+        time.sleep(seconds)
+        return
+    start = time.perf_counter()
+    time.sleep(seconds)
+    _events.append((reason, 'sleep', start, time.perf_counter() - start, threading.get_ident(), {}))
+
+
+def record_backend(stats, prefix='input'):
+    """记录输入后端的统计（见 InputBackend.stats）：事件数、速率以及调度等待和实际发送的时间"""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[f'{prefix}.events'] = _counters.get(f'{prefix}.events', 0) + stats['events']
+        _counters[f'{prefix}.elapsed_s'] = _counters.get(f'{prefix}.elapsed_s', 0.0) + stats['elapsed']
+        _counters[f'{prefix}.sleep_s'] = _counters.get(f'{prefix}.sleep_s', 0.0) + stats['sleep']
+
+
+def summary():
+    """
+    汇总记录的数据
+    返回: {'wall_s', 'stages': {名称: {count, total_ms, max_ms}}, 'sleep': {原因: total_ms},
+           'strokes': {count, total_ms, mean_ms, p50_ms, p95_ms, max_ms}, 'counters': {...}}
+    """
+    events = list(_events)
+    stages = {}
+    sleeps = {}
+    stroke_ms = []
+    for name, cat, start, duration, tid, args in events:
+        ms = duration * 1000
+        if cat == 'sleep':
+            sleeps[name] = sleeps.get(name, 0.0) + ms
+        elif cat == 'stroke':
+            stroke_ms.append(ms)
+        else:
+            row = stages.setdefault(name, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            row['count'] += 1
+            row['total_ms'] += ms
+            row['max_ms'] = max(row['max_ms'], ms)
+
+    counters = dict(_counters)
+    elapsed = counters.get('input.elapsed_s')
+    if elapsed:
+        counters['input.rate'] = counters.get('input.events', 0) / elapsed
+        counters['input.move_s'] = elapsed - counters.get('input.sleep_s', 0.0)
+
+    strokes = {'count': len(stroke_ms)}
+    if stroke_ms:
+        ordered = sorted(stroke_ms)
+        strokes.update({
+            'total_ms': sum(ordered),
+            'mean_ms': sum(ordered) / len(ordered),
+            'p50_ms': ordered[len(ordered) // 2],
+            'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            'max_ms': ordered[-1],
+        })
+
+    return {
+        'wall_s': time.perf_counter() - _origin,
+        'stages': stages,
+        'sleep': {name: ms for name, ms in sleeps.items()},
+        'strokes': strokes,
+        'counters': counters,
+    }
+
+
+def write_summary(path):
+    """把汇总写成JSON文件"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(summary(), f, ensure_ascii=False, indent=2)
+    print(f"✅ 性能汇总已保存: {path}")
+
+
+def write_chrome_trace(path):
+    """导出 Chrome trace-event 格式（完整事件 ph='X'，时间单位为微秒）"""
+    pid = os.getpid()
+    trace = []
+    for name, cat, start, duration, tid, args in list(_events):
+        trace.append({
+            'name': name, 'cat': cat, 'ph': 'X', 'pid': pid, 'tid': tid,
+            'ts': round((start - _origin) * 1e6, 1), 'dur': round(duration * 1e6, 1),
+            'args': args,
+        })
+    for name, value in summary()['counters'].items():
+        trace.append({'name': name, 'ph': 'C', 'pid': pid, 'tid': 0,
+                      'ts': round((time.perf_counter() - _origin) * 1e6, 1), 'args': {'value': value}})
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+    print(f"✅ Chrome trace 已保存: {path}")
@@ -0,0 +1,82 @@
+"""
+多图绘制任务队列
+
+后台进程池提前提取和规划后面的图像，当前图像绘制时CPU并不空闲，
+前一张画完时下一张的计划通常已经就绪，任务之间几乎没有等待
+"""
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait
+
+# 等待规划结果时检查取消的间隔（秒）
+POLL_INTERVAL = 0.1
+
+
+def plan_job(image_path, canvas_size, args):
+    """进程池任务：提取并规划一张图像，返回 build_plan 的结果（未找到线条时为 None）"""
+    # 在子进程中才导入绘制模块，避免与 draw_image 循环导入
+    from src import debug_artifacts
+    from src.draw_image import build_plan
+    debug_artifacts.set_level(getattr(args, 'debug_level', debug_artifacts.DEBUG_OFF))
+    try:
+        return build_plan(image_path, canvas_size, args)
+    finally:
+        # 进程池的子进程退出时不执行 atexit，调试产物需在任务结束前写完
+        debug_artifacts.flush()
+
+
+class DrawJobQueue:
+    """
+    按提交顺序产出已规划好的任务: for image_path, planned in queue: ...
+    workers: 后台规划进程数；同时最多有 workers + 1 个任务在规划中（含当前等待的一个）
+    control: 绘制的暂停/取消控制（见 draw_control），取消后不再等待规划结果，直接结束迭代
+    """
+
+    def __init__(self, image_paths, canvas_size, args, workers=1, control=None):
+        self.pending = deque(image_paths)
+        self.canvas_size = canvas_size
+        self.args = args
+        self.control = control
+        self.workers = max(1, workers)
+        self.lookahead = self.workers + 1
+        self.running = deque()
+        self.pool = None
+        self.wait_time = 0.0  # 绘制完一张后等待下一张规划完成的总时间
+
+    def _fill(self):
+        while self.pending and len(self.running) < self.lookahead:
+            image_path = self.pending.popleft()
+            future = self.pool.submit(plan_job, image_path, self.canvas_size, self.args)
+            self.running.append((image_path, future))
+
+    def __iter__(self):
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            self._fill()
+            while self.running:
+                image_path, future = self.running.popleft()
+                wait_start = time.perf_counter()
+                while not future.done():
+                    if self.control is not None and self.control.is_cancelled():
+                        return
+                    wait([future], timeout=POLL_INTERVAL)
+                try:
+                    planned = future.result()
+                except Exception as e:
+                    print(f"❌ 规划 {os.path.basename(image_path)} 时出错: {e}")
+                    planned = None
+                self.wait_time += time.perf_counter() - wait_start
+                # 先提交后面的任务，再把当前任务交给调用方绘制
+                self._fill()
+                yield image_path, planned
+        finally:
+            self.cancel()
+
+    def cancel(self):
+        """取消尚未开始的任务并关闭进程池"""
+        self.pending.clear()
+        self.running.clear()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
@@ -0,0 +1,54 @@
+"""
+导入较慢的第三方依赖的延迟加载代理
+cv2 / pyautogui / pynput / pygetwindow 只在图像处理或绘制阶段才需要，
+首次访问属性时才真正导入，缩短程序启动时间。
+加载函数中使用普通的 import 语句，保证 PyInstaller 打包时仍能分析到这些依赖。
+"""
+
+
+class LazyModule:
+    """首次访问属性时调用loader导入模块，之后直接转发属性访问"""
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = self._loader()
+        return self._module
+
+    def loaded(self):
+        """模块是否已经导入（不会触发导入）"""
+        return self._module is not None
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+
+def _import_cv2():
+    import cv2
+    return cv2
+
+
+def _import_pyautogui():
+    import pyautogui
+    pyautogui.FAILSAFE = False
+    pyautogui.PAUSE = 0.001  # 极小延迟，提升绘制速度
+    return pyautogui
+
+
+def _import_keyboard():
+    from pynput import keyboard
+    return keyboard
+
+
+def _import_pygetwindow():
+    import pygetwindow
+    return pygetwindow
+
+
+cv2 = LazyModule(_import_cv2)
+pyautogui = LazyModule(_import_pyautogui)
+keyboard = LazyModule(_import_keyboard)
+pygetwindow = LazyModule(_import_pygetwindow)
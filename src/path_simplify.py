@@ -0,0 +1,90 @@
+import numpy as np
+
+
+def _radial_reduce(pts, tolerance):
+    """
+    径向距离预过滤：丢弃与上一个保留点距离小于tolerance的点（首尾点始终保留）
+    缩放后落在同一屏幕像素上的连续点会在这里被合并
+    """
+    keep = [0]
+    last = pts[0]
+    tol_sq = tolerance * tolerance
+    for i in range(1, len(pts) - 1):
+        dx = pts[i][0] - last[0]
+        dy = pts[i][1] - last[1]
+        if dx * dx + dy * dy >= tol_sq:
+            keep.append(i)
+            last = pts[i]
+    keep.append(len(pts) - 1)
+    return keep
+
+
+def _douglas_peucker(pts, tolerance):
+    """
+    Douglas–Peucker 折线简化（非递归实现，避免长路径触发递归深度限制）
+    pts: (N, 2) 浮点数组
+    返回: 需要保留的点的下标数组
+    """
+    n = len(pts)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        a = pts[start]
+        b = pts[end]
+        seg = pts[start + 1:end]
+        dx, dy = b - a
+        length = np.hypot(dx, dy)
+        if length == 0:
+            # 首尾重合（闭合笔画），退化为到该点的距离
+            dist = np.hypot(seg[:, 0] - a[0], seg[:, 1] - a[1])
+        else:
+            dist = np.abs(dx * (seg[:, 1] - a[1]) - dy * (seg[:, 0] - a[0])) / length
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            split = start + 1 + i
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return np.flatnonzero(keep)
+
+
+def simplify_path(path, tolerance):
+    """
+    简化单条路径：先做径向距离过滤，再做 Douglas–Peucker
+    tolerance: 允许的最大偏差（与path同一坐标系，单位为像素）
+    返回: 简化后的路径 [(x, y), ...]，首尾点保持不变
+    """
+    if tolerance <= 0 or len(path) < 3:
+        return list(path)
+
+    radial = _radial_reduce(path, tolerance)
+    reduced = [path[i] for i in radial]
+    if len(reduced) < 3:
+        return reduced
+
+    pts = np.asarray(reduced, dtype=np.float64)
+    return [reduced[i] for i in _douglas_peucker(pts, tolerance)]
+
+
+def simplify_paths(paths, screen_tolerance, scale_factor):
+    """
+    按屏幕像素容差简化所有路径
+    screen_tolerance: 屏幕上允许的最大偏差（像素），<=0 表示不简化
+    scale_factor: 图像坐标到画布坐标的缩放因子，用于把容差换算回图像像素
+    返回: (简化后的路径列表, 简化前点数, 简化后点数)
+    """
+    before = sum(len(p) for p in paths)
+    if screen_tolerance <= 0 or scale_factor <= 0:
+        return paths, before, before
+
+    tolerance = screen_tolerance / scale_factor
+    simplified = [simplify_path(p, tolerance) for p in paths]
+    after = sum(len(p) for p in simplified)
+
+    ratio = after / before * 100 if before else 0
+    print(f"路径简化: 容差 {screen_tolerance}px(屏幕) = {tolerance:.2f}px(图像), 点数 {before} -> {after} ({ratio:.1f}%)")
+    return simplified, before, after
@@ -0,0 +1,290 @@
+import os
+import time
+from contextlib import contextmanager
+from itertools import chain
+
+import numpy as np
+
+from src.lazy_modules import cv2
+from src import debug_artifacts, instrument
+from src.skeletonize import DEFAULT_SKELETON_BACKEND, skeletonize_with
+from src.tiling import DEFAULT_TILE_SIZE, TILEABLE_BACKENDS, skeletonize_tiled
+
+# 预处理各阶段的显示名称（按执行顺序）
+STAGE_LABELS = {
+    'decode': '解码',
+    'threshold': '阈值',
+    'morphology': '形态学',
+    'skeleton': '骨架化',
+    'distance': '距离变换',
+    'trace': '路径追踪',
+    'width': '宽度估算',
+}
+
+
+@contextmanager
+def timed_stage(timings, name):
+    """记录代码块耗时（秒），累加到 timings[name]，开启性能记录时同时记为 preprocess 阶段"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        timings[name] = timings.get(name, 0.0) + elapsed
+        instrument.add_span(name, start, elapsed, cat='preprocess')
+
+
+def format_timings(timings):
+    """把阶段耗时格式化为一行文字，例如 '解码 12ms, 阈值 3ms, 总计 15ms'"""
+    parts = [f"{STAGE_LABELS.get(name, name)} {seconds * 1000:.0f}ms" for name, seconds in timings.items()]
+    parts.append(f"总计 {sum(timings.values()) * 1000:.0f}ms")
+    return ", ".join(parts)
+
+
+def decode_image(image_path):
+    """
+    读取图像并直接解码为灰度图（使用numpy fromfile解决中文路径问题）
+    返回: 灰度图，读取失败时返回 None
+    """
+    try:
+        img_data = np.fromfile(image_path, dtype=np.uint8)
+        gray = cv2.imdecode(img_data, cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            print(f"❌ 无法读取图像: {image_path}")
+        return gray
+    except Exception as e:
+        print(f"❌ 读取图像时发生错误: {image_path}, 错误信息: {e}")
+        return None
+
+
+# cv2.IMREAD_REDUCED_* 的缩小倍数（JPEG 解码时直接按DCT缩放，几乎不需要额外开销）
+_REDUCED_FACTORS = (8, 4, 2)
+_REDUCED_FLAGS = {8: 'IMREAD_REDUCED_GRAYSCALE_8', 4: 'IMREAD_REDUCED_GRAYSCALE_4', 2: 'IMREAD_REDUCED_GRAYSCALE_2'}
+
+
+def content_bbox(gray):
+    """用OTSU阈值找线条的包围盒，返回 (x, y, w, h)，没有线条时返回 None"""
+    _, mask = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    points = cv2.findNonZero(mask)
+    if points is None:
+        return None
+    return cv2.boundingRect(points)
+
+
+def decode_image_for_canvas(image_path, canvas_size, oversample=3.0, margin=8):
+    """
+    按画布尺寸解码图像：先确定线条包围盒和最终的画布缩放，再以工作分辨率解码、裁剪并缩小
+    工作分辨率为每个画布像素对应 oversample 个图像像素（不超过原图分辨率），
+    后续阈值、骨架化和追踪的工作量只与画布尺寸有关，不再随原图分辨率增长
+    JPEG 先用 1/8 缩小解码找包围盒，再用最接近的 IMREAD_REDUCED_* 解码；其他格式只解码一次
+    返回: (gray, scale)，gray 为工作分辨率的灰度图，scale 为工作分辨率相对原图的比例；读取失败时返回 (None, 1.0)
+    """
+    try:
+        img_data = np.fromfile(image_path, dtype=np.uint8)
+    except Exception as e:
+        print(f"❌ 读取图像时发生错误: {image_path}, 错误信息: {e}")
+        return None, 1.0
+
+    is_jpeg = img_data[:3].tobytes() == b'\xff\xd8\xff'
+    if is_jpeg:
+        preview = cv2.imdecode(img_data, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+        preview_factor = 8
+    else:
+        preview = cv2.imdecode(img_data, cv2.IMREAD_GRAYSCALE)
+        preview_factor = 1
+    if preview is None:
+        print(f"❌ 无法读取图像: {image_path}")
+        return None, 1.0
+
+    bbox = content_bbox(preview)
+    if bbox is None:
+        if is_jpeg:
+            preview = cv2.imdecode(img_data, cv2.IMREAD_GRAYSCALE)
+        return preview, 1.0
+
+    # 包围盒换算到原图坐标，四周留出余量（预览缩小带来的误差也在余量内）
+    pad = margin + preview_factor
+    x, y, w, h = (v * preview_factor for v in bbox)
+    full_h, full_w = preview.shape[0] * preview_factor, preview.shape[1] * preview_factor
+    x0, y0 = max(0, x - pad), max(0, y - pad)
+    x1, y1 = min(full_w, x + w + pad), min(full_h, y + h + pad)
+
+    # 与 compute_canvas_transform 相同的缩放（留出10%边距），再乘以过采样倍数
+    canvas_scale = min(canvas_size[0] / max(1, w), canvas_size[1] / max(1, h)) * 0.9
+    scale = min(1.0, canvas_scale * oversample)
+
+    # 选择不小于工作分辨率的最大缩小倍数直接解码
+    factor = 1
+    if is_jpeg:
+        factor = next((f for f in _REDUCED_FACTORS if 1.0 / f >= scale), 1)
+        gray = cv2.imdecode(img_data, getattr(cv2, _REDUCED_FLAGS[factor]) if factor > 1 else cv2.IMREAD_GRAYSCALE)
+    else:
+        gray = preview
+    if gray is None:
+        print(f"❌ 无法读取图像: {image_path}")
+        return None, 1.0
+
+    gray = gray[y0 // factor:-(-y1 // factor), x0 // factor:-(-x1 // factor)]
+    rest = scale * factor
+    if rest < 0.95:
+        gray = cv2.resize(gray, None, fx=rest, fy=rest, interpolation=cv2.INTER_AREA)
+    else:
+        gray = np.ascontiguousarray(gray)
+        scale = 1.0 / factor
+    print(f"工作分辨率: {gray.shape[1]}x{gray.shape[0]}（原图 {full_w}x{full_h} 的 {scale:.3f} 倍，已裁剪到线条范围）")
+    return gray, scale
+
+
+def threshold_image(gray):
+    """使用OTSU阈值自动二值化（线条为白色），结果直接写回gray的缓冲区"""
+    cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU, dst=gray)
+    return gray
+
+
+def _scaled_kernel(shape, size, scale):
+    """按原图像素定义的结构元素换算到工作分辨率，缩小后不足2像素时返回 None（不再需要该运算）"""
+    size = int(size * scale + 0.5)
+    if size < 2:
+        return None
+    return cv2.getStructuringElement(shape, (size, size))
+
+
+def clean_binary(binary, scale=1.0):
+    """
+    形态学去噪：开运算去除小噪点，闭运算连接断裂线条（原地进行），
+    再用更强的开运算过滤小区域
+    scale: 工作分辨率相对原图的比例。结构元素按原图像素定义并随之缩小，
+           否则缩小后只有一两个像素宽的细线会被开运算整条去掉（缩小时的面积插值已经平均掉了小噪点）
+    返回: (binary, filtered) binary为闭运算后的图像，filtered为最终用于骨架化的图像
+    """
+    # 更强的开运算（去除小噪点）
+    kernel_open = _scaled_kernel(cv2.MORPH_ELLIPSE, 3, scale)
+    if kernel_open is not None:
+        cv2.morphologyEx(binary, cv2.MORPH_OPEN, kernel_open, dst=binary)
+
+    # 再做一次闭运算（连接断裂但重要的线条）
+    kernel_close = _scaled_kernel(cv2.MORPH_ELLIPSE, 2, scale)
+    if kernel_close is not None:
+        cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel_close, dst=binary)
+
+    # 使用更强的形态学开运算过滤小区域（先腐蚀后膨胀）
+    kernel = _scaled_kernel(cv2.MORPH_RECT, 3, scale)
+    if kernel is None:
+        return binary, binary.copy()
+    filtered = cv2.morphologyEx(binary, cv2.MORPH_OPEN, kernel)
+    return binary, filtered
+
+
+def skeletonize_binary(binary, backend=DEFAULT_SKELETON_BACKEND):
+    """骨架化（细化），返回0/1的uint8骨架"""
+    return skeletonize_with(binary, backend)[0]
+
+
+def preprocess_image(image_path, timings, save_dir=None, skeleton_backend=DEFAULT_SKELETON_BACKEND,
+                     workers=1, tile_size=DEFAULT_TILE_SIZE, canvas_size=None, oversample=3.0, cancelled=None):
+    """
+    内存中的预处理流水线：解码 -> 阈值 -> 形态学 -> 骨架化 -> 距离变换
+    各阶段直接传递数组，耗时累加到timings
+    save_dir: 指定时把中间结果保存到该目录，用于调试
+    skeleton_backend: 骨架化后端名称（见 skeletonize.SKELETON_BACKENDS），后端顺带给出距离图时跳过距离变换
+    workers: 大于1且图像超过一个块时，先做距离变换，再按块在进程池中并行骨架化（结果与单进程相同）
+    tile_size: 分块边长（像素）
+    canvas_size: 指定时按画布尺寸裁剪并缩小到工作分辨率再处理（见 decode_image_for_canvas）
+    oversample: 工作分辨率下每个画布像素对应的图像像素数
+    cancelled: 无参回调，在各阶段之间调用，返回 True 时（如绘制已被取消）停止处理并返回 None
+    返回: {'binary', 'filtered', 'skeleton', 'distance', 'scale'}，scale 为工作分辨率相对原图的比例；
+          读取失败或被取消时返回 None
+    """
+    def stop():
+        return cancelled is not None and cancelled()
+
+    with timed_stage(timings, 'decode'):
+        if canvas_size:
+            gray, scale = decode_image_for_canvas(image_path, canvas_size, oversample)
+        else:
+            gray, scale = decode_image(image_path), 1.0
+    if gray is None or stop():
+        return None
+
+    with timed_stage(timings, 'threshold'):
+        binary = threshold_image(gray)
+
+    with timed_stage(timings, 'morphology'):
+        binary, filtered = clean_binary(binary, scale)
+    if stop():
+        return None
+
+    # 计算过滤掉的像素数量
+    small_contours_count = cv2.countNonZero(binary) - cv2.countNonZero(filtered)
+    print(f"已过滤 {small_contours_count} 个过小的细节像素")
+
+    tiled = workers > 1 and max(filtered.shape) > tile_size and skeleton_backend in TILEABLE_BACKENDS
+    if tiled:
+        # 阈值、形态学和距离变换是整图的快速单遍操作，只有骨架化按块并行
+        with timed_stage(timings, 'distance'):
+            distance = cv2.distanceTransform(filtered, cv2.DIST_L2, 5)
+        if stop():
+            return None
+        with timed_stage(timings, 'skeleton'):
+            skeleton = skeletonize_tiled(filtered, distance, skeleton_backend, workers, tile_size)
+    else:
+        with timed_stage(timings, 'skeleton'):
+            skeleton, distance = skeletonize_with(filtered, skeleton_backend)
+
+    if stop():
+        return None
+
+    # 估算线条宽度用的距离变换（直径 = 2 * 半径）
+    if distance is None:
+        with timed_stage(timings, 'distance'):
+            distance = cv2.distanceTransform(filtered, cv2.DIST_L2, 5)
+
+    # 中间结果在后台线程中编码和写盘，不阻塞后续的路径追踪
+    if save_dir:
+        debug_artifacts.save_image(os.path.join(save_dir, 'processed_binary.png'), filtered)
+        debug_artifacts.save_image(os.path.join(save_dir, 'skeleton.png'), skeleton * 255)
+        debug_artifacts.save_image(os.path.join(save_dir, 'distance_transform.png'), (distance * 10).astype(np.uint8))
+
+    return {'binary': binary, 'filtered': filtered, 'skeleton': skeleton, 'distance': distance, 'scale': scale}
+
+
+def estimate_stroke_widths(paths, distance, with_profile=False):
+    """
+    批量估算每条路径的线宽（直径 = 2 * 距离变换值，逐点向下取整）
+    所有路径坐标拼接后一次性从距离图中取值，再按路径分段归约，避免逐点的Python循环
+    paths: [[(x, y), ...], ...]
+    distance: cv2.distanceTransform 的结果
+    with_profile: 为True时额外返回每条路径的逐点宽度
+    返回: {'mean', 'median', 'max'} 每项为长度等于路径数的数组；with_profile时还有 'profile'（数组列表）
+    """
+    n = len(paths)
+    if n == 0:
+        empty = np.zeros(0)
+        result = {'mean': empty, 'median': empty, 'max': empty}
+        if with_profile:
+            result['profile'] = []
+        return result
+
+    lengths = np.fromiter((len(p) for p in paths), dtype=np.intp, count=n)
+    coords = np.fromiter(chain.from_iterable(chain.from_iterable(paths)), dtype=np.intp,
+                         count=int(lengths.sum()) * 2).reshape(-1, 2)
+    h, w = distance.shape
+    xs = np.clip(coords[:, 0], 0, w - 1)
+    ys = np.clip(coords[:, 1], 0, h - 1)
+    values = (distance[ys, xs] * 2).astype(np.int32)
+
+    starts = np.zeros(n, dtype=np.intp)
+    np.cumsum(lengths[:-1], out=starts[1:])
+
+    mean = np.add.reduceat(values, starts) / lengths
+    max_width = np.maximum.reduceat(values, starts)
+
+    # 中位数：先按(路径, 宽度)排序，再取每段中间的一个或两个值
+    ids = np.repeat(np.arange(n), lengths)
+    sorted_values = values[np.lexsort((values, ids))]
+    median = (sorted_values[starts + (lengths - 1) // 2] + sorted_values[starts + lengths // 2]) / 2
+
+    result = {'mean': mean, 'median': median, 'max': max_width}
+    if with_profile:
+        result['profile'] = np.split(values, starts[1:])
+    return result
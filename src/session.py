@@ -0,0 +1,150 @@
+"""
+可续画的绘制会话
+
+每次绘制在配置目录的 session 子目录中记录一个会话:
+    journal.jsonl   追加写入的日志，每行一个JSON记录:
+                    {"type": "session", ...}  图像列表、画布位置和大小、校准配置名称
+                    {"type": "job", ...}      开始绘制第 index 张图像，计划文件名及其哈希
+                    {"done": i}               第 i 条笔画已画完（每条笔画只追加一行并 flush，不做 fsync）
+                    {"type": "job_done", ...} 该图像已画完
+    job-<index>.xcplan  开始绘制时写下的绘制计划，续画时直接读取，不重新提取和排序
+
+全部图像画完后删除会话目录；中途被中断时保留，下次用 --resume 从最后一条画完的笔画之后继续。
+进程崩溃时日志最后一行可能不完整，读取时忽略无法解析的行。
+"""
+import json
+import os
+import shutil
+import time
+
+from src.draw_plan import PLAN_SUFFIX, write_plan
+from src.stroke_cache import file_sha256
+
+SESSION_VERSION = 1
+JOURNAL_FILE = 'journal.jsonl'
+
+
+class DrawSession:
+    """一个绘制会话的日志，按图像（任务）和笔画记录进度"""
+
+    def __init__(self, session_dir, header, jobs=None, done=None, finished_jobs=None):
+        self.session_dir = session_dir
+        self.header = header
+        self.images = header['images']
+        self.jobs = jobs or {}  # index -> job 记录
+        self.done = done or {}  # index -> 最后画完的笔画序号
+        self.finished_jobs = finished_jobs or set()
+        self._journal = open(os.path.join(session_dir, JOURNAL_FILE), 'a', encoding='utf-8')
+        self._current = None
+
+    def _append(self, record):
+        self._journal.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+        self._journal.flush()
+
+    def plan_path(self, index):
+        return os.path.join(self.session_dir, f"job-{index}{PLAN_SUFFIX}")
+
+    def begin_job(self, index, image_path, planned, canvas_top_left, canvas_size):
+        """开始绘制一张图像：写下绘制计划并记录其哈希，之后的笔画进度都属于这个任务"""
+        strokes, stroke_widths, levels, transform = planned
+        plan_path = self.plan_path(index)
+        write_plan(plan_path, strokes, stroke_widths, levels, canvas_top_left, canvas_size, transform,
+                   source={'image': os.path.basename(image_path)})
+        job = {'type': 'job', 'index': index, 'image': image_path, 'plan': os.path.basename(plan_path),
+               'plan_sha256': file_sha256(plan_path), 'strokes': len(strokes)}
+        self.jobs[index] = job
+        self._current = index
+        self._append(job)
+
+    def continue_job(self, index):
+        """续画已开始的任务，之后的笔画进度继续记在该任务下"""
+        self._current = index
+
+    def stroke_done(self, stroke_index):
+        """当前任务的第 stroke_index 条笔画已画完"""
+        self.done[self._current] = stroke_index
+        self._journal.write(f'{{"done":{stroke_index}}}\n')
+        self._journal.flush()
+
+    def end_job(self, index):
+        self.finished_jobs.add(index)
+        self._append({'type': 'job_done', 'index': index})
+
+    def resume_point(self):
+        """
+        续画位置
+        返回: (index, start, plan_path) 第一个未完成的图像、从第几条笔画开始、已有的计划文件（没有时为 None）；
+        全部完成时返回 None
+        """
+        for index in range(len(self.images)):
+            if index in self.finished_jobs:
+                continue
+            job = self.jobs.get(index)
+            if job is None:
+                return index, 0, None
+            plan_path = os.path.join(self.session_dir, job['plan'])
+            if not os.path.exists(plan_path) or file_sha256(plan_path) != job['plan_sha256']:
+                print(f"⚠️ 会话中的绘制计划 {plan_path} 缺失或已被修改，重新规划该图像")
+                return index, 0, None
+            return index, self.done.get(index, -1) + 1, plan_path
+        return None
+
+    def close(self):
+        if not self._journal.closed:
+            self._journal.close()
+
+    def finish(self):
+        """全部画完：关闭并删除会话目录"""
+        self.close()
+        shutil.rmtree(self.session_dir, ignore_errors=True)
+
+
+def start_session(session_dir, image_paths, canvas_top_left, canvas_size, profile=None):
+    """开始新的会话（覆盖之前未完成的会话）"""
+    if os.path.exists(os.path.join(session_dir, JOURNAL_FILE)):
+        print("⚠️ 上一次未完成的绘制会话将被覆盖（如需继续请使用 --resume）")
+    shutil.rmtree(session_dir, ignore_errors=True)
+    os.makedirs(session_dir, exist_ok=True)
+    header = {'type': 'session', 'version': SESSION_VERSION, 'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+              'images': [os.path.abspath(p) for p in image_paths],
+              'canvas': {'top_left': list(canvas_top_left), 'size': list(canvas_size)},
+              'calibration': profile}
+    session = DrawSession(session_dir, header)
+    session._append(header)
+    return session
+
+
+def load_session(session_dir):
+    """读取未完成的会话，不存在或无法识别时返回 None"""
+    path = os.path.join(session_dir, JOURNAL_FILE)
+    if not os.path.exists(path):
+        return None
+    header = None
+    jobs = {}
+    done = {}
+    finished_jobs = set()
+    current = None
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # 崩溃时写了一半的最后一行
+            if 'done' in record:
+                if current is not None:
+                    done[current] = record['done']
+            elif record.get('type') == 'session':
+                header = record
+            elif record.get('type') == 'job':
+                current = record['index']
+                jobs[current] = record
+                done.pop(current, None)
+            elif record.get('type') == 'job_done':
+                finished_jobs.add(record['index'])
+    if header is None or header.get('version') != SESSION_VERSION:
+        print(f"⚠️ 无法识别的会话日志: {path}")
+        return None
+    session = DrawSession(session_dir, header, jobs, done, finished_jobs)
+    if not line.endswith('\n'):
+        session._journal.write('\n')  # 补上换行，新记录不会接在不完整的行后面
+    return session
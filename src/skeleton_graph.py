@@ -0,0 +1,134 @@
+import numpy as np
+
+from src.lazy_modules import cv2
+
+# 8邻域偏移 (dy, dx)，按顺时针排列（从正上方开始），用于计算交叉数
+_RING_OFFSETS = [(-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1)]
+
+# 行走时的邻居搜索顺序：先4邻域再对角，保证阶梯状骨架上的像素不会被斜向跳过
+_WALK_OFFSETS = [(-1, 0), (0, 1), (1, 0), (0, -1), (-1, 1), (1, 1), (1, -1), (-1, -1)]
+
+
+def find_skeleton_nodes(skeleton):
+    """
+    查找骨架上的端点和交叉点
+    使用交叉数（8邻域中0->1跳变的次数）判断：
+    交叉数为1是端点，交叉数>=3是交叉点，交叉数为2是普通线条像素
+    返回: (endpoints, junctions) 两个与skeleton同形状的布尔掩码
+    """
+    sk = (skeleton > 0).astype(np.uint8)
+    h, w = sk.shape
+    padded = np.pad(sk, 1)
+    ring = [padded[1 + dy:1 + dy + h, 1 + dx:1 + dx + w] for dy, dx in _RING_OFFSETS]
+
+    crossings = np.zeros((h, w), dtype=np.uint8)
+    for i in range(8):
+        crossings += (ring[i] == 0) & (ring[(i + 1) % 8] == 1)
+
+    on = sk.astype(bool)
+    endpoints = on & (crossings == 1)
+    junctions = on & (crossings >= 3)
+    return endpoints, junctions
+
+
+def trace_skeleton_graph(skeleton):
+    """
+    将1像素宽的骨架视为图（端点/交叉点为节点，其间的像素链为边），逐边追踪
+    每个骨架像素只会被绘制一次（交叉点像素作为相邻边的公共端点除外），
+    没有任何节点的闭合环作为单条闭合笔画输出（首尾点相同）
+    返回: [path1, path2, ...] 每个 path 是 [(x, y), ...]
+    """
+    sk = (skeleton > 0).astype(np.uint8)
+    h, w = sk.shape
+    stride = w + 2
+    endpoints, junctions = find_skeleton_nodes(sk)
+
+    # 相邻的交叉点像素合并为同一个节点，端点各自为一个节点
+    n_junctions, junction_labels = cv2.connectedComponents(junctions.astype(np.uint8), connectivity=8)
+    node_labels = junction_labels.astype(np.int32)
+    ey, ex = np.nonzero(endpoints)
+    node_labels[ey, ex] = n_junctions + np.arange(len(ey), dtype=np.int32)
+
+    # 以补边后的一维下标表示像素，行走时无需做边界检查
+    node_mask = np.pad(endpoints | junctions, 1)
+    node_indices = np.flatnonzero(node_mask)
+    node_of = dict(zip(node_indices.tolist(), np.pad(node_labels, 1).ravel()[node_indices].tolist()))
+    near_node = bytearray(cv2.dilate(node_mask.astype(np.uint8), np.ones((3, 3), np.uint8)).tobytes())
+
+    line_mask = np.pad(sk.astype(bool) & ~endpoints & ~junctions, 1)
+    line_indices = np.flatnonzero(line_mask).tolist()
+    remaining = bytearray(line_mask.tobytes())
+
+    walk_offsets = [dy * stride + dx for dy, dx in _WALK_OFFSETS]
+
+    def follow(path, start_label):
+        """从path末端沿未访问的线条像素前进，遇到其他节点或无路可走时停止"""
+        cur = path[-1]
+        while True:
+            if near_node[cur]:
+                for off in walk_offsets:
+                    label = node_of.get(cur + off)
+                    if label is None:
+                        continue
+                    # 刚离开起点节点时不立即折返；绕一圈回到起点则视为挂在节点上的环
+                    if label == start_label and len(path) < 4:
+                        continue
+                    path.append(cur + off)
+                    return path
+            nxt = None
+            for off in walk_offsets:
+                if remaining[cur + off]:
+                    nxt = cur + off
+                    break
+            if nxt is None:
+                return path
+            remaining[nxt] = 0
+            path.append(nxt)
+            cur = nxt
+
+    def adjacent(a, b):
+        return b - a in walk_offsets
+
+    flat_paths = []
+
+    # 第一遍：从每个节点出发，沿每条尚未访问的边走到另一个节点
+    for node in node_indices.tolist():
+        label = node_of[node]
+        for off in walk_offsets:
+            first = node + off
+            if not remaining[first]:
+                continue
+            remaining[first] = 0
+            flat_paths.append(follow([node, first], label))
+
+    # 第二遍：剩下的线条像素属于不含节点的闭合环（或被阶梯跳过的残段）
+    for start in line_indices:
+        if not remaining[start]:
+            continue
+        remaining[start] = 0
+        forward = follow([start], None)
+        if len(forward) > 2 and adjacent(forward[-1], start):
+            forward.append(start)
+            flat_paths.append(forward)
+            continue
+        backward = follow([start], None)
+        flat_paths.append(backward[::-1] + forward[1:])
+
+    paths = []
+    for flat in flat_paths:
+        paths.append([(idx % stride - 1, idx // stride - 1) for idx in flat])
+    return paths
+
+
+def trace_skeleton_components(skeleton):
+    """
+    按连通域逐个追踪骨架（按连通域外接矩形从上到下、从左到右），每次产出一个连通域的路径列表
+    连通域之间没有公共的边，所有产出的路径合起来与 trace_skeleton_graph 对整幅骨架的结果相同，
+    调用方可以在后面的连通域还没追踪时就开始处理前面的路径
+    """
+    sk = (skeleton > 0).astype(np.uint8)
+    n, labels, stats, _ = cv2.connectedComponentsWithStats(sk, connectivity=8)
+    for label in sorted(range(1, n), key=lambda k: (stats[k, cv2.CC_STAT_TOP], stats[k, cv2.CC_STAT_LEFT])):
+        x, y, w, h = stats[label, :4]
+        paths = trace_skeleton_graph(labels[y:y + h, x:x + w] == label)
+        yield [[(px + x, py + y) for px, py in path] for path in paths]
@@ -0,0 +1,122 @@
+"""
+可替换的骨架化后端
+
+每个后端接收二值图（线条非零），返回 (skeleton, distance)：
+skeleton 为0/1的uint8骨架；distance 为与 cv2.distanceTransform(DIST_L2) 含义相同的距离图，
+后端不顺带计算距离时为 None，由调用方另行计算
+"""
+import numpy as np
+
+# 8邻域偏移 (dy, dx)，依次为 Zhang–Suen 记号中的 P2..P9（从正上方开始顺时针）
+_NEIGHBOUR_OFFSETS = [(-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1)]
+
+
+def skeletonize_skimage(binary):
+    """scikit-image 的细化算法（直接复用输出缓冲区，不做拷贝）"""
+    # scikit-image 导入很慢，只在真正需要骨架化时加载
+    from skimage.morphology import skeletonize
+    return skeletonize(binary > 0).view(np.uint8), None
+
+
+def _zhang_suen_tables():
+    """
+    预先计算两个子迭代的删除查找表：以8邻域编码（P2为最低位）为下标，值为是否删除中心像素
+    删除条件: 2 <= B(P1) <= 6，A(P1) == 1，
+    第一步 P2*P4*P6 == 0 且 P4*P6*P8 == 0，第二步 P2*P4*P8 == 0 且 P2*P6*P8 == 0
+    """
+    first = np.zeros(256, dtype=bool)
+    second = np.zeros(256, dtype=bool)
+    for code in range(256):
+        p = [(code >> i) & 1 for i in range(8)]  # p[0]..p[7] 对应 P2..P9
+        b = sum(p)
+        a = sum(1 for i in range(8) if p[i] == 0 and p[(i + 1) % 8] == 1)
+        if not (2 <= b <= 6 and a == 1):
+            continue
+        p2, p3, p4, p5, p6, p7, p8, p9 = p
+        first[code] = p2 * p4 * p6 == 0 and p4 * p6 * p8 == 0
+        second[code] = p2 * p4 * p8 == 0 and p2 * p6 * p8 == 0
+    return first, second
+
+
+_ZS_TABLES = None
+
+
+def skeletonize_zhang_suen(binary):
+    """
+    查找表向量化的 Zhang–Suen 细化，只依赖 NumPy
+    每个子迭代只对边界像素批量计算8邻域编码，查表后同时删除
+    """
+    global _ZS_TABLES
+    if _ZS_TABLES is None:
+        _ZS_TABLES = _zhang_suen_tables()
+
+    h, w = binary.shape
+    stride = w + 2
+    img = np.pad((binary > 0).astype(np.uint8), 1).ravel()
+    offsets = [dy * stride + dx for dy, dx in _NEIGHBOUR_OFFSETS]
+    offset_array = np.array(offsets)
+    weights = [np.uint8(1 << i) for i in range(8)]
+
+    # 只有边界像素（8邻域中有背景）可能被删除；删除像素后，它的前景邻居成为新的边界像素
+    fg = np.flatnonzero(img)
+    code = np.zeros(fg.size, dtype=np.uint8)
+    for off, weight in zip(offsets, weights):
+        code |= img[fg + off] * weight
+    candidates = fg[code != 255]
+    del fg, code
+    in_candidates = np.zeros(img.size, dtype=bool)
+    slot = np.zeros(img.size, dtype=np.int32)
+
+    # 连续两个子迭代都没有删除像素时收敛
+    stalled = 0
+    while candidates.size and stalled < 2:
+        for table in _ZS_TABLES:
+            code = np.zeros(candidates.size, dtype=np.uint8)
+            for off, weight in zip(offsets, weights):
+                code |= img[candidates + off] * weight
+            delete = table[code]
+            if not delete.any():
+                stalled += 1
+                continue
+            stalled = 0
+            removed = candidates[delete]
+            img[removed] = 0
+            keep = candidates[~delete]
+            exposed = (removed[:, None] + offset_array).ravel()
+            exposed = exposed[img[exposed] == 1]
+            # 去掉已在候选中的像素和重复像素（用标记数组代替排序去重）
+            in_candidates[keep] = True
+            exposed = exposed[~in_candidates[exposed]]
+            in_candidates[keep] = False
+            order = np.arange(exposed.size, dtype=np.int32)
+            slot[exposed] = order
+            exposed = exposed[slot[exposed] == order]
+            candidates = np.concatenate((keep, exposed))
+
+    return img.reshape(h + 2, w + 2)[1:-1, 1:-1].copy(), None
+
+
+def skeletonize_medial_axis(binary):
+    """中轴变换：骨架和距离图一次得到，省去单独的距离变换"""
+    from skimage.morphology import medial_axis
+    skeleton, distance = medial_axis(binary > 0, return_distance=True)
+    return skeleton.view(np.uint8), distance.astype(np.float32)
+
+
+SKELETON_BACKENDS = {
+    'skimage': skeletonize_skimage,
+    'zhang_suen': skeletonize_zhang_suen,
+    'medial_axis': skeletonize_medial_axis,
+}
+
+DEFAULT_SKELETON_BACKEND = 'skimage'
+
+
+def skeletonize_with(binary, backend=DEFAULT_SKELETON_BACKEND):
+    """
+    按名称调用骨架化后端
+    返回: (skeleton, distance)，distance 可能为 None
+    """
+    if backend not in SKELETON_BACKENDS:
+        raise ValueError(f"未知的骨架化后端: {backend}，可选: {', '.join(SKELETON_BACKENDS)}")
+    return SKELETON_BACKENDS[backend](binary)
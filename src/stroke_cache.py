@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import tempfile
+from importlib import metadata
+
+import numpy as np
+
+# 提取算法有不兼容的改动时递增，使旧缓存自动失效
+CACHE_FORMAT_VERSION = 5
+
+# 默认缓存总大小上限（字节）
+DEFAULT_CACHE_BYTES = 200 * 1024 * 1024
+
+
+def _library_versions():
+    """影响提取结果的依赖库版本"""
+    import cv2
+    versions = {'opencv': cv2.__version__, 'numpy': np.__version__}
+    try:
+        versions['scikit-image'] = metadata.version('scikit-image')
+    except metadata.PackageNotFoundError:
+        versions['scikit-image'] = 'unknown'
+    return versions
+
+
+def file_sha256(path):
+    """计算文件内容的 SHA-256 十六进制摘要"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(image_path, params):
+    """
+    计算缓存键：图像文件内容的哈希 + 所有预处理参数 + 依赖库版本
+    params: 影响提取结果的参数字典（需可JSON序列化）
+    """
+    digest = hashlib.sha256(file_sha256(image_path).encode('ascii'))
+    meta = {'format': CACHE_FORMAT_VERSION, 'params': params, 'versions': _library_versions()}
+    digest.update(json.dumps(meta, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _entry_path(cache_dir, key):
+    return os.path.join(cache_dir, f"{key}.npz")
+
+
+def _pack_strokes(strokes):
+    """把笔画列表打包为 (coords, offsets) 两个数组"""
+    lengths = [len(s) for s in strokes]
+    offsets = np.zeros(len(strokes) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    coords = np.array([p for s in strokes for p in s], dtype=np.int32).reshape(-1, 2)
+    return coords, offsets
+
+
+def _unpack_strokes(coords, offsets):
+    points = list(zip(coords[:, 0].tolist(), coords[:, 1].tolist()))
+    offsets = offsets.tolist()
+    return [points[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+
+def load_strokes(cache_dir, key):
+    """
+    读取缓存的笔画
+    返回: (strokes, stroke_widths, fills, bbox)，fills 为缓存的填充规划 (strokes, stroke_widths, levels, filled_mask)，
+          没有填充区域时为 None；bbox 为画布映射用的包围盒，没有线条时为 None；未命中或缓存损坏时返回 None
+    """
+    path = _entry_path(cache_dir, key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as data:
+            strokes = _unpack_strokes(data['coords'], data['offsets'])
+            widths = data['widths'].tolist()
+            fills = None
+            if 'fill_coords' in data:
+                shape = tuple(data['filled_shape'].tolist())
+                filled = np.unpackbits(data['filled'], count=shape[0] * shape[1]).reshape(shape)
+                fills = (_unpack_strokes(data['fill_coords'], data['fill_offsets']), data['fill_widths'].tolist(),
+                         data['fill_levels'].tolist(), filled)
+            bbox = tuple(data['bbox'].tolist()) if 'bbox' in data else None
+        # 更新访问时间，用于LRU淘汰
+        os.utime(path)
+        return strokes, widths, fills, bbox
+    except Exception as e:
+        print(f"⚠️ 读取笔画缓存失败，将重新提取: {e}")
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+
+
+def save_strokes(cache_dir, key, strokes, stroke_widths, max_bytes=DEFAULT_CACHE_BYTES, fills=None, bbox=None):
+    """
+    把笔画和宽度以紧凑的 .npz 格式写入缓存（先写临时文件再替换，避免留下半个文件），然后按LRU淘汰
+    fills: 填充规划 (strokes, stroke_widths, levels, filled_mask)，填充区域掩码按位压缩保存
+    bbox: 画布映射用的包围盒 (min_x, min_y, max_x, max_y)
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    coords, offsets = _pack_strokes(strokes)
+    arrays = {'coords': coords, 'offsets': offsets, 'widths': np.asarray(stroke_widths, dtype=np.int32)}
+    if bbox is not None:
+        arrays['bbox'] = np.asarray(bbox, dtype=np.int64)
+    if fills is not None:
+        fill_strokes, fill_widths, fill_levels, filled = fills
+        arrays['fill_coords'], arrays['fill_offsets'] = _pack_strokes(fill_strokes)
+        arrays['fill_widths'] = np.asarray(fill_widths, dtype=np.int32)
+        arrays['fill_levels'] = np.asarray(fill_levels, dtype=np.int8)
+        arrays['filled'] = np.packbits(filled > 0)
+        arrays['filled_shape'] = np.asarray(filled.shape, dtype=np.int64)
+
+    fd, temp_path = tempfile.mkstemp(suffix='.npz', dir=cache_dir)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(temp_path, _entry_path(cache_dir, key))
+    except Exception as e:
+        print(f"⚠️ 写入笔画缓存失败: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False
+
+    evict(cache_dir, max_bytes)
+    return True
+
+
+def evict(cache_dir, max_bytes=DEFAULT_CACHE_BYTES):
+    """按最近访问时间淘汰缓存文件，直到总大小不超过max_bytes"""
+    entries = []
+    for name in os.listdir(cache_dir):
+        if not name.endswith('.npz'):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
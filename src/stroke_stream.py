@@ -0,0 +1,106 @@
+"""
+边提取边绘制的笔画流
+
+后台进程运行 draw_image.stream_plan：画布缩放在路径追踪之前由骨架的包围盒确定并先发送过来，
+之后按连通域分批追踪、估算宽度、简化和排序，每批通过有界队列交给绘制进程。
+用进程而不是线程，路径追踪和排序占用的 GIL 不会拖慢鼠标事件的调度。
+"""
+import argparse
+import multiprocessing
+import queue
+import time
+
+# 队列中最多积压的批数，提取远快于绘制时后台进程在此等待
+STREAM_QUEUE_SIZE = 4
+
+# 等待下一批时检查取消的间隔（秒）
+POLL_INTERVAL = 0.1
+
+
+def stream_job(out, image_path, canvas_size, args):
+    """后台进程：把 stream_plan 的产出依次放入队列，最后放入 ('end', None)"""
+    # 在子进程中才导入绘制模块，避免与 draw_image 循环导入
+    from src import debug_artifacts
+    from src.draw_image import stream_plan
+    debug_artifacts.set_level(getattr(args, 'debug_level', debug_artifacts.DEBUG_OFF))
+    # 守护进程不能再创建子进程，大图的分块骨架化不使用进程池（骨架化本身已与绘制并行）
+    args = argparse.Namespace(**{**vars(args), 'workers': 1})
+    try:
+        plan = stream_plan(image_path, canvas_size, args)
+        out.put(('transform', next(plan)))
+        for batch in plan:
+            out.put(('batch', batch))
+        out.put(('end', None))
+    except Exception as e:
+        out.put(('error', f"{type(e).__name__}: {e}"))
+    finally:
+        debug_artifacts.flush()
+
+
+class StrokeStream:
+    """
+    for path in stream: ... 按规划顺序逐条产出笔画，后台进程还在处理后面的部分
+    每产出一条笔画前把它的宽度和画笔档位追加到 stream.widths / stream.levels，
+    因此可以直接作为 draw_on_canvas 的 traced_paths / stroke_widths / brush_levels 传入
+    control: 绘制的暂停/取消控制（见 draw_control），取消后不再等待后面的批次
+    """
+
+    def __init__(self, image_path, canvas_size, args, queue_size=STREAM_QUEUE_SIZE, control=None):
+        self.control = control
+        self.strokes = []
+        self.widths = []
+        self.levels = []
+        self.wait_time = 0.0  # 绘制循环等待后台进程产出的总时间
+        self.batches = 0
+        self._queue = multiprocessing.Queue(maxsize=queue_size)
+        self._process = multiprocessing.Process(target=stream_job, args=(self._queue, image_path, canvas_size, args),
+                                                daemon=True)
+        self._process.start()
+
+    def _get(self):
+        start = time.perf_counter()
+        while True:
+            try:
+                kind, payload = self._queue.get(timeout=POLL_INTERVAL)
+                break
+            except queue.Empty:
+                if self.control is not None and self.control.is_cancelled():
+                    kind, payload = 'end', None
+                    break
+                if self._process.is_alive():
+                    continue
+                # 进程退出前放入的数据可能刚刚到达
+                try:
+                    kind, payload = self._queue.get(timeout=0.5)
+                except queue.Empty:
+                    kind, payload = 'error', f"后台进程意外退出 (exitcode={self._process.exitcode})"
+                break
+        self.wait_time += time.perf_counter() - start
+        if kind == 'error':
+            raise RuntimeError(f"流式提取失败: {payload}")
+        return kind, payload
+
+    def wait_transform(self):
+        """等待画布映射 (min_x, min_y, scale_factor, offset_x, offset_y)，图像中没有线条时返回 None"""
+        kind, transform = self._get()
+        return transform
+
+    def __iter__(self):
+        while True:
+            kind, batch = self._get()
+            if kind == 'end':
+                return
+            strokes, widths, levels = batch
+            self.batches += 1
+            for path, width, level in zip(strokes, widths, levels):
+                self.strokes.append(path)
+                self.widths.append(width)
+                self.levels.append(level)
+                yield path
+
+    def close(self):
+        """结束后台进程（绘制被取消时后面的批次不再需要）"""
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process.join()
+        self._queue.close()
@@ -0,0 +1,80 @@
+"""
+大图的分块并行骨架化
+
+把二值图切成带重叠边（halo）的块，在进程池中分别骨架化，只取每块的中心区域拼回整幅骨架。
+细化每轮只看3x3邻域，像素的最终状态只受其周围有限范围内像素的影响：
+范围取决于最粗线条的半径（细化轮数），halo 按距离变换的最大值确定，因此拼接结果与整图骨架化一致，
+之后的路径追踪在拼好的整幅骨架上进行，跨块的线条自然连续。
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.skeletonize import DEFAULT_SKELETON_BACKEND, skeletonize_with
+
+DEFAULT_TILE_SIZE = 1024
+
+# 结果只依赖局部邻域、可以分块计算的后端（中轴变换按全局距离排序并随机打破平局，不能分块）
+TILEABLE_BACKENDS = ('skimage', 'zhang_suen')
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def tile_halo(distance):
+    """根据最粗线条的半径计算重叠边宽度：细化的每个子迭代影响范围扩大1像素，每轮两个子迭代"""
+    return 2 * int(np.ceil(float(distance.max()))) + 8
+
+
+def tile_grid(height, width, tile_size):
+    """按 tile_size 切分图像，返回各块中心区域 [(y0, y1, x0, x1), ...]"""
+    return [(y, min(y + tile_size, height), x, min(x + tile_size, width))
+            for y in range(0, height, tile_size) for x in range(0, width, tile_size)]
+
+
+def _skeletonize_tile(job):
+    """进程池任务：骨架化带 halo 的块，只返回中心区域"""
+    tile, (cy0, cy1, cx0, cx1), backend = job
+    skeleton, _ = skeletonize_with(tile, backend)
+    return skeleton[cy0:cy1, cx0:cx1].copy()
+
+
+def skeletonize_tiled(binary, distance, backend=DEFAULT_SKELETON_BACKEND, workers=None,
+                      tile_size=DEFAULT_TILE_SIZE):
+    """
+    分块并行骨架化
+    binary: 二值图（线条非零）
+    distance: binary 的距离变换，用于确定重叠边宽度
+    workers: 进程数，默认为CPU核数
+    返回: 0/1的uint8骨架，与对整幅 binary 骨架化的结果相同
+    """
+    h, w = binary.shape
+    halo = tile_halo(distance)
+    # 线条很粗时重叠边很宽，相应放大块，避免大部分计算花在重叠区域上
+    tile_size = max(tile_size, 4 * halo)
+    skeleton = np.zeros((h, w), dtype=np.uint8)
+
+    tiles = []
+    jobs = []
+    for y0, y1, x0, x1 in tile_grid(h, w, tile_size):
+        # 没有线条的块不必发送到子进程
+        if not binary[y0:y1, x0:x1].any():
+            continue
+        hy0, hy1 = max(0, y0 - halo), min(h, y1 + halo)
+        hx0, hx1 = max(0, x0 - halo), min(w, x1 + halo)
+        tiles.append((y0, y1, x0, x1))
+        jobs.append((binary[hy0:hy1, hx0:hx1], (y0 - hy0, y1 - hy0, x0 - hx0, x1 - hx0), backend))
+
+    workers = min(workers or default_workers(), len(jobs))
+    if workers <= 1:
+        results = map(_skeletonize_tile, jobs)
+        for (y0, y1, x0, x1), part in zip(tiles, results):
+            skeleton[y0:y1, x0:x1] = part
+        return skeleton
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for (y0, y1, x0, x1), part in zip(tiles, pool.map(_skeletonize_tile, jobs)):
+            skeleton[y0:y1, x0:x1] = part
+    return skeleton
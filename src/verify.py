@@ -0,0 +1,86 @@
+"""
+绘制结果的闭环校验：截取画布区域，与绘制计划的栅格化结果对齐，
+按覆盖率找出缺失或不完整的笔画，只重绘这些笔画
+"""
+import numpy as np
+
+from src.lazy_modules import cv2, pyautogui
+
+
+def capture_canvas(canvas_top_left, canvas_size):
+    """截取画布区域，返回灰度图"""
+    shot = pyautogui.screenshot(region=(int(canvas_top_left[0]), int(canvas_top_left[1]),
+                                        int(canvas_size[0]), int(canvas_size[1])))
+    return cv2.cvtColor(np.array(shot), cv2.COLOR_RGB2GRAY)
+
+
+def ink_mask(capture, baseline, threshold=40):
+    """与绘制前的截图相比明显变化的像素视为已绘制"""
+    diff = cv2.absdiff(capture, baseline)
+    return (diff > threshold).astype(np.uint8)
+
+
+def _sample_path(path, step=1.0):
+    """沿折线按约step像素的间隔采样（简化后的路径点很稀疏，需要补点才能统计覆盖率）"""
+    pts = np.asarray(path, dtype=np.float32)
+    if len(pts) == 1:
+        return pts
+    seg = np.diff(pts, axis=0)
+    lengths = np.hypot(seg[:, 0], seg[:, 1])
+    samples = [pts[:1]]
+    for start, vec, length in zip(pts[:-1], seg, lengths):
+        n = max(1, int(np.ceil(length / step)))
+        t = (np.arange(1, n + 1, dtype=np.float32) / n)[:, None]
+        samples.append(start + vec * t)
+    return np.concatenate(samples)
+
+
+def rasterize_paths(canvas_paths, canvas_size):
+    """把画布坐标下的路径栅格化为1像素宽的期望图像"""
+    raster = np.zeros((int(canvas_size[1]), int(canvas_size[0])), dtype=np.uint8)
+    for path in canvas_paths:
+        pts = np.asarray(path, dtype=np.int32).reshape(-1, 1, 2)
+        cv2.polylines(raster, [pts], False, 1, 1)
+    return raster
+
+
+def estimate_offset(expected, ink, max_shift=10):
+    """
+    用相位相关估计截图相对期望图像的平移（窗口缩放或取整造成的偏差）
+    偏移超过max_shift时认为估计不可靠，返回(0, 0)
+    """
+    a = cv2.GaussianBlur(expected.astype(np.float32), (5, 5), 0)
+    b = cv2.GaussianBlur(ink.astype(np.float32), (5, 5), 0)
+    (dx, dy), response = cv2.phaseCorrelate(a, b)
+    if abs(dx) > max_shift or abs(dy) > max_shift or response < 0.05:
+        return 0, 0
+    return int(round(dx)), int(round(dy))
+
+
+def find_missing_strokes(canvas_paths, capture, baseline, coverage_threshold=0.8, tolerance=2):
+    """
+    找出覆盖率不足的笔画
+    canvas_paths: 相对画布左上角的路径列表（与实际绘制时的坐标一致）
+    capture / baseline: 绘制后 / 绘制前的画布灰度截图
+    coverage_threshold: 笔画采样点中落在已绘制区域内的比例低于该值时视为缺失
+    tolerance: 允许的位置误差（像素），已绘制区域会先膨胀这么多
+    返回: (缺失笔画的下标列表, 每条笔画的覆盖率列表)
+    """
+    h, w = capture.shape
+    ink = ink_mask(capture, baseline)
+    dx, dy = estimate_offset(rasterize_paths(canvas_paths, (w, h)), ink)
+    if tolerance > 0:
+        size = 2 * tolerance + 1
+        ink = cv2.dilate(ink, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (size, size)))
+
+    missing = []
+    coverage = []
+    for idx, path in enumerate(canvas_paths):
+        pts = _sample_path(path)
+        xs = np.clip(np.round(pts[:, 0]).astype(np.int32) + dx, 0, w - 1)
+        ys = np.clip(np.round(pts[:, 1]).astype(np.int32) + dy, 0, h - 1)
+        ratio = float(ink[ys, xs].mean())
+        coverage.append(ratio)
+        if ratio < coverage_threshold:
+            missing.append(idx)
+    return missing, coverage
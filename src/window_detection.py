@@ -1,12 +1,14 @@
-import pygetwindow as gw
-import pyautogui
-import time
-from PIL import Image
+import argparse
 import os
 import sys
-import cv2
 import numpy as np
 
+# 添加项目根目录到Python路径，保证直接运行本脚本时也能导入src包
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# pygetwindow / pyautogui / cv2 导入较慢，首次使用时才真正加载
+from src.lazy_modules import cv2, pyautogui, pygetwindow as gw
+from src import calibration, debug_artifacts, instrument
+
 # 获取系统AppData路径用于存储配置文件
 app_data_path = os.getenv('APPDATA')
 if app_data_path:
@@ -17,207 +19,287 @@ else:
     config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config')
     output_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'output')
 
-# 创建配置目录和输出目录（如果不存在）
-os.makedirs(config_path, exist_ok=True)
-os.makedirs(output_path, exist_ok=True)
+# 画布固定颜色 #EEEEEE 的匹配范围（BGR，扩大了误差范围）
+CANVAS_COLOR_LOWER = np.array([220, 220, 220], dtype=np.uint8)
+CANVAS_COLOR_UPPER = np.array([240, 240, 240], dtype=np.uint8)
+
+# 目标窗口的固定大小和位置
+TARGET_WINDOW_SIZE = (450, 1089)
+TARGET_WINDOW_POS = (1371, 0)
+
+# 画笔滑块的档位数，以及圆点的面积范围（按 TARGET_WINDOW_SIZE 的窗口截图计，像素）和一行中圆点间距允许的相对偏差
+SLIDER_STOPS = 5
+SLIDER_DOT_AREA = (12, 1600)
+SLIDER_SPACING_TOLERANCE = 0.25
+
+# 校验已保存画布位置时的探测参数：在画布边界内外各取 PROBE_BAND 像素宽的条带，
+# 边界内侧每条边至少 PROBE_MIN_INSIDE 比例是画布颜色、外侧每条边最多 PROBE_MAX_OUTSIDE 比例是画布颜色
+PROBE_MARGIN = 6
+PROBE_BAND = 3
+PROBE_MIN_INSIDE = 0.8
+PROBE_MAX_OUTSIDE = 0.5
+
+
+def ensure_directories():
+    """创建配置目录和输出目录（如果不存在），在执行检测时调用，避免导入模块时产生副作用"""
+    os.makedirs(config_path, exist_ok=True)
+    os.makedirs(output_path, exist_ok=True)
+
+
+def save_debug_image(name, img):
+    """在后台把调试图像保存到输出目录（见 debug_artifacts）"""
+    debug_artifacts.save_image(os.path.join(output_path, name), img)
+
+
+def find_canvas_rect(frame):
+    """
+    在窗口截图中查找 #EEEEEE 画布区域（面积最大的颜色匹配区域）
+    frame: BGR 截图
+    返回: (x, y, w, h) 相对 frame 的画布矩形，未找到时返回 None
+    """
+    mask = cv2.inRange(frame, CANVAS_COLOR_LOWER, CANVAS_COLOR_UPPER)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return None
+    return cv2.boundingRect(max(contours, key=cv2.contourArea))
+
+
+def _slider_dots(gray, scale=1.0):
+    """
+    找出灰度图中近似圆形的深色斑点，返回 (中心x数组, 中心y数组, 宽度数组)
+    开运算去掉滑块轨道这类细线，使与轨道相连的圆点成为独立的连通域
+    scale: 截图相对 TARGET_WINDOW_SIZE 的缩放（高DPI屏幕上截图按物理像素计）
+    """
+    _, dark = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    k = int(round(5 * scale)) | 1
+    dark = cv2.morphologyEx(dark, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (k, k)))
+    n, _, stats, centroids = cv2.connectedComponentsWithStats(dark, connectivity=8)
+    w, h, area = stats[1:, cv2.CC_STAT_WIDTH], stats[1:, cv2.CC_STAT_HEIGHT], stats[1:, cv2.CC_STAT_AREA]
+    # 面积合适、宽高接近、且填满外接矩形的大部分（实心圆约为 0.785）
+    keep = ((area >= SLIDER_DOT_AREA[0] * scale ** 2) & (area <= SLIDER_DOT_AREA[1] * scale ** 2)
+            & (w <= 1.6 * h) & (h <= 1.6 * w) & (area >= 0.55 * w * h))
+    return centroids[1:, 0][keep], centroids[1:, 1][keep], w[keep]
+
+
+def find_brush_slider(frame, canvas_rect):
+    """
+    在窗口截图中画布下方的区域查找画笔滑块的5个档位圆点
+    同一行中（中心y相近）连续5个间距均匀的圆点即为滑块，有多行候选时取间距最均匀的一行
+    frame: BGR 窗口截图
+    canvas_rect: (x, y, w, h) 画布在截图中的位置
+    返回: [(x, y), ...] 从左（最细）到右（最粗）的截图坐标，未找到时返回 None
+    """
+    _, y, _, h = canvas_rect
+    top = y + h
+    if frame.shape[0] - top < 8:
+        return None
+    gray = cv2.cvtColor(frame[top:, :], cv2.COLOR_BGR2GRAY)
+    cx, cy, widths = _slider_dots(gray, max(1.0, frame.shape[1] / TARGET_WINDOW_SIZE[0]))
+    if len(cx) < SLIDER_STOPS:
+        return None
+
+    best = None
+    order = np.argsort(cy)
+    cx, cy, widths = cx[order], cy[order], widths[order]
+    # 按中心y分行：相邻圆点y差超过圆点尺寸时断开
+    breaks = np.flatnonzero(np.diff(cy) > max(4, int(np.median(widths)))) + 1
+    for row in np.split(np.arange(len(cy)), breaks):
+        if len(row) < SLIDER_STOPS:
+            continue
+        row = row[np.argsort(cx[row])]
+        gaps = np.diff(cx[row])
+        for i in range(len(row) - SLIDER_STOPS + 1):
+            window = gaps[i:i + SLIDER_STOPS - 1]
+            spread = window.std() / window.mean()
+            if spread > SLIDER_SPACING_TOLERANCE or window.min() < 2 * widths[row].max():
+                continue
+            if best is None or spread < best[0]:
+                best = (spread, row[i:i + SLIDER_STOPS])
+    if best is None:
+        return None
+    return [(int(round(cx[i])), int(round(cy[i])) + top) for i in best[1]]
+
+
+def estimate_canvas_rect(width, height):
+    """颜色检测失败时按窗口比例估算画布矩形 (x, y, w, h)，相对窗口左上角"""
+    return int(width * 0.1), int(height * 0.2), int(width * 0.8), int(height * 0.6)
+
+
+def capture_window(win):
+    """对窗口区域截一次图，返回 BGR 图像"""
+    with instrument.span('window_capture', cat='detect'):
+        shot = pyautogui.screenshot(region=(int(win.left), int(win.top), int(win.width), int(win.height)))
+    return cv2.cvtColor(np.array(shot), cv2.COLOR_RGB2BGR)
+
+
+def canvas_probe_ok(probe, rect, band=PROBE_BAND):
+    """
+    检查探测截图中的画布边界是否仍在 rect 处：画布移动一两个像素时，某条边的内侧条带就会混入画布外的颜色
+    probe: BGR 截图
+    rect: (x, y, w, h) 画布在截图中的位置
+    """
+    mask = cv2.inRange(probe, CANVAS_COLOR_LOWER, CANVAS_COLOR_UPPER) > 0
+    ph, pw = mask.shape
+    x, y, w, h = rect
+    if w <= 2 * band or h <= 2 * band or x < 0 or y < 0 or x + w > pw or y + h > ph:
+        return False
+    inside = [mask[y:y + band, x:x + w], mask[y + h - band:y + h, x:x + w],
+              mask[y:y + h, x:x + band], mask[y:y + h, x + w - band:x + w]]
+    if min(side.mean() for side in inside) < PROBE_MIN_INSIDE:
+        return False
+    # 截图被屏幕边缘截断时对应一侧没有外侧条带，跳过
+    outside = [mask[max(0, y - band):y, x:x + w], mask[y + h:y + h + band, x:x + w],
+               mask[y:y + h, max(0, x - band):x], mask[y:y + h, x + w:x + w + band]]
+    return all(side.mean() <= PROBE_MAX_OUTSIDE for side in outside if side.size)
+
+
+def probe_canvas(profile):
+    """截一张只包含画布及其周围几像素的小图，确认保存的画布位置仍然有效"""
+    left, top, width, height = calibration.canvas_rect(profile)
+    screen_w, screen_h = pyautogui.size()
+    x0, y0 = max(0, left - PROBE_MARGIN), max(0, top - PROBE_MARGIN)
+    x1 = min(screen_w, left + width + PROBE_MARGIN)
+    y1 = min(screen_h, top + height + PROBE_MARGIN)
+    if x1 <= x0 or y1 <= y0:
+        return False
+    try:
+        with instrument.span('canvas_probe', cat='detect'):
+            shot = pyautogui.screenshot(region=(x0, y0, x1 - x0, y1 - y0))
+    except Exception as e:
+        print(f"探测截图失败: {e}")
+        return False
+    probe = cv2.cvtColor(np.array(shot), cv2.COLOR_RGB2BGR)
+    return canvas_probe_ok(probe, (left - x0, top - y0, width, height))
+
 
+def window_matches(win, profile):
+    """窗口的位置和大小是否与配置中记录的一致"""
+    saved = profile.get('window')
+    if not saved:
+        return True
+    return (int(win.left), int(win.top), int(win.width), int(win.height)) == \
+        (saved['left'], saved['top'], saved['width'], saved['height'])
 
-        
-def main():
-    """主函数，执行窗口检测并保存画布坐标"""
-    # 获取所有窗口标题
-    windows = gw.getAllTitles()
-    print("所有窗口标题:", windows)
 
-    # 根据窗口标题获取窗口对象（模糊匹配）
-    # 尝试匹配"定制喜贴"或"喜茶GO"
-    target_window = None
+def find_target_window():
+    """根据窗口标题查找目标窗口（模糊匹配“定制喜贴”或“喜茶GO”），未找到时返回 None"""
     for title in ['定制喜贴', '喜茶GO']:
         windows = gw.getWindowsWithTitle(title)
         if windows:
-            target_window = windows[0]
-            break
-
-    if target_window:
-        win = target_window
-        print(f"找到窗口: {win.title}")
-        print(f"位置: ({win.left}, {win.top})")
-        print(f"大小: {win.width} x {win.height}")
-
-        # 激活窗口到前台
-        win.activate()
-        time.sleep(1)  # 等待窗口完全激活
-        
-        # 调整窗口大小为固定的450 x 1089
-        target_width = 450
-        target_height = 1089
-        print(f"调整窗口大小为: {target_width} x {target_height}")
-        win.resizeTo(target_width, target_height)
-        time.sleep(1)  # 等待窗口大小调整完成
-        # 自动将窗口移动到指定位置(1371, 0)
-        target_left = 1371
-        target_top = 0
-        print(f"将窗口移动到指定位置: ({target_left}, {target_top})")
-        win.moveTo(target_left, target_top)
-        time.sleep(0.5)  # 等待窗口位置调整完成
-        
-        # 通过颜色识别检测灰色区域
-        print("\n开始通过颜色检测灰色区域...")
-        try:
-            # 先截取整个窗口
-            window_screenshot = pyautogui.screenshot(region=(int(win.left), int(win.top), int(win.width), int(win.height)))
-            
-            # 将PIL图像转换为OpenCV格式
-            img = cv2.cvtColor(np.array(window_screenshot), cv2.COLOR_RGB2BGR)
-            
-            # 直接搜索固定颜色 #EEEEEE 的灰色区域，扩大颜色范围
-            # 创建颜色匹配掩码（扩大误差范围）
-            lower_color = np.array([220, 220, 220])  # 降低下限
-            upper_color = np.array([240,240,240])  # 提高上限
-            mask = cv2.inRange(img, lower_color, upper_color)
-            
-            print("搜索固定颜色 #EEEEEE (BGR: [238,238,238]) 的灰色区域")
-            
-            # 保存掩码图像用于调试
-            try:
-                success, encoded_img = cv2.imencode('.png', mask)
-                if success:
-                    output_file = os.path.join(output_path, 'gray_mask.png')
-                    encoded_img.tofile(output_file)
-                    print(f"灰色区域掩码已保存为 {output_file}")
-            except Exception as e:
-                print(f"保存灰色区域掩码时发生错误: {e}")
-            
-            # 查找轮廓
-            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            print(f"找到的轮廓数量: {len(contours)}")
-            
-            # 寻找最大的轮廓，假设这是我们要找的灰色区域
-            if contours:
-                # 计算所有轮廓的面积
-                contour_areas = [cv2.contourArea(c) for c in contours]
-                print(f"轮廓面积列表: {contour_areas}")
-                
-                # 按面积排序轮廓
-                contours = sorted(contours, key=cv2.contourArea, reverse=True)
-                
-                # 取面积最大的轮廓
-                largest_contour = contours[0]
-                
-                # 获取边界框
-                x, y, w, h = cv2.boundingRect(largest_contour)
-                
-                # 计算在屏幕上的实际坐标
-                left = int(win.left + x)
-                top = int(win.top + y)
-                canvas_width = int(w)
-                canvas_height = int(h)
-                
-                print(f"通过颜色检测到的灰色区域位置: ({left}, {top})")
-                print(f"通过颜色检测到的灰色区域大小: {canvas_width} x {canvas_height}")
-                
-                # 绘制边界框到原图上
-                cv2.rectangle(img, (x, y), (x + w, y + h), (0, 255, 0), 2)
-                
-                # 保存带边界框的图像
-                try:
-                    success, encoded_img = cv2.imencode('.png', img)
-                    if success:
-                        output_file = os.path.join(output_path, 'color_detection_result.png')
-                        encoded_img.tofile(output_file)
-                        print(f"颜色检测结果已保存为 {output_file}")
-                except Exception as e:
-                    print(f"保存颜色检测结果时发生错误: {e}")
-                
-                # 截取灰色区域
-                try:
-                    # 截图区域：(left, top, width, height) - 必须是整数元组
-                    screenshot = pyautogui.screenshot(region=(left, top, canvas_width, canvas_height))
-                    
-                    # 保存截图
-                    output_file = os.path.join(output_path, 'canvas_screenshot.png')
-                    screenshot.save(output_file)
-                    print(f"灰色区域截图已保存为 {output_file}")
-                    
-                    # 显示截图信息
-                    print(f"截图尺寸: {screenshot.width} x {screenshot.height}")
-                    
-                    # 可选：显示截图（已禁用自动显示）
-                    # screenshot.show()
-                    
-                    # 记录灰色区域坐标到文件（指定utf-8编码避免乱码）
-                    config_file = os.path.join(config_path, 'canvas_coordinates.txt')
-                    with open(config_file, 'w', encoding='utf-8') as f:
-                        f.write(f"灰色区域左上角坐标: ({left}, {top})\n")
-                        f.write(f"灰色区域尺寸: {canvas_width} x {canvas_height}\n")
-                        f.write(f"灰色区域右下角坐标: ({left + canvas_width}, {top + canvas_height})\n")
-                    print(f"灰色区域坐标已记录到 {config_file} 文件中")
-                    
-                    # 提示用户可以运行 analyze_lines.py 来分析线条宽度
-                    print("\n提示：如果需要分析画笔宽度，请运行 python analyze_lines.py")
-                    
-                except Exception as e:
-                    print(f"截图过程中出错: {e}")
-                    return False
-            else:
-                print("未检测到灰色区域，使用默认位置估算...")
-                # 保存原图用于调试
-                try:
-                    success, encoded_img = cv2.imencode('.png', img)
-                    if success:
-                        output_file = os.path.join(output_path, 'debug_window.png')
-                        encoded_img.tofile(output_file)
-                        print(f"窗口截图已保存为 {output_file}")
-                except Exception as e:
-                    print(f"保存调试窗口截图时发生错误: {e}")
-                # 如果无法通过颜色检测到灰色区域，使用原有的位置估算方法
-                margin_left = win.width * 0.1  # 左侧边距约为窗口宽度的10%
-                margin_top = win.height * 0.2   # 顶部边距约为窗口高度的20%
-                canvas_width = win.width * 0.8   # 画布宽度约为窗口宽度的80%
-                canvas_height = win.height * 0.6 # 画布高度约为窗口高度的60%
-                
-                # 计算截图的左上角坐标并转换为整数
-                left = int(win.left + margin_left)
-                top = int(win.top + margin_top)
-                canvas_width = int(canvas_width)
-                canvas_height = int(canvas_height)
-                
-                print(f"灰色区域位置估算: ({left}, {top})")
-                print(f"灰色区域大小估算: {canvas_width} x {canvas_height}")
-                
-                # 截取灰色区域
-                try:
-                    screenshot = pyautogui.screenshot(region=(left, top, canvas_width, canvas_height))
-                    output_file = os.path.join(output_path, 'canvas_screenshot.png')
-                    screenshot.save(output_file)
-                    print(f"灰色区域截图已保存为 {output_file}")
-                    
-                    # 记录灰色区域坐标到文件（指定utf-8编码避免乱码）
-                    config_file = os.path.join(config_path, 'canvas_coordinates.txt')
-                    with open(config_file, 'w', encoding='utf-8') as f:
-                        f.write(f"灰色区域左上角坐标: ({left}, {top})\n")
-                        f.write(f"灰色区域尺寸: {canvas_width} x {canvas_height}\n")
-                        f.write(f"灰色区域右下角坐标: ({left + canvas_width}, {top + canvas_height})\n")
-                    print(f"灰色区域坐标已记录到 {config_file} 文件中")
-                    
-                except Exception as e:
-                    print(f"截图过程中出错: {e}")
-                    return False
-            
-        except Exception as e:
-            print(f"处理过程中出错: {e}")
-            print("尝试直接截取整个窗口...")
-            # 如果无法截取指定区域，尝试截取整个窗口
-            full_screenshot = pyautogui.screenshot(region=(int(win.left), int(win.top), int(win.width), int(win.height)))
-            output_file = os.path.join(output_path, 'full_window_screenshot.png')
-            full_screenshot.save(output_file)
-            print(f"整个窗口截图已保存为 {output_file}")
-            return False
-        
-    else:
+            return windows[0]
+    return None
+
+
+def arrange_window(win):
+    """激活窗口，并调整为固定的大小和位置"""
+    win.activate()
+    instrument.sleep(1, 'window_activate')  # 等待窗口完全激活
+
+    print(f"调整窗口大小为: {TARGET_WINDOW_SIZE[0]} x {TARGET_WINDOW_SIZE[1]}")
+    win.resizeTo(*TARGET_WINDOW_SIZE)
+    instrument.sleep(1, 'window_resize')  # 等待窗口大小调整完成
+
+    print(f"将窗口移动到指定位置: {TARGET_WINDOW_POS}")
+    win.moveTo(*TARGET_WINDOW_POS)
+    instrument.sleep(0.5, 'window_move')  # 等待窗口位置调整完成
+
+
+def main(debug=None, profile=None):
+    """
+    主函数，执行窗口检测并把画布坐标保存到校准配置
+    debug: 为True时把窗口截图、颜色掩码、检测结果和画布截图保存到输出目录，默认按调试级别（DEBUG_FULL）决定
+    profile: 校准配置名称，默认为当前使用的配置
+    """
+    with instrument.span('window_detection', cat='detect'):
+        return detect_canvas(debug, profile)
+
+
+def ensure_calibration(profile=None, debug=None, force=False):
+    """
+    绘制前确认校准有效：窗口仍在记录的位置、且一张探测截图中画布边界没有移动时直接使用保存的配置，
+    否则执行完整的窗口检测
+    返回: 校准配置（字典），检测失败时返回 None
+    """
+    name = profile or calibration.active_profile_name()
+    saved = calibration.get_profile(name)
+    if saved and not force:
+        win = find_target_window()
+        if win is not None and window_matches(win, saved) and probe_canvas(saved):
+            print(f"✅ 校准配置 '{name}' 仍然有效，跳过窗口检测")
+            instrument.count('calibration.reused')
+            return saved
+        print(f"⚠️ 校准配置 '{name}' 与当前窗口不符，重新检测...")
+    if not main(debug, name):
+        return None
+    return calibration.get_profile(name)
+
+
+def detect_canvas(debug=None, profile=None):
+    """查找并摆放目标窗口，在一次窗口截图中通过颜色检测画布区域，把坐标写入校准配置"""
+    if debug is None:
+        debug = debug_artifacts.enabled(debug_artifacts.DEBUG_FULL)
+    ensure_directories()
+    win = find_target_window()
+    if win is None:
         print("未找到匹配的窗口！")
         return False
-    
+
+    print(f"找到窗口: {win.title}")
+    print(f"位置: ({win.left}, {win.top})")
+    print(f"大小: {win.width} x {win.height}")
+    arrange_window(win)
+
+    # 通过颜色识别检测灰色区域（整个检测只截一次图）
+    print("\n开始通过颜色检测灰色区域...")
+    try:
+        frame = capture_window(win)
+    except Exception as e:
+        print(f"截图过程中出错: {e}")
+        return False
+
+    with instrument.span('canvas_search', cat='detect'):
+        rect = find_canvas_rect(frame)
+
+    if rect is not None:
+        x, y, w, h = rect
+        print(f"通过颜色检测到的灰色区域位置: ({int(win.left + x)}, {int(win.top + y)})")
+        print(f"通过颜色检测到的灰色区域大小: {w} x {h}")
+    else:
+        print("未检测到灰色区域，使用默认位置估算...")
+        x, y, w, h = estimate_canvas_rect(frame.shape[1], frame.shape[0])
+        print(f"灰色区域位置估算: ({int(win.left + x)}, {int(win.top + y)})")
+        print(f"灰色区域大小估算: {w} x {h}")
+
+    if debug:
+        save_debug_image('window_frame.png', frame)
+        save_debug_image('gray_mask.png', cv2.inRange(frame, CANVAS_COLOR_LOWER, CANVAS_COLOR_UPPER))
+        # 画布截图直接从已有的窗口截图中裁剪
+        save_debug_image('canvas_screenshot.png', frame[y:y + h, x:x + w])
+
+    # 画笔滑块在同一张截图中检测，保存为相对画布左上角的偏移
+    with instrument.span('slider_search', cat='detect'):
+        sliders = find_brush_slider(frame, (x, y, w, h))
+    if sliders is not None:
+        slider_source = 'detected'
+        print(f"检测到画笔滑块档位: {[(int(win.left + sx), int(win.top + sy)) for sx, sy in sliders]}")
+    else:
+        slider_source = 'default'
+        sliders = calibration.DEFAULT_SLIDER_WINDOW_OFFSETS
+        print("⚠️ 未检测到画笔滑块，使用默认档位位置")
+
+    if debug:
+        marked = frame.copy()
+        cv2.rectangle(marked, (x, y), (x + w, y + h), (0, 255, 0), 2)
+        for sx, sy in sliders:
+            cv2.circle(marked, (sx, sy), 6, (0, 0, 255), 2)
+        save_debug_image('color_detection_result.png', marked)
+
+    left, top = int(win.left + x), int(win.top + y)
+    print(f"灰色区域右下角坐标: ({left + w}, {top + h})")
+    calibration.save_profile(profile or calibration.active_profile_name(), (left, top, w, h),
+                             window=(win.title, win.left, win.top, win.width, win.height),
+                             sliders=[(sx - x, sy - y) for sx, sy in sliders], slider_source=slider_source)
+
     # 检查是否存在存储的画笔宽度数据
     config_file = os.path.join(config_path, 'brush_widths.txt')
     if os.path.exists(config_file):
@@ -226,9 +308,13 @@ def main():
         print(f"\n已读取存储的画笔宽度数据: {brush_widths} px")
     else:
         print(f"\n未找到画笔宽度数据文件: {config_file}。运行 python analyze_lines.py 来分析线条宽度。")
-    
+
     return True
 
 # 如果直接运行此脚本
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='检测喜茶窗口中的画布并保存校准配置')
+    parser.add_argument('--debug', action='store_true', help='把窗口截图、颜色掩码和检测结果保存到输出目录')
+    parser.add_argument('--profile', help='校准配置名称 (默认: 当前使用的配置)')
+    args = parser.parse_args()
+    main(debug=args.debug, profile=args.profile)